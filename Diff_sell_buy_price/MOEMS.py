@@ -1,10 +1,1342 @@
 """
 @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
 """
-import sys,numpy as np
+import os,copy,json,heapq,time,mmap,numpy as np
+from itertools import product
+from operator import attrgetter
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor,wait,FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from pyomo.environ import *
 import logging
 logging.getLogger('pyomo.core').setLevel(logging.ERROR)
+#the notes on the inputs and the warnings of the solves, shown by the logging configuration of the application
+logger=logging.getLogger(__name__)
+############################################################
+class MOEMSInputError(ValueError):
+    def __init__(self,problems):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        the inputs of ModelParameters (or of one of its methods) are not correct, it is raised once with all the problems that were found
+        problems (list): what is wrong with every input and what to give instead, one str per problem
+        """
+        self.problems=list(problems)
+        super().__init__('the inputs are not correct:\n'+'\n'.join(' - '+problem for problem in self.problems))
+############################################################
+def param_data(values,shape=None):
+    """
+    bulk initialisation data of a Param, it maps the model indices (starting from 1) to the entries of values
+    values (array): data with shape of (n, ) or, when shape is given, data with shape of shape=(n_rows, n_columns)
+    """
+    if shape is None:
+        if isinstance(values,np.ndarray):
+            values=np.ravel(values).tolist()
+        return dict(enumerate(values,1))
+    if 0 in shape:
+        return {}
+    values=np.reshape(values,shape).ravel().tolist()
+    return dict(zip(product(range(1,shape[0]+1),range(1,shape[1]+1)),values))
+
+def schedule_rows(schedule,n_Time_intervals,n_units):
+    """
+    a schedule as nested python lists with shape of (n_Time_intervals, n_units), so the rules can read it without indexing numpy arrays
+    """
+    if n_units==0:
+        return [[] for t in range(n_Time_intervals)]
+    return np.reshape(schedule,(n_Time_intervals,n_units)).tolist()
+def time_first(values,n_Time_intervals):
+    """
+    data with the time intervals on the first axis, data with shape of (n_units, n_Time_intervals) is transposed
+    """
+    values=np.asarray(values,dtype=float)
+    if values.ndim==2 and values.shape[0]!=n_Time_intervals:
+        values=np.transpose(values)
+    return values
+def shift_rows(values,Steps):
+    """
+    shifts data with the time intervals on the first axis by Steps intervals, the last interval is repeated at the end
+    """
+    values=np.asarray(values,dtype=float)
+    return np.concatenate([values[Steps:],np.repeat(values[-1:],Steps,axis=0)])
+def time_series(values,n_Time_intervals,name,problems,units=False,dtype=np.float64,schedule=False):
+    """
+    an input with one value per time interval as a contiguous array with the time intervals on the first axis:
+    (n_Time_intervals, ) or with units=True (n_Time_intervals, n_units), the data can have shape of (n_Time_intervals, n_units),
+    (n_units, n_Time_intervals) or (n_Time_intervals, ) for one unit and an empty list has no unit
+    schedule=True only accepts 0 and 1, what is wrong is added to problems and None is given back
+    """
+    T=n_Time_intervals
+    values=np.asarray(values)
+    if values.dtype!=bool and not np.issubdtype(values.dtype,np.number):
+        problems.append('%s is not correct, please provide numbers' % name)
+        return None
+    if units:
+        if values.size==0:
+            values=np.zeros((T,0))
+        elif values.ndim==1 and values.shape[0]==T:
+            values=values[:,None]
+        elif values.ndim==2 and values.shape[0]!=T and values.shape[1]==T:
+            values=values.T
+        if values.ndim!=2 or values.shape[0]!=T:
+            problems.append('%s has shape of %s, please provide it with shape of (n_Time_intervals, n_units) or (n_units, n_Time_intervals) with n_Time_intervals=%d'
+                            % (name,np.shape(values),T))
+            return None
+    elif values.size!=T:
+        problems.append('%s has shape of %s, please provide it with shape of (n_Time_intervals, ) with n_Time_intervals=%d' % (name,np.shape(values),T))
+        return None
+    else:
+        values=values.reshape(T)
+    if schedule:
+        if not np.all((values==0) | (values==1)):
+            problems.append('%s is not correct, please provide 1 (connected or on a trip) or 0 in every time interval' % name)
+            return None
+    elif not np.all(np.isfinite(values)):
+        problems.append('%s is not correct, please provide finite numbers (no nan or inf)' % name)
+        return None
+    return np.ascontiguousarray(values,dtype=dtype)
+def unit_values(values,n_units,name,text,problems,low=-np.inf,high=np.inf,strict=False,dtype=np.float64):
+    """
+    an input with one value per unit as a contiguous array with shape of (n_units, ), the values are between low and high
+    (strict=True: larger than low), text says what the input is, what is wrong is added to problems and None is given back
+    """
+    if values is None:
+        problems.append('%s is not defined, please provide %s with shape of (%d, )' % (name,text,n_units))
+        return None
+    values=np.asarray(values)
+    if values.dtype!=bool and not np.issubdtype(values.dtype,np.number):
+        problems.append('%s is not correct, please provide %s as numbers' % (name,text))
+        return None
+    if values.size!=n_units:
+        problems.append('%s has shape of %s, please provide %s with shape of (%d, )' % (name,np.shape(values),text,n_units))
+        return None
+    values=values.reshape(n_units)
+    if np.any(values<=low if strict else values<low) or np.any(values>high) or not np.all(np.isfinite(values)):
+        if low>-np.inf and high<np.inf:
+            bounds=('between %g (not included) and %g' if strict else 'between %g and %g') % (low,high)
+        elif low>-np.inf:
+            bounds=('larger than %g' if strict else 'at least %g') % low
+        else:
+            bounds='as finite numbers'
+        problems.append('%s is not correct, please provide %s %s' % (name,text,bounds))
+        return None
+    if np.issubdtype(dtype,np.integer) and np.any(values!=np.round(values)):
+        problems.append('%s is not correct, please provide %s as integers' % (name,text))
+        return None
+    return np.ascontiguousarray(values,dtype=dtype)
+def set_bounds(var,rule):
+    """
+    sets the bounds of every index of var from rule(model, *index), it gives (lower, upper) with None for no bound, or None
+    to fix the variable to 0 (a unit that is not connected), so the limits of a single variable are not rows of the model
+    the bounds can hold mutable params (EV_er), the solvers read their current values
+    """
+    model=var.model()
+    for index,v in var.items():
+        bounds=rule(model,*index) if isinstance(index,tuple) else rule(model,index)
+        if bounds is None:
+            v.fix(0)
+        else:
+            v.unfix()
+            v.setlb(bounds[0])
+            v.setub(bounds[1])
+def ESS_SOC_regression(SOC,P,efficiency,deltaT,length=1):
+    """
+    the SOC of an ESS after length time intervals of the power P from SOC, with the regression model of the SOC of the ESS in Kezo
+    (SOC=a*SOC+b*P*efficiency/100*deltaT+c every interval, for deltaT=15min), it works for numbers, arrays and pyomo expressions
+    """
+    a=0.99707
+    b=0.185707/deltaT  # considering deltaT=15min, 
+    c=0.004025
+    if length==1:
+        return a*SOC + (b*P*efficiency/100*deltaT)+c
+    #the same power in every interval of a block: the steps add up as a geometric series
+    gain=(1-a**length)/(1-a)
+    return a**length*SOC + gain*(b*P*efficiency/100*deltaT+c)
+def charger_sessions(EV_scedule,EV_charger_ID,n_charger,n_Time_intervals):
+    """
+    the sessions of the EVs on their chargers for the charger formulation of the model (EV_formulation='charger')
+    EV_scedule (list): the EV schedule as given by schedule_rows, EV_charger_ID (list): the charger of every EV (from 1)
+    the SOC of a charger starts again in the first interval, when another EV arrives and when the SOC of its last EV starts again
+    in the EV formulation (the interval after a departure, from the fourth interval on), so it is the SOC of the EV on it
+    returns a dict of nested python lists with shape of (n_Time_intervals, n_charger), so the rules can read them without indexing numpy arrays:
+    EV: the EV (from 1) connected to the charger or 0, owner: the EV of the last session on the charger or 0 before the first one,
+    reset: the SOC of the charger starts again, departure: the EV of the charger departs after the interval
+    and idle: if an EV is not connected in the interval (n_Time_intervals, ), charger: the charger of every EV (n_EV, ),
+    intervals: the connected intervals (from 1) of every EV (n_EV, )
+    """
+    T=n_Time_intervals
+    n=len(EV_charger_ID)
+    schedule=np.array(EV_scedule,dtype=float).reshape(T,n)==1
+    charger=np.array(EV_charger_ID,dtype=int).reshape(n)-1
+    if n>0 and (charger.min()<0 or charger.max()>=n_charger):
+        raise MOEMSInputError(["EV_charger_ID is not correct, please provide the ID of the charger of every EV between 1 and EV_n_charger=%d" % n_charger])
+    chargers=np.zeros((n,n_charger),dtype=int)
+    chargers[np.arange(n),charger]=1
+    busy=schedule.astype(int)@chargers
+    if np.any(busy>1):
+        #the first time interval of every charger with two EVs on it
+        problems=['two EVs are connected to charger %d in time interval %d, please provide an EV_scedule with at most one EV on every charger at a time'
+                  % (c+1,np.argmax(busy[:,c]>1)+1) for c in np.flatnonzero((busy>1).any(axis=0))]
+        raise MOEMSInputError(problems)
+    EV=(schedule*np.arange(1,n+1))@chargers
+    #the last interval with an EV on the charger
+    last=np.maximum.accumulate(np.where(EV>0,np.arange(T)[:,None],-1),axis=0)
+    owner=np.where(last>=0,np.take_along_axis(EV,np.maximum(last,0),axis=0),0)
+    #the SOC of the EV formulation starts again in the first interval and after a departure (from the fourth interval on)
+    change=np.diff(schedule.astype(int),axis=0)
+    EV_reset=np.zeros((T,n),dtype=bool)
+    EV_reset[0]=True
+    EV_reset[3:]=change[2:]==-1
+    EV_departure=np.zeros((T,n),dtype=bool)
+    EV_departure[1:T-1]=change[1:]==-1
+    previous=np.vstack([np.zeros((1,n_charger),dtype=int),owner[:-1]])
+    reset=(owner!=previous) | ((previous>0) & np.take_along_axis(EV_reset,np.maximum(previous-1,0),axis=1))
+    reset[0]=True
+    departure=(EV>0) & np.take_along_axis(EV_departure,np.maximum(EV-1,0),axis=1)
+    #an EV that departs in the first 3 intervals keeps its SOC, this can not be kept over the session of another EV on the charger
+    connected=np.cumsum(schedule,axis=0)-schedule
+    since=np.maximum.accumulate(np.where(EV_reset,np.arange(T)[:,None],0),axis=0)
+    carried=(connected-np.take_along_axis(connected,since,axis=0))>0
+    arrival=schedule & ~np.vstack([np.zeros((1,n),dtype=bool),schedule[:-1]])
+    lost=arrival & carried & np.take_along_axis(reset,np.broadcast_to(charger,(T,n)),axis=1)
+    if np.any(lost):
+        problems=["EV %d departs in the first 3 time intervals and comes back to charger %d after another EV, its SOC is kept over the departure, please use EV_formulation='EV'"
+                  % (m+1,charger[m]+1) for m in np.flatnonzero(lost.any(axis=0))]
+        raise MOEMSInputError(problems)
+    return {'EV':EV.tolist(),'owner':owner.tolist(),'reset':reset.tolist(),'departure':departure.tolist(),
+            'idle':(~schedule).any(axis=1).tolist(),'charger':(charger+1).tolist(),
+            'intervals':[(np.flatnonzero(schedule[:,m])+1).tolist() for m in range(n)]}
+def EV_session_records(EV_sessions,n_Time_intervals):
+    """
+    the EVs of ModelParameters from session records (arrival, departure, energy, charger), one EV per session
+    the EV is connected from the time interval arrival to departure-1 (from 0), energy is its energy required in Wh and charger the ID of its charger
+    returns EV_er, EV_scedule with shape of (n_Time_intervals, n_EV) (one byte per entry) and EV_charger_ID
+    """
+    records=np.array(EV_sessions,dtype=float).reshape(-1,4)
+    arrival=records[:,0].astype(int)
+    departure=records[:,1].astype(int)
+    if np.any(arrival<0) or np.any(departure>n_Time_intervals) or np.any(arrival>=departure):
+        raise MOEMSInputError(["EV_sessions is not correct, please provide (arrival, departure, energy, charger) with 0 <= arrival < departure <= n_Time_intervals=%d for every session" % n_Time_intervals])
+    t=np.arange(n_Time_intervals)[:,None]
+    EV_scedule=((t>=arrival) & (t<departure)).astype(np.int8)
+    return records[:,2].tolist(),EV_scedule,records[:,3].astype(int).tolist()
+def EV_connected_intervals(EV_scedule,n_Time_intervals,n_EV):
+    """
+    the connected time intervals of the EVs for the session formulation of the model (EV_formulation='session'), the powers and SOCs
+    of the EVs are only made for them, the rules are the ones of the EV formulation for the connected intervals:
+    the SOC starts from the SOC of the interval before (or of the last session if it departed in the first 3 intervals) or from 0
+    returns a dict of python lists (the time intervals and EVs from 1):
+    index: the connected (t, n_EV) in the order of the time intervals, EVs: the EVs connected in every time interval (n_Time_intervals, ),
+    intervals: the connected intervals of every EV (n_EV, ), previous: (t, n_EV) >> the (t, n_EV) that its SOC starts from,
+    departure: the (t, n_EV) after which the EV departs (not the first or the last time interval), the energy is charged by then
+    """
+    T=n_Time_intervals
+    schedule=np.reshape(EV_scedule,(T,n_EV))==1
+    t,n=np.nonzero(schedule)
+    index=list(zip((t+1).tolist(),(n+1).tolist()))
+    EVs=[row.tolist() for row in np.split(n+1,np.cumsum(schedule.sum(axis=1))[:-1])]
+    intervals=[(np.flatnonzero(schedule[:,m])+1).tolist() for m in range(n_EV)]
+    #the SOC goes on from the interval before, an EV that arrives again after a departure in the first 3 intervals
+    #goes on from its last connected interval (the SOC of the EV formulation starts again after a departure from the fourth interval on)
+    last=np.maximum.accumulate(np.where(schedule,np.arange(T)[:,None],-1),axis=0)
+    before=np.vstack([np.full((1,n_EV),-1),last[:-1]])
+    chained=schedule & (before>=0) & ((before==np.arange(T)[:,None]-1) | (before<=1))
+    t,n=np.nonzero(chained)
+    previous=dict(zip(zip((t+1).tolist(),(n+1).tolist()),zip((before[t,n]+1).tolist(),(n+1).tolist())))
+    departure=np.zeros((T,n_EV),dtype=bool)
+    departure[1:T-1]=schedule[1:T-1] & ~schedule[2:]
+    t,n=np.nonzero(departure)
+    return {'index':index,'EVs':EVs,'intervals':intervals,'previous':previous,'departure':set(zip((t+1).tolist(),(n+1).tolist()))}
+############################################################
+class ResultBundle:
+    def __init__(self,Path):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        opens a bundle written by ModelParameters.Save_results, an array is only read when it is asked for
+        a folder bundle gives memory mapped arrays, a .npz bundle reads (and decompresses) one array at a time
+        Path (str): the folder or the .npz file of the bundle, the Path that was given to Save_results (.npz is added
+                    to a Path without extension that is not a folder, as np.savez_compressed does)
+        manifest (dict): the shapes and dtypes of the arrays, the OF values and the settings of the model
+        """
+        Path=os.fspath(Path)
+        if not os.path.isdir(Path) and not os.path.splitext(Path)[1]:
+            Path=Path+'.npz'
+        self.path=Path
+        if os.path.isdir(Path):
+            self.npz=None
+            with open(os.path.join(Path,'manifest.json')) as file:
+                self.manifest=json.load(file)
+        else:
+            self.npz=np.load(Path)
+            self.manifest=json.loads(str(self.npz['manifest']))
+
+    def keys(self):
+        return list(self.manifest['arrays'].keys())
+
+    def __contains__(self,name):
+        return name in self.manifest['arrays']
+
+    def __getitem__(self,name):
+        if name not in self.manifest['arrays']:
+            raise KeyError(name)
+        if self.npz is None:
+            return np.load(os.path.join(self.path,name+'.npy'),mmap_mode='r')
+        return self.npz[name]
+
+    def close(self):
+        if self.npz is not None:
+            self.npz.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+def load_results(Path):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    opens the results that ModelParameters.Save_results wrote to Path (a folder or a .npz file), see ResultBundle
+    """
+    return ResultBundle(Path)
+############################################################
+class ForecastArchive:
+    def __init__(self,Source,Columns=None,Delimiter=',',Time_axis=0):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        a long time series on disk (for example a year of load, PV, price or CO2 forecasts), only the window of a horizon is read from it
+        Source (str or array): a .npy file (it is memory mapped), a .csv file with one row per time interval (the rows before the window
+                               are skipped without parsing them, the first line can be a header with the names of the columns)
+                               or an array, for example a np.memmap or np.load(..., mmap_mode='r')
+        Columns (int, str or list): the columns (units) that are read, names can be given if the .csv file has a header,
+                                    one column gives a series with shape of (n_intervals, ), default is all the columns
+        Delimiter (str): the delimiter of the .csv file
+        Time_axis (int): the axis of the time intervals of a .npy file or an array, 0 (default) for (n_intervals, n_units), 1 for (n_units, n_intervals)
+        """
+        self.path=os.fspath(Source) if isinstance(Source,(str,os.PathLike)) else None
+        self.csv=self.path is not None and not self.path.endswith('.npy')
+        self.delimiter=Delimiter
+        self.time_axis=0 if self.csv else Time_axis
+        self.array=None if self.path is not None else Source
+        if self.csv:
+            #the byte offsets of the rows 0, checkpoint_rows, 2*checkpoint_rows, ... that were passed, a later window starts from the last one before it
+            self.checkpoint_rows=1024
+            with open(self.path,'rb') as file:
+                first=file.readline()
+            fields=[field.strip().strip(b'"').decode() for field in first.split(Delimiter.encode())]
+            try:
+                [float(field) for field in fields]
+                self.names=None
+                self.checkpoints=[0]
+            except ValueError:
+                self.names=fields
+                self.checkpoints=[len(first)]
+        else:
+            self.names=None
+        if isinstance(Columns,(str,int,np.integer)):
+            self.single=True
+            Columns=[Columns]
+        else:
+            self.single=False
+        if Columns is not None:
+            missing=[column for column in Columns if isinstance(column,str) and (self.names is None or column not in self.names)]
+            if missing:
+                raise MOEMSInputError(['the columns %s are not in the header of %s, please provide their names or numbers (from 0)' % (missing,Source)])
+            Columns=[self.names.index(column) if isinstance(column,str) else int(column) for column in Columns]
+        self.columns=Columns
+
+    def data(self):
+        #the whole archive as an array, a .npy file is memory mapped (it is opened once)
+        if self.array is None:
+            self.array=np.load(self.path,mmap_mode='r')
+        return self.array
+
+    def __len__(self):
+        #the number of time intervals, a .csv file is read once to the end (without parsing its rows)
+        if self.csv:
+            return self.csv_rows(np.iinfo(np.int64).max,0)[0]
+        return self.data().shape[self.time_axis]
+
+    def csv_rows(self,Start,n_rows):
+        #the row number where the file ended (or Start+n_rows) and the lines of the rows from Start to Start+n_rows-1
+        K=self.checkpoint_rows
+        lines=[]
+        with open(self.path,'rb') as file:
+            k=min(Start//K,len(self.checkpoints)-1)
+            position=self.checkpoints[k]
+            row=k*K
+            file.seek(position)
+            #the rows before the window are skipped one block of the file at a time, the ends of their lines are found with numpy
+            while row<Start:
+                block=file.read(1<<20)
+                if not block:
+                    break
+                starts=np.flatnonzero(np.frombuffer(block,dtype=np.uint8)==10)+position+1   #the start of the rows row+1, row+2, ...
+                while len(self.checkpoints)*K<=row+len(starts):
+                    self.checkpoints.append(int(starts[len(self.checkpoints)*K-row-1]))
+                if row+len(starts)>=Start:
+                    position=int(starts[Start-row-1])
+                    row=Start
+                else:
+                    #the last row of the file can have no end of line
+                    row+=len(starts)+(len(block)<1<<20 and len(block[block.rfind(b'\n')+1:].strip())>0)
+                    position+=len(block)
+            file.seek(position)
+            while row<Start+n_rows:
+                line=file.readline()
+                if not line.strip():
+                    break
+                lines.append(line.decode())
+                row+=1
+                if row%K==0 and row//K==len(self.checkpoints):
+                    self.checkpoints.append(file.tell())
+        return row,lines
+
+    def window(self,Start,n_Time_intervals):
+        """
+        the time intervals from Start to Start+n_Time_intervals-1 (from 0) with the time intervals on the axis Time_axis,
+        a .npy file or an array gives a view of the archive (nothing is copied), a .csv file gives the parsed rows of the window,
+        the window is shorter than n_Time_intervals if the archive ends before it
+        """
+        if Start<0:
+            raise MOEMSInputError(['the start of the window is %d, please provide a time interval from 0' % Start])
+        if self.csv:
+            lines=self.csv_rows(Start,n_Time_intervals)[1]
+            if not lines:
+                values=np.zeros((0,1 if self.columns is None else len(self.columns)))
+            else:
+                try:
+                    values=np.loadtxt(lines,delimiter=self.delimiter,usecols=self.columns,ndmin=2,dtype=np.float64)
+                except ValueError as error:
+                    raise MOEMSInputError(['the rows %d to %d of %s are not correct (%s), please provide numbers in the columns that are read'
+                                           % (Start,Start+len(lines)-1,self.path,error)])
+            return values[:,0] if self.single else values
+        values=self.data()
+        index=[slice(None)]*values.ndim
+        index[self.time_axis]=slice(Start,Start+n_Time_intervals)
+        values=values[tuple(index)]
+        if self.columns is not None:
+            axis=1-self.time_axis
+            values=values[(slice(None),)*axis+(self.columns[0],)] if self.single else np.take(values,self.columns,axis=axis)
+        return values
+
+    def __getstate__(self):
+        #a worker process opens the archive again, the data is not pickled
+        state=self.__dict__.copy()
+        array=state['array']
+        if self.path is not None:
+            state['array']=None
+        elif isinstance(array,np.memmap) and array.filename is not None and isinstance(array.base,mmap.mmap):
+            state['array']=None
+            state['memmap']=(array.filename,array.dtype,array.shape,array.offset,'C' if array.flags.c_contiguous else 'F')
+        return state
+
+    def __setstate__(self,state):
+        memmap=state.pop('memmap',None)
+        self.__dict__.update(state)
+        if memmap is not None:
+            filename,dtype,shape,offset,order=memmap
+            self.array=np.memmap(filename,dtype=dtype,mode='r',offset=offset,shape=shape,order=order)
+
+def load_forecast(Source,Start=0,n_Time_intervals=None,Columns=None,Delimiter=',',Time_axis=0):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    the window of n_Time_intervals time intervals from Start (from 0) of a forecast archive (a .npy or .csv file or an array), see ForecastArchive,
+    a .npy file gives a memory mapped view, default n_Time_intervals is the rest of the archive
+    """
+    archive=Source if isinstance(Source,ForecastArchive) else ForecastArchive(Source,Columns,Delimiter,Time_axis)
+    if n_Time_intervals is None:
+        n_Time_intervals=len(archive)-Start
+    return archive.window(Start,n_Time_intervals)
+
+def forecast_windows(forecasts,Start,n_Time_intervals,problems,Repeat=False):
+    """
+    the forecasts (name >> values) with the archives (a path of a .npy or .csv file, a np.memmap or a ForecastArchive) replaced
+    by their window of n_Time_intervals from Start, and the archives (name >> ForecastArchive)
+    a window that is shorter than n_Time_intervals is added to problems, with Repeat=True its last interval is repeated
+    """
+    windows={}
+    archives={}
+    for name,values in forecasts.items():
+        if isinstance(values,(str,os.PathLike,np.memmap,ForecastArchive)):
+            try:
+                archive=values if isinstance(values,ForecastArchive) else ForecastArchive(values)
+                values=archive.window(Start,n_Time_intervals)
+            except (MOEMSInputError,OSError,ValueError) as error:
+                problems.extend(error.problems if isinstance(error,MOEMSInputError) else ['%s can not be read (%s)' % (name,error)])
+                windows[name]=None
+                continue
+            n_rows=values.shape[archive.time_axis]
+            if n_rows<n_Time_intervals and (not Repeat or n_rows==0):
+                problems.append('%s has %d time intervals from Forecast_start=%d, please provide an archive with at least %d time intervals from it'
+                                % (name,n_rows,Start,n_Time_intervals))
+                windows[name]=None
+                continue
+            if n_rows<n_Time_intervals:
+                values=values.T if archive.time_axis==1 else values
+                values=np.concatenate([values,np.repeat(values[-1:],n_Time_intervals-n_rows,axis=0)])
+            archives[name]=archive
+        windows[name]=values
+    return windows,archives
+############################################################
+class PhaseTimer:
+    def __init__(self,Timing=False,Profile=None):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        records the wall and CPU time of the phases of a planning run, a phase inside another phase is named parent/child
+        Timing (bool or str): True records the times, 'memory' also records the memory allocated in every phase (with tracemalloc, it is slower)
+        Profile (dict): phase name >> file, the phase is run under cProfile and its stats are written to the file (read them with pstats)
+        timings (dict): phase name >> {'calls', 'wall', 'cpu'} and with 'memory' also {'allocated', 'peak'} in bytes,
+                        the times and allocations are summed over the calls, the peak is the largest of the calls
+        """
+        self.enabled=bool(Timing) or bool(Profile)
+        self.memory=Timing=='memory'
+        self.Profile=Profile or {}
+        self.timings={}
+        self.stack=[]
+        self.profilers={}
+        if self.memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def start(self,name):
+        if not self.enabled:
+            return
+        name='/'.join([frame['name'] for frame in self.stack[-1:]]+[name])
+        frame={'name':name,'wall':time.perf_counter(),'cpu':time.process_time(),'profiler':None}
+        if self.memory:
+            import tracemalloc
+            current,peak=tracemalloc.get_traced_memory()
+            if self.stack:
+                self.stack[-1]['peak']=max(self.stack[-1]['peak'],peak)
+            tracemalloc.reset_peak()
+            frame['allocated']=current
+            frame['peak']=current
+        if name in self.Profile and not any(f['profiler'] for f in self.stack):
+            #one profiler per phase, the calls of a phase are added up in its file
+            import cProfile
+            frame['profiler']=self.profilers.setdefault(name,cProfile.Profile())
+            frame['profiler'].enable()
+        self.stack.append(frame)
+
+    def stop(self):
+        if not self.enabled:
+            return
+        frame=self.stack.pop()
+        wall=time.perf_counter()-frame['wall']
+        cpu=time.process_time()-frame['cpu']
+        if frame['profiler'] is not None:
+            frame['profiler'].disable()
+            frame['profiler'].dump_stats(self.Profile[frame['name']])
+        record=self.timings.setdefault(frame['name'],{'calls':0,'wall':0.0,'cpu':0.0})
+        record['calls']+=1
+        record['wall']+=wall
+        record['cpu']+=cpu
+        if self.memory:
+            import tracemalloc
+            current,peak=tracemalloc.get_traced_memory()
+            peak=max(frame['peak'],peak)
+            if self.stack:
+                self.stack[-1]['peak']=max(self.stack[-1]['peak'],peak)
+            record['allocated']=record.get('allocated',0)+current-frame['allocated']
+            record['peak']=max(record.get('peak',0),peak-frame['allocated'])
+
+    @contextmanager
+    def phase(self,name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def wrap(self,name,function):
+        #the function timed as the phase name every time it is called
+        def timed(*args,**kwds):
+            with self.phase(name):
+                return function(*args,**kwds)
+        return timed
+############################################################
+def solve_QP(H,c,A,b,lb,ub,tol=1e-7,max_iter=200):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    primal-dual interior point method (Mehrotra predictor-corrector) for the convex QP
+    min 1/2 x'Hx + c'x  s.t.  Ax = b,  lb <= x <= ub
+    H (sparse): positive semidefinite matrix with shape of (n, n), A (sparse): matrix with shape of (m, n)
+    lb, ub (array): the bounds of x, -inf/inf for no bound
+    returns x and True if the tolerance is reached
+    """
+    from scipy.sparse import bmat,diags,identity
+    from scipy.sparse.linalg import splu
+    n=len(c)
+    m=len(b)
+    L=np.isfinite(lb)
+    U=np.isfinite(ub)
+    lb=np.where(L,lb,0)
+    ub=np.where(U,ub,0)
+    AT=A.T.tocsc()
+    #starting point: the least norm solution of Ax=b moved inside the bounds
+    K=bmat([[identity(n),AT],[A,-1e-8*identity(m)]],format='csc')
+    x=splu(K,permc_spec='MMD_AT_PLUS_A',diag_pivot_thresh=0,options=dict(SymmetricMode=True)).solve(np.concatenate([np.zeros(n),b]))[:n]
+    width=np.where(L & U,ub-lb,np.inf)
+    margin=np.minimum(np.maximum(1,1e-2*np.where(L & U,width,np.abs(x))),width/2)
+    x=np.where(L,np.maximum(x,lb+margin),x)
+    x=np.where(U,np.minimum(x,ub-margin),x)
+    #the slacks of the bounds are kept apart from x, x-lb is not accurate near large bounds
+    sl=np.where(L,x-lb,1)
+    su=np.where(U,ub-x,1)
+    y=np.zeros(m)
+    zl=np.where(L,1.0,0)
+    zu=np.where(U,1.0,0)
+    n_bounds=max(1,np.count_nonzero(L)+np.count_nonzero(U))
+    for it in range(max_iter):
+        Hx=H@x
+        ATy=AT@y
+        Ax=A@x
+        r_d=Hx+c-ATy-zl+zu
+        r_p=Ax-b
+        gap=np.dot(sl[L],zl[L])+np.dot(su[U],zu[U])
+        #the residuals are relative to the largest term in them: near the optimum the multipliers of the active bounds are large
+        #and the dual residual can not get smaller than the round-off of these terms
+        scale_p=1+max(np.max(np.abs(b),initial=0),np.max(np.abs(Ax),initial=0))
+        scale_d=1+max(np.max(np.abs(c),initial=0),np.max(np.abs(Hx),initial=0),np.max(np.abs(ATy),initial=0),np.max(zl,initial=0),np.max(zu,initial=0))
+        if np.max(np.abs(r_p),initial=0)/scale_p<tol and np.max(np.abs(r_d),initial=0)/scale_d<tol and gap/(1+abs(0.5*x@Hx+c@x))<tol:
+            return x,True
+        mu=gap/n_bounds
+        #the Newton system of the reduced KKT conditions, slightly regularized so it can always be factorized,
+        #the solves are refined with the exact matrix
+        D=np.where(L,zl/sl,0)+np.where(U,zu/su,0)
+        if not np.all(np.isfinite(D)):
+            #the slacks reached zero, the problem is infeasible or badly scaled
+            break
+        try:
+            #the regularized KKT matrix is quasi-definite, it is factorized without pivoting in the ordering of its symmetric pattern
+            lu=splu(bmat([[H+diags(D+1e-9),AT],[A,-1e-9*identity(m)]],format='csc'),permc_spec='MMD_AT_PLUS_A',diag_pivot_thresh=0,
+                    options=dict(SymmetricMode=True))
+        except RuntimeError:
+            break
+        K=bmat([[H+diags(D),AT],[A,None]],format='csr')
+        def step(r_cl,r_cu):
+            rhs=np.concatenate([-r_d+np.where(L,r_cl/sl,0)-np.where(U,r_cu/su,0),-r_p])
+            d=lu.solve(rhs)
+            for k in range(3):
+                d+=lu.solve(rhs-K@d)
+            dx=d[:n]
+            dzl=np.where(L,(r_cl-zl*dx)/sl,0)
+            dzu=np.where(U,(r_cu+zu*dx)/su,0)
+            return dx,-d[n:],dzl,dzu
+        def step_length(dx,dzl,dzu):
+            alpha=1.0
+            for v,dv in [(sl[L],dx[L]),(su[U],-dx[U]),(zl[L],dzl[L]),(zu[U],dzu[U])]:
+                neg=dv<0
+                if np.any(neg):
+                    alpha=min(alpha,np.min(-v[neg]/dv[neg]))
+            return alpha
+        #predictor
+        dx,dy,dzl,dzu=step(-sl*zl,-su*zu)
+        alpha=step_length(dx,dzl,dzu)
+        mu_aff=(np.dot((sl+alpha*dx)[L],(zl+alpha*dzl)[L])+np.dot((su-alpha*dx)[U],(zu+alpha*dzu)[U]))/n_bounds
+        sigma=(mu_aff/mu)**3
+        #corrector
+        dx,dy,dzl,dzu=step(sigma*mu-sl*zl-dx*dzl,sigma*mu-su*zu+dx*dzu)
+        alpha=min(1,0.995*step_length(dx,dzl,dzu))
+        x=x+alpha*dx
+        sl=sl+alpha*np.where(L,dx,0)
+        su=su-alpha*np.where(U,dx,0)
+        y=y+alpha*dy
+        zl=zl+alpha*dzl
+        zu=zu+alpha*dzu
+    return x,False
+############################################################
+class ScipySolver:
+    def __init__(self,timer=None):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        solves the instance in python without the ipopt executable and NL files: as an LP with the HiGHS solver of scipy
+        when the OF has no quadratic terms (only EC and CO2) and as a convex QP with solve_QP when it has (SC)
+        the constraints are extracted once (and again when reload is called), the mutable params (forecasts, initial SOCs, EV_er)
+        are only in the constants and bounds of the constraints and in the bounds of the variables, so only these rows and bounds
+        are evaluated again before every solve
+        timer (PhaseTimer): records the phases extract, update, run and load of every solve
+        """
+        self.constraints=None
+        self.updates=[]
+        self.bound_updates=[]
+        self.fixed_coefficients=True
+        self.params=None
+        self.timer=PhaseTimer() if timer is None else timer
+
+    def reload(self):
+        """
+        the constraints of the instance were built again
+        """
+        self.constraints=None
+
+    def extract_constraints(self,instance):
+        #one row per constraint: x - slack = 0 for the inequalities, the slack has the bounds of the constraint
+        #the mutable params are kept in the constants and bounds, the rows that have them are kept in updates
+        from pyomo.repn import generate_standard_repn
+        from pyomo.core.expr.numvalue import is_constant
+        variables=[v for v in instance.component_data_objects(Var) if not v.fixed]
+        index={id(v):k for k,v in enumerate(variables)}
+        rows=[];cols=[];vals=[];b=[];slack_lb=[];slack_ub=[]
+        self.updates=[]
+        self.fixed_coefficients=True
+        for con in instance.component_data_objects(Constraint,active=True):
+            repn=generate_standard_repn(con.body,compute_values=False)
+            if len(repn.linear_vars)==0:
+                continue
+            row=len(b)
+            for v,a in zip(repn.linear_vars,repn.linear_coefs):
+                if not is_constant(a):
+                    self.fixed_coefficients=False
+                rows.append(row);cols.append(index[id(v)]);vals.append(value(a))
+            constant=value(repn.constant)
+            lower=-np.inf if con.lower is None else value(con.lower)-constant
+            upper=np.inf if con.upper is None else value(con.upper)-constant
+            if con.equality:
+                column=-1
+                b.append(upper)
+            else:
+                column=len(variables)+len(slack_lb)
+                rows.append(row);cols.append(column);vals.append(-1)
+                b.append(0)
+                slack_lb.append(lower)
+                slack_ub.append(upper)
+            if not all(expr is None or is_constant(expr) for expr in [repn.constant,con.lower,con.upper]):
+                self.updates.append((row,column,repn.constant,con.lower,con.upper))
+        from scipy.sparse import coo_matrix
+        n=len(variables)+len(slack_lb)
+        A=coo_matrix((vals,(rows,cols)),shape=(len(b),n)).tocsc()
+        lb=np.array([-np.inf if v.lb is None else v.lb for v in variables]+slack_lb,dtype=float)
+        ub=np.array([np.inf if v.ub is None else v.ub for v in variables]+slack_ub,dtype=float)
+        #the variables with mutable params in their bounds (the SOCs of the EVs with EV_er)
+        self.bound_updates=[(k,v) for k,v in enumerate(variables) if not all(expr is None or is_constant(expr) for expr in [v.lower,v.upper])]
+        self.constraints=(variables,index,A,np.array(b,dtype=float),lb,ub)
+
+    def update_constants(self):
+        #the constants and bounds of the rows and the bounds of the variables with mutable params, with the current values of the params
+        variables,index,A,b,lb,ub=self.constraints
+        for row,column,constant,lower,upper in self.updates:
+            constant=value(constant)
+            if column<0:
+                b[row]=value(upper)-constant
+            else:
+                lb[column]=-np.inf if lower is None else value(lower)-constant
+                ub[column]=np.inf if upper is None else value(upper)-constant
+        for k,v in self.bound_updates:
+            lb[k]=-np.inf if v.lb is None else v.lb
+            ub[k]=np.inf if v.ub is None else v.ub
+
+    def solve(self,instance):
+        """
+        solves the instance and loads the solution into its variables
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.optimize import linprog
+        from pyomo.repn import generate_standard_repn
+        from pyomo.opt import SolverResults,SolverStatus,TerminationCondition
+        #a mutable param in a coefficient (not in this model) changes the matrix, then the constraints are extracted again when a param changed
+        #the mutable params of the OF (weights, base OFs and the penalties of Solve_stochastic and Solve_decomposed) do not change the constraints
+        params=None
+        if not self.fixed_coefficients:
+            params=[p.value for param in instance.component_objects(Param) if param.mutable and param.local_name not in ('w_OF_Grid','OF_Base','w_OF_EV','PH_W','PH_xbar','PH_rho','ADMM_v','ADMM_rho')
+                    for p in param.values()]
+        if self.constraints is None or params!=self.params:
+            with self.timer.phase('extract'):
+                self.extract_constraints(instance)
+            self.params=params
+        else:
+            with self.timer.phase('update'):
+                self.update_constants()
+        variables,index,A,b,lb,ub=self.constraints
+        n=A.shape[1]
+
+        objective=next(instance.component_data_objects(Objective,active=True))
+        repn=generate_standard_repn(objective.expr,compute_values=True,quadratic=True)
+        sense=1 if objective.sense==minimize else -1
+        c=np.zeros(n)
+        for v,a in zip(repn.linear_vars,repn.linear_coefs):
+            c[index[id(v)]]+=sense*a
+        results=SolverResults()
+        self.timer.start('run')
+        if len(repn.quadratic_vars)==0:
+            res=linprog(c,A_eq=A,b_eq=b,bounds=np.column_stack([lb,ub]),method='highs')
+            x=res.x
+            optimal=res.status==0
+        else:
+            qi=[index[id(v)] for v,w in repn.quadratic_vars]
+            qj=[index[id(w)] for v,w in repn.quadratic_vars]
+            Q=coo_matrix((sense*np.array(repn.quadratic_coefs),(qi,qj)),shape=(n,n))
+            H=(Q+Q.T).tocsc()
+            #the OF is scaled to coefficients of about 1, the base OFs make them very small
+            scale=max(np.max(np.abs(c),initial=0),np.max(np.abs(H.data),initial=0))
+            scale=1 if scale==0 else scale
+            x,optimal=solve_QP(H/scale,c/scale,A,b,lb,ub)
+        self.timer.stop()
+        if x is not None:
+            with self.timer.phase('load'):
+                for v,val in zip(variables,x):
+                    v.set_value(float(val),skip_validation=True)
+        if not optimal:
+            logger.warning('The scipy solver did not converge, the problem may be infeasible!')
+        results.solver.status=SolverStatus.ok if optimal else SolverStatus.warning
+        results.solver.termination_condition=TerminationCondition.optimal if optimal else TerminationCondition.other
+        return results
+############################################################
+class SolverSession:
+    def __init__(self,instance,solver='ipopt',warmstart=True,timer=None):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        keeps one solver alive for a chain of solves of the same instance, only the mutable params (weights, base OFs) change between the solves
+        parameters:
+        instance: the instance of the model
+        solver (str): the name of the solver, persistent solvers ('appsi_ipopt', 'gurobi_persistent', ...) keep the problem structure
+                      and only receive the changed params, 'ipopt' gets the primal/dual point of the previous solve as its starting point
+        warmstart (bool): start every solve after the first one from the solution of the previous solve
+        timer (PhaseTimer): records the phases of every solve, for the solvers that run an executable (ipopt, ...): write (the NL file),
+                            run (the solver process), read (the solution file) and load (the solution into the instance)
+        """
+        self.instance=instance
+        self.name=solver
+        self.warmstart=warmstart
+        self.n_solves=0
+        #True if the last solve found the optimum
+        self.optimal=None
+        #all the variables of the instance in one list, found at the first call of solution
+        self.variables=None
+        self.slices=None
+        self.timer=PhaseTimer() if timer is None else timer
+        if solver=='scipy':
+            #the python backend, it keeps the extracted constraints between the solves
+            self.solver=ScipySolver(self.timer)
+        else:
+            self.solver=SolverFactory(solver)
+            if self.timer.enabled and all(hasattr(self.solver,name) for name in ['_presolve','_apply_solver','_postsolve']):
+                #the steps of the solve of pyomo, timed on this solver and instance only
+                for name,phase in [('_presolve','write'),('_apply_solver','run'),('_postsolve','read')]:
+                    setattr(self.solver,name,self.timer.wrap(phase,getattr(self.solver,name)))
+                instance.solutions.load_from=self.timer.wrap('load',instance.solutions.load_from)
+        self.persistent=solver.startswith('appsi_') or solver.endswith('_persistent')
+        if self.persistent and not solver.startswith('appsi_'):
+            self.solver.set_instance(instance)
+        if self.warmstart and solver=='ipopt':
+            #suffixes to read the bound multipliers and duals from ipopt and to send them back at the next solve
+            instance.ipopt_zL_out = Suffix(direction=Suffix.IMPORT)
+            instance.ipopt_zU_out = Suffix(direction=Suffix.IMPORT)
+            instance.ipopt_zL_in = Suffix(direction=Suffix.EXPORT)
+            instance.ipopt_zU_in = Suffix(direction=Suffix.EXPORT)
+            instance.dual = Suffix(direction=Suffix.IMPORT_EXPORT)
+
+    def solve(self):
+        """
+        solves the instance with the current values of the mutable params
+        """
+        if self.n_solves>0 and self.warmstart and self.name=='ipopt':
+            #start from the last primal/dual point, the variables already hold the last primal point
+            self.instance.ipopt_zL_in.update(self.instance.ipopt_zL_out)
+            self.instance.ipopt_zU_in.update(self.instance.ipopt_zU_out)
+            self.solver.options['warm_start_init_point']='yes'
+            self.solver.options['warm_start_bound_push']=1e-6
+            self.solver.options['warm_start_mult_bound_push']=1e-6
+            self.solver.options['mu_init']=1e-6
+        if self.name.startswith('appsi_'):
+            if self.n_solves==1:
+                #the structure of the model does not change, only the params have to be updated
+                self.solver.update_config.check_for_new_or_removed_constraints=False
+                self.solver.update_config.check_for_new_or_removed_vars=False
+                self.solver.update_config.check_for_new_or_removed_params=False
+                self.solver.update_config.update_constraints=False
+                self.solver.update_config.update_vars=False
+                self.solver.update_config.update_named_expressions=False
+            results=self.solver.solve(self.instance)
+        elif self.persistent:
+            #the objective holds the mutable weights, so it is given to the solver again (OF or the objective of Solve_stochastic)
+            self.solver.set_objective(next(self.instance.component_data_objects(Objective,active=True)))
+            results=self.solver.solve(warmstart=self.warmstart and self.n_solves>0)
+        else:
+            results=self.solver.solve(self.instance)
+        self.n_solves+=1
+        #appsi gives the termination condition on the results, the other solvers (and ScipySolver) on results.solver
+        condition=results.termination_condition if self.name.startswith('appsi_') else results.solver.termination_condition
+        self.optimal=condition.name in ('optimal','locallyOptimal','globallyOptimal')
+        return results
+
+    def solution(self):
+        """
+        the values of all the variables in one array and the slice of every variable (by name) in it,
+        the values of a variable are in the order of its indices (t, n)
+        """
+        if self.variables is None:
+            #the variables of the instance do not change (Replan only builds constraints again), so the list is kept
+            self.variables=list(self.instance.component_data_objects(Var))
+            self.slices={}
+            start=0
+            for var in self.instance.component_objects(Var):
+                self.slices[var.local_name]=slice(start,start+len(var))
+                start+=len(var)
+        values=np.fromiter(map(attrgetter('value'),self.variables),dtype=float,count=len(self.variables))
+        return values,self.slices
+
+    def shift(self,Steps,n_Time_intervals):
+        """
+        the horizon moved by Steps time intervals, the point that the next solve starts from is shifted in the same way
+        """
+        variables=[var for var in self.instance.component_objects(Var)]
+        if self.warmstart and self.name=='ipopt':
+            suffixes=[self.instance.ipopt_zL_out,self.instance.ipopt_zU_out]
+        else:
+            suffixes=[]
+        for var in variables:
+            #every variable is indexed by the time intervals first, so n values belong to every time interval
+            data=list(var.values())
+            n=len(data)//n_Time_intervals
+            if n==0:
+                continue
+            values=[v.value for v in data]
+            values=values[Steps*n:]+values[-n:]*Steps
+            for v,val in zip(data,values):
+                #a fixed variable (a unit that is not connected) keeps its value
+                if not v.fixed:
+                    v.set_value(val,skip_validation=True)
+            for suffix in suffixes:
+                values=[suffix.get(v) for v in data]
+                values=values[Steps*n:]+values[-n:]*Steps
+                for v,val in zip(data,values):
+                    if val is not None:
+                        suffix[v]=val
+
+    def reload(self):
+        """
+        constraints of the instance were built again, the solver gets the whole instance again
+        """
+        if self.persistent:
+            self.solver.set_instance(self.instance)
+        if self.name=='scipy':
+            self.solver.reload()
+        if self.warmstart and self.name=='ipopt':
+            #the duals of the removed constraints are not needed anymore
+            self.instance.dual.clear()
+############################################################
+def base_OF_value(OF):
+    """
+    the value that the OF is scaled by in the weighted OF, a base OF of 0 (for example SC without load and PV) can not scale it, it is scaled by 1
+    """
+    return OF if abs(OF)>1e-9 else 1
+
+def solve_base_OF(MOEMS,i,OF_Base,start=None):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    solves the base problem of the OF number i in a worker process, the worker builds its own instance from the inputs of MOEMS
+    OF_Base (dict): the base OF values that the base problem depends on, the others are 1 as in Find_Base_OFs
+    start (list): the values of the variables to start from, as returned by an earlier call
+    returns the value of the OF, the values of all the variables and True if the solver found the optimum
+    """
+    instance=MOEMS.create_model()
+    session=SolverSession(instance,MOEMS.solver)
+    for j in instance.n_OF:
+        instance.OF_Base[j]=OF_Base.get(j,1)
+        instance.w_OF_Grid[j]=0
+    instance.w_OF_Grid[i]=1
+    if start is not None:
+        for v,val in zip(instance.component_data_objects(Var),start):
+            v.set_value(val,skip_validation=True)
+    session.solve()
+    return value(instance.OF),[v.value for v in instance.component_data_objects(Var)],session.optimal
+############################################################
+def Pareto_weights(n_OF,Step,total=100):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    all the weights of n_OF OFs with a step of Step that sum up to total
+    the weights are ordered as a path, so every weight vector is a neighbour of the previous one
+    """
+    if n_OF==1:
+        return [[total]]
+    weights=[]
+    for k,w in enumerate(np.arange(0,total+Step/2,Step)):
+        rest=Pareto_weights(n_OF-1,Step,total-w)
+        if k%2==1:
+            rest=rest[::-1]
+        weights+=[[w]+r for r in rest]
+    return weights
+############################################################
+def solve_Pareto_points(instance,session,points):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    solves the instance for the weights of every point in order, every solve starts from the solution of the previous one
+    points (list): (weights, start) pairs, weights are the weights of the grid OFs and start is the values of the variables to start from
+                   or None to start from the previous solution
+    returns the values of the OFs, the net power of the site, the power of the ESSs and the values of the variables for every point
+    """
+    variables=list(instance.component_data_objects(Var))
+    results=[]
+    for weights,start in points:
+        if start is not None:
+            for v,val in zip(variables,start):
+                v.set_value(val,skip_validation=True)
+        for i in instance.n_OF:
+            instance.w_OF_Grid[i]=weights[i-1]
+        session.solve()
+        OFs=[value(instance.OF_Grid[i]) for i in instance.n_OF]
+        #the net power of the site is the sum of all powers as allPowers of Find_results
+        allPowers=[value(instance.P_net[t]) for t in instance.t]
+        if len(instance.n_ess)>0:
+            ESS_P=[[value(instance.P_ESS[t,n]) for t in instance.t] for n in instance.n_ess]
+        else:
+            ESS_P=[[0]*len(instance.t)]
+        results.append((OFs,allPowers,ESS_P,[v.value for v in variables]))
+    return results
+############################################################
+def solve_Pareto_chunk(MOEMS,OF_Base,points):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    solves a chunk of the Pareto points in a worker process, the worker builds its own instance from the inputs of MOEMS
+    OF_Base (list): the base OFs found by Find_Base_OFs
+    """
+    instance=MOEMS.create_model()
+    session=SolverSession(instance,MOEMS.solver)
+    for i in instance.n_OF:
+        instance.OF_Base[i]=OF_Base[i-1]
+    return solve_Pareto_points(instance,session,points)
+############################################################
+def add_PH_objective(instance):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    adds the objective of the scenario problems of Solve_stochastic (progressive hedging) to the instance and deactivates OF
+    the first stage decisions are the powers of the ESSs, eBUSs and EVs in the first time interval, they get the penalty
+    PH_W*x + PH_rho/2*(x-PH_xbar)^2 with x in kW, PH_W and PH_xbar change for every scenario and iteration
+    returns the first stage variables
+    """
+    if instance.charger_sessions is not None:
+        #the charger formulation: the powers of the chargers
+        EV=[instance.P_charger[1,c] for c in instance.n_EV_charger]
+    elif instance.component('EV_connected') is not None:
+        #the session formulation: the powers of the EVs connected in the first time interval
+        EV=[instance.P_EV[t,n] for t,n in instance.EV_connected if t==1]
+    else:
+        EV=[instance.P_EV[1,n] for n in instance.n_EV]
+    first=[instance.P_ESS[1,n] for n in instance.n_ess]+[instance.P_eBUS[1,n] for n in instance.n_eBus]+EV
+    instance.n_PH=RangeSet(len(first))
+    instance.PH_W=Param(instance.n_PH,initialize=0,mutable=True)
+    instance.PH_xbar=Param(instance.n_PH,initialize=0,mutable=True)
+    instance.PH_rho=Param(initialize=0,mutable=True)
+    instance.OF_PH=Objective(expr=instance.OF.expr+sum(instance.PH_W[k]*first[k-1]/1000+instance.PH_rho/2*((first[k-1]-instance.PH_xbar[k])/1000)**2
+                                                       for k in instance.n_PH),sense=minimize)
+    instance.OF.deactivate()
+    return first
+
+def remove_PH_objective(instance):
+    #the instance as it was before add_PH_objective
+    for name in ['OF_PH','PH_W','PH_xbar','PH_rho','n_PH']:
+        instance.del_component(name)
+    instance.OF.activate()
+
+def solve_PH_scenario(instance,session,Load_P,PV_P,W,xbar,rho,start):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    solves one scenario of Solve_stochastic on the instance, only the forecasts and the penalties are changed
+    Load_P (array): the load with shape of (n_Time_intervals, ), PV_P (array): the PVs with shape of (n_Time_intervals, n_PV)
+    W, xbar (array): the penalties of the first stage decisions, rho (float): the weight of the quadratic penalty
+    start (array): the values of the variables to start from (as returned by SolverSession.solution) or None
+    returns the values of all the variables, the values of the grid OFs, the net power of the site, the value of OF (without the penalties)
+    and True if the solver found the optimum
+    """
+    T=len(instance.t)
+    instance.P_load.store_values(param_data(Load_P))
+    instance.PV.store_values(param_data(PV_P,(T,len(instance.n_pv))))
+    instance.PH_W.store_values(param_data(W))
+    instance.PH_xbar.store_values(param_data(xbar))
+    instance.PH_rho=rho
+    if start is not None:
+        if session.variables is None:
+            session.solution()
+        for v,val in zip(session.variables,start):
+            v.set_value(val,skip_validation=True)
+    session.solve()
+    values,slices=session.solution()
+    return (values,[value(instance.OF_Grid[i]) for i in instance.n_OF],np.array([value(instance.P_net[t]) for t in instance.t]),value(instance.OF.expr),
+            session.optimal)
+
+#the instance of a worker process of Solve_stochastic, it is built once and solves all the scenarios that the worker gets
+PH_worker={}
+
+def init_PH_worker(MOEMS,OF_Base,w_OF_Grid):
+    instance=MOEMS.Build()
+    for i in instance.n_OF:
+        instance.OF_Base[i]=OF_Base[i-1]
+        instance.w_OF_Grid[i]=w_OF_Grid[i-1]
+    add_PH_objective(instance)
+    PH_worker['instance']=instance
+    PH_worker['session']=MOEMS.session
+
+def solve_PH_worker(Load_P,PV_P,W,xbar,rho,start):
+    return solve_PH_scenario(PH_worker['instance'],PH_worker['session'],Load_P,PV_P,W,xbar,rho,start)
+############################################################
+def init_batch_worker(Executable_path):
+    #the solver executables of the batch are found by the worker processes only, the PATH of the caller is not changed
+    if Executable_path is not None:
+        os.environ['PATH']=str(Executable_path)+os.pathsep+os.environ['PATH']
+
+def solve_scenario(name,Scenario):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    solves one scenario of a Batch in a worker process, the messages (printed and logged) of ModelParameters are kept in the result
+    an input error (MOEMSInputError) or an exception only fails this scenario
+    """
+    import io,traceback
+    from contextlib import redirect_stdout
+    output=io.StringIO()
+    #the notes (INFO) of this scenario are kept too, the worker process only solves scenarios of the batch
+    handler=logging.StreamHandler(output)
+    level=logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    start=time.perf_counter()
+    try:
+        with redirect_stdout(output):
+            MOEMS=ModelParameters(Lazy=True,**Scenario)
+            optimal=MOEMS.Results()
+        OF={MOEMS.instance.OF_name[i]:value(MOEMS.instance.OF_Grid[i]) for i in MOEMS.instance.n_OF}
+        return {'name':name,'status':'ok' if optimal else 'not optimal','MOEMS':MOEMS,'OF':OF,'error':None,'output':output.getvalue(),
+                'time':time.perf_counter()-start}
+    except Exception as error:
+        #MOEMSInputError lists what is wrong with the inputs, the other errors keep their traceback
+        message=str(error) if isinstance(error,MOEMSInputError) else traceback.format_exc()
+        return {'name':name,'status':'failed','MOEMS':None,'OF':None,'error':message,'output':output.getvalue(),'time':time.perf_counter()-start}
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(level)
+############################################################
+class Batch:
+    def __init__(self,Scenarios,Workers:int=None,Executable_path=None):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        solves many sites or scenarios in worker processes, every scenario is one ModelParameters
+        Scenarios (list or dict): the inputs of ModelParameters of every scenario (a dict of the arguments), a dict gives the names of the scenarios,
+                                  a list names them by their position
+        Workers (int): the number of worker processes, default is the number of CPUs
+        Executable_path (str): the folder of the solver executable (ipopt), it is added to the PATH of the worker processes
+        outputs/varibales:
+        results (dict): name >> result of every scenario that is finished, see run
+        report (dict): scenarios, ok, not optimal (solved, but the solver did not find the optimum), failed, workers, wall (the time of the batch in s), busy (the summed time of the scenarios in s),
+                       throughput (scenarios per s) and parallelism (busy/wall, the mean number of scenarios that were solved at the same time)
+        """
+        if isinstance(Scenarios,dict):
+            self.Scenarios=dict(Scenarios)
+        else:
+            self.Scenarios=dict(enumerate(Scenarios))
+        self.Workers=os.cpu_count() if Workers is None else Workers
+        self.Executable_path=Executable_path
+        self.results={}
+        self.report={}
+
+    def run(self):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        solves the scenarios and gives back every result as soon as it is finished (a generator), the result is a dict:
+        name, status ('ok', 'not optimal' or 'failed'), MOEMS (the ModelParameters with the results, without its instance), OF (the values of the grid OFs),
+        error (the traceback or the reason of the failure), output (the messages of ModelParameters) and time (s)
+        only Workers scenarios are given to the workers at a time, so a worker process that dies (out of memory, ...) only
+        affects the scenarios that were running, they are solved again one by one and the one that kills its worker again fails
+        """
+        start=time.perf_counter()
+        waiting=list(self.Scenarios)
+        suspects=[]
+        while waiting or suspects:
+            if suspects:
+                #one scenario in its own worker process
+                names=[suspects.pop(0)]
+                size=1
+            else:
+                names=waiting
+                size=self.Workers
+            pool=ProcessPoolExecutor(max_workers=size,initializer=init_batch_worker,initargs=(self.Executable_path,))
+            running={}
+            broken=False
+            try:
+                while (names and not broken) or running:
+                    while names and not broken and len(running)<size:
+                        name=names.pop(0)
+                        running[pool.submit(solve_scenario,name,self.Scenarios[name])]=name
+                    done,_=wait(running,return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name=running.pop(future)
+                        try:
+                            result=future.result()
+                        except BrokenProcessPool:
+                            #the scenarios that were running are solved again, the others wait for a new pool
+                            broken=True
+                            if size>1:
+                                suspects.append(name)
+                                continue
+                            result={'name':name,'status':'failed','MOEMS':None,'OF':None,'error':'the worker process died','output':'','time':None}
+                        self.results[name]=result
+                        yield result
+            finally:
+                pool.shutdown(cancel_futures=True)
+        wall=time.perf_counter()-start
+        busy=sum(result['time'] or 0 for result in self.results.values())
+        ok=sum(result['status']=='ok' for result in self.results.values())
+        not_optimal=sum(result['status']=='not optimal' for result in self.results.values())
+        self.report={'scenarios':len(self.results),'ok':ok,'not optimal':not_optimal,'failed':len(self.results)-ok-not_optimal,
+                     'workers':self.Workers,'wall':wall,'busy':busy,
+                     'throughput':len(self.results)/wall if wall>0 else 0,'parallelism':busy/wall if wall>0 else 0}
+
+    def run_all(self):
+        """
+        solves all the scenarios, returns results (name >> result)
+        """
+        for result in self.run():
+            pass
+        return self.results
+############################################################
+class EVFleet:
+    def __init__(self,MOEMS):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        the EVs of MOEMS as arrays for the EV step of Solve_decomposed, the powers are in kW and the energies in kWh
+        (SOC also gives the SOC of the EVs of the charger formulation from their powers in W)
+        every EV has a box of powers in every time interval that it is connected (the 6A minimum or 95% of the maximum without
+        smart charging, its power is zero in the other intervals) and one energy window per session, a session lasts from a reset
+        of the SOC in the model (the first interval and the interval after a departure) to the next reset: the energy charged in it
+        is at most EV_er and at least 98% of EV_er if the EV departs in it
+        only the connected intervals are kept, in the order of the flattened (n_EV, n_Time_intervals) arrays
+        supported is False if a schedule gives SOC constraints that are not one window per session (a departure in the first 3 intervals)
+        """
+        T=MOEMS.n_Time_intervals
+        n=MOEMS.EV_n
+        self.shape=(n,T)
+        schedule=np.array(schedule_rows(MOEMS.EV_scedule,T,n),dtype=float).reshape(T,n).T
+        charger=np.array(MOEMS.EV_charger_ID,dtype=int)-1
+        max_charge=np.array(MOEMS.EV_max_charge,dtype=float)/1000
+        minimum=1440*np.array(MOEMS.EV_charger_phase,dtype=float)[charger]/1000
+        minimum=np.maximum(minimum,np.where(np.array(MOEMS.EV_smartcharge)=='yes',0,0.95*max_charge))
+        connected=schedule==1
+        self.index=np.flatnonzero(connected)
+        self.EV=self.index//T
+        self.lower=minimum[self.EV]
+        self.upper=max_charge[self.EV]
+        #the energy of 1 kW in one time interval
+        self.e=(np.array(MOEMS.EV_charge_efficiency,dtype=float)/100*MOEMS.Time_Resolution/60)[self.EV]
+
+        #the SOC starts again at the first interval and at an interval after a departure (from the fourth interval on)
+        change=np.diff(schedule,axis=1)
+        reset=np.zeros((n,T),dtype=bool)
+        reset[:,0]=True
+        reset[:,3:]=change[:,2:]==-1
+        #the EV departs after the interval (not the first or the last one)
+        departure=np.zeros((n,T),dtype=bool)
+        departure[:,1:T-1]=change[:,1:]==-1
+        #the session of every interval, the sessions without a connected interval are left out
+        self.resets=np.flatnonzero(reset)
+        session=np.cumsum(reset.ravel())-1
+        used,self.session=np.unique(session[self.index],return_inverse=True)
+        self.n_sessions=len(used)
+        self.starts=np.flatnonzero(np.diff(self.session,prepend=-1))
+        EV_er=np.array(MOEMS.EV_er,dtype=float)/1000
+        departures=np.bincount(session,weights=departure.ravel(),minlength=session[-1]+1 if n>0 else 0)[used]
+        self.energy_max=EV_er[self.EV[self.starts]]
+        self.energy_min=np.where(departures>0,0.98*self.energy_max,0)
+        #the SOC at the departure is the energy of the session if the EV is not connected after it before the next reset
+        position=np.arange(n*T)
+        last_departure=np.maximum.reduceat(np.where(departure.ravel(),position,-1)[self.index],self.starts) if n>0 else []
+        self.supported=bool(np.all(departures<=1) and np.all((departures==0) | (self.index[np.r_[self.starts[1:],len(self.index)]-1]==last_departure)))
+
+    def energy(self,x):
+        #the energy charged in every session
+        return np.bincount(self.session,weights=self.e*x,minlength=self.n_sessions)
+
+    def project(self,v,a,b,rho,iterations=50):
+        """
+        the powers of all the EVs that minimise a*x^2 + b*x + rho/2*(x-v)^2 in their boxes and energy windows
+        v, b (array): with shape of (n_EV, n_Time_intervals), a (array): with shape of (n_EV, ), rho (float)
+        the solution is x=clip((rho*v-b-lam*e)/(2a+rho)) with one multiplier lam per session, the energy of a session is linear in lam
+        between the bounds of its intervals, so lam is found by Newton steps (kept in a bracket) for all the sessions at once
+        returns the powers with shape of (n_EV, n_Time_intervals)
+        """
+        d=(2*np.asarray(a,dtype=float)+rho)[self.EV]
+        c=(rho*np.asarray(v,dtype=float)-b).ravel()[self.index]
+        def powers(lam):
+            return np.clip((c-lam[self.session]*self.e)/d,self.lower,self.upper)
+        lam=np.zeros(self.n_sessions)
+        x=powers(lam)
+        energy=self.energy(x)
+        high=energy>self.energy_max
+        low=energy<self.energy_min
+        if np.any(high | low):
+            #at lam_max all the powers of the session are at their lower bounds and at lam_min at their upper bounds
+            lam_max=np.maximum.reduceat((c-d*self.lower)/self.e,self.starts)
+            lam_min=np.minimum.reduceat((c-d*self.upper)/self.e,self.starts)
+            left=np.where(high,0,np.minimum(lam_min,0))
+            right=np.where(high,np.maximum(lam_max,0),0)
+            target=np.where(high,self.energy_max,np.where(low,self.energy_min,energy))
+            tolerance=1e-9*np.maximum(self.energy_max,1e-3)
+            for k in range(iterations):
+                miss=energy-target
+                if np.all(np.abs(miss)<=tolerance):
+                    break
+                #the energy falls with lam: the solution is above lam if too much is charged
+                left=np.where(miss>0,lam,left)
+                right=np.where(miss<0,lam,right)
+                slope=np.bincount(self.session,weights=np.where((x>self.lower) & (x<self.upper),self.e**2/d,0),minlength=self.n_sessions)
+                step=np.divide(miss,slope,out=np.full(self.n_sessions,np.inf),where=slope>0)
+                #a Newton step that leaves the bracket is replaced by the middle of the bracket
+                new=lam+step
+                lam=np.where((high | low) & ~((new>left) & (new<right)),(left+right)/2,np.where(high | low,new,0))
+                x=powers(lam)
+                energy=self.energy(x)
+        result=np.zeros(self.shape[0]*self.shape[1])
+        result[self.index]=x
+        return result.reshape(self.shape)
+
+    def SOC(self,x):
+        """
+        the SOC of the EVs in kWh for the powers x in kW with shape of (n_EV, n_Time_intervals), as EV_SOC of the model
+        """
+        charged=np.zeros(self.shape[0]*self.shape[1])
+        charged[self.index]=self.e*np.asarray(x,dtype=float).ravel()[self.index]
+        energy=np.cumsum(charged)
+        #the energy before every interval since the last reset, it does not fall as the powers are not negative
+        before=np.zeros_like(charged)
+        before[self.resets]=energy[self.resets]-charged[self.resets]
+        return (energy-np.maximum.accumulate(before)).reshape(self.shape)
+############################################################
+def add_ADMM_objective(instance):
+    """
+    @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+    makes an instance without EVs the site step of Solve_decomposed: EC and the grid limit are on the net power with the EVs,
+    so they are left to the grid step and P_grid_con and P_grid_pro are fixed to 0, the objective is the grid OFs SC and CO2
+    (on P_site as in OF) and the penalty ADMM_rho/2*(P_site-ADMM_v)^2 with P_site in kW
+    """
+    for name in ['Electricity_Cost_Constraint','Electricity_Cost_Constraint1','Power_Balance_Constraint','Power_Balance_Constraint1']:
+        if hasattr(instance,name):
+            getattr(instance,name).deactivate()
+    instance.P_grid_con.fix(0)
+    instance.P_grid_pro.fix(0)
+    instance.ADMM_v=Param(instance.t,initialize=0,mutable=True)
+    instance.ADMM_rho=Param(initialize=0,mutable=True)
+    instance.OF_ADMM=Objective(expr=sum(instance.w_OF_Grid[i]*instance.OF_Grid[i]/instance.OF_Base[i] for i in instance.n_OF if instance.OF_name[i]!='EC')
+                                    +instance.ADMM_rho/2*sum((instance.P_site[t]/1000-instance.ADMM_v[t])**2 for t in instance.t),sense=minimize)
+    instance.OF.deactivate()
 ############################################################
 class ModelParameters:
     def __init__(self,Time_Resolution:int=15,n_Time_intervals:int=96,Grid_max_in:int=None,Grid_max_out:int=None,Grid_OFs=None,
@@ -15,14 +1347,15 @@ class ModelParameters:
                 eBUS_max_discharge:int=None,eBUS_charge_efficiency=None,eBUS_discharge_efficiency=None,eBUS_round_trip_energy=None,
                 eBus_scedule=None,EV_er:int=None,EV_scedule=None,EV_max_charge:int=None,
                 EV_max_discharge:int=None,EV_charge_efficiency:int=None,EV_discharge_efficiency:int=None,EV_n_charger:int=None,
-                EV_charger_phase=None,EV_charger_ID:int=None,EV_OFs=None,EV_smartcharge=None,Solver='ipopt'):
+                EV_charger_phase=None,EV_charger_ID:int=None,EV_OFs=None,EV_smartcharge=None,Solver='ipopt',Grid_limit='unit',Workers:int=1,
+                Lazy:bool=False,Timing=False,Profile=None,EV_formulation='EV',EV_sessions=None,Forecast_start:int=0):
         """
         parameters:
         Time_Resolution (int): the time resolution of the model in minutes
         n_Time_intervals (int): the number of time intervals in one day
         Grid_max_in (int): the maximum power that can be injected to the grid in W
         Grid_max_out (int): the maximum power that can be taken from the grid in W
-        Grid_OFs (dict): the objective functions and their weights, the sum of weights should be 100%
+        Grid_OFs (dict): the objective functions and their weights, the sum of weights should be 100%, they are kept in the order SC, EC, CO2
         Load_P (array): the load profile in W with shape of (n_Time_intervals, n_loads) or (n_loads, n_Time_intervals) 
         PV_P (array): the PV predections in W with shape of (n_Time_intervals, n_PV) or (n_PV, n_Time_intervals)
         electricity_cost (array): the electricity cost predections in cost/Wh
@@ -40,7 +1373,7 @@ class ModelParameters:
         eBUS_charge_efficiency (array): the charge efficiency of eBUSs in % with shape of (n_eBUS, )
         eBUS_discharge_efficiency (array): the discharge efficiency of eBUSs in % with shape of (n_eBUS, )
         eBUS_round_trip_energy (array): the energy consumed by ebus for a round trip, in Wh with shape of (n_eBUS, )
-        eBus_scedule (array): the eBus_scedule in % with shape of (n_Time_intervals, n_eBUS) or (n_eBUS, n_Time_intervals)
+        eBus_scedule (array): the eBus_scedule in 0 and 1 with shape of (n_Time_intervals, n_eBUS) or (n_eBUS, n_Time_intervals), 1 while the eBUS is on a trip
         EV_er (array): the energy required by EVs in Wh with shape of (n_EV, )
         EV_scedule (array): the EV_scedule in 0 and 1 with shape of (n_Time_intervals, n_EV) or (n_EV, n_Time_intervals), 1 for connected to charger and 0 for not connected
         EV_max_charge (array): the maximum charge power of EVs in W with shape of (n_EV, )
@@ -49,15 +1382,38 @@ class ModelParameters:
         EV_discharge_efficiency (array): the discharge efficiency of EVs in % with shape of (n_EV, )
         EV_n_charger (int): the number of chargers in your grid
         EV_charger_phase (array): the phase of chargers with shape of (EV_n_charger, )
-        EV_charger_ID (array): the ID of chargers with shape of (n_EV, )
+        EV_charger_ID (array): the ID of chargers with shape of (n_EV, ), from 1 to EV_n_charger
         EV_OFs (array): the objective functions and their weights, the sum of weights should be 100% with shape of (n_EV, )
         EV_smartcharge (array): if the EV user asks for smart charging or not with shape of (n_EV, )
         Solver (str): the solver that you want to use, default is 'ipopt'
+                      'scipy' solves the model in python (scipy HiGHS for LPs, an interior point method for the QPs), without the ipopt executable
+        Grid_limit (str): how Grid_max_in and Grid_max_out are enforced, 'unit' (default) bounds every combination of one PV, ESS, eBUS and EV
+                          and 'aggregate' bounds the summed power of the site with one constraint per time interval
+        Workers (int): the number of worker processes that solve the base OF problems (SC, EC, CO2) at the same time, 1 solves them one after the other
+        Lazy (bool): if True, only the inputs are checked and kept, the model is built and solved by the stages Build, Solve and Results when they are called
+                     (or by the methods that need them), default is False: everything is done here
+        Timing (bool or str): True records the wall and CPU time of every phase of the run in timings, 'memory' also records the memory
+                              allocated in every phase (slower), default is False: nothing is recorded
+        Profile (dict): phase name >> file, the phases (for example {'solve':'solve.prof'}) are run under cProfile and the stats are written to the files
+        EV_formulation (str): 'EV' (default) gives every EV a power and a SOC in every time interval, 'charger' gives them to every charger
+                              and the sessions of the EVs are segments on their charger (at most one EV on a charger at a time),
+                              so the model grows with EV_n_charger instead of the number of EVs, the results are the same
+                              'session' gives every EV a power and a SOC only in the time intervals that it is connected, the results are the same
+        EV_sessions (list): the EVs as session records (arrival, departure, energy, charger) instead of EV_er, EV_scedule and EV_charger_ID,
+                            one EV per session: it is connected from the time interval arrival to departure-1 (from 0), energy is its EV_er in Wh
+                            and charger its EV_charger_ID, the other EV inputs (EV_max_charge, EV_charge_efficiency, ...) are given for every session
+        Forecast_start (int): the time interval (from 0) of the forecast archives where the horizon starts, Load_P, PV_P, electricity_cost_sell,
+                              electricity_cost_buy and CO2 can be archives: the path of a .npy file (memory mapped) or a .csv file (one row per time interval),
+                              a np.memmap or a ForecastArchive, only the window of n_Time_intervals from Forecast_start is read from them
+                              and Replan reads the next window from them instead of shifting the forecasts
+        all the inputs are checked together, if some are not correct MOEMSInputError is raised with what is wrong with every one of them
         
         outputs/varibales:
         instance: the instance of the model
         solver: the solver that you want to use
+        session: the solver session that solves the instance, it warm starts every solve from the previous one
         model: the model that you have created
+        the results are numpy arrays with shape of (n_units, n_Time_intervals) (one row of zeros if there is no unit) and allPowers with shape of (n_Time_intervals, )
         ESS_SOC: the SOC of ESSs
         ESS_P: the power of ESSs
         eBUS_SOC: the SOC of eBUSs
@@ -68,276 +1424,203 @@ class ModelParameters:
         EV_plan: the plan of EVs
         EV_SOC_discrete: the discrete SOC of EVs
         EV_P_discrete: the discrete power of EVs
+        Pareto_front: the Pareto front of the grid OFs, after Find_Pareto_front is called
+        timings: the times of the phases if Timing or Profile is given, phase name >> {'calls', 'wall', 'cpu'} (and 'allocated', 'peak' in bytes),
+                 the phases are configure, build/create_model, build/session, base_OFs/<OF name>, solve, results, results/discretization,
+                 replan, Pareto_front and save, every solve has the phases of SolverSession (write, run, read, load for ipopt, extract, run, load for scipy)
         """
 
 
 
+        ##timing of the phases
+        self.timer=PhaseTimer(Timing,Profile)
+        self.timings=self.timer.timings
+        self.timer.start('configure')
+
+        ##all the inputs are checked and normalised to contiguous arrays with the time intervals on the first axis,
+        #the problems of all the inputs are collected and raised together in one MOEMSInputError
+        problems=[]
+
         ##Time steps resolution
+        if not isinstance(n_Time_intervals,(int,np.integer)) or n_Time_intervals<1:
+            raise MOEMSInputError(['n_Time_intervals is not correct, please provide the number of time intervals as a positive integer'])
+        if not isinstance(Time_Resolution,(int,float,np.number)) or not Time_Resolution>0:
+            problems.append('Time_Resolution is not correct, please provide the time resolution in minutes as a positive number')
         self.Time_Resolution=Time_Resolution # minutes
         self.n_Time_intervals=n_Time_intervals # number of time intervals in one day
-
-        ##Loads
+        T=n_Time_intervals
+
+        ##forecast archives, only the window of the horizon is read (a .npy file or an array gives a view of the archive)
+        if not isinstance(Forecast_start,(int,np.integer)) or Forecast_start<0:
+            problems.append('Forecast_start is not correct, please provide the time interval of the archives where the horizon starts as an integer from 0')
+            Forecast_start=0
+        self.Forecast_start=Forecast_start
+        sources={'Load_P':Load_P,'PV_P':PV_P,'electricity_cost_sell':electricity_cost_sell,'electricity_cost_buy':electricity_cost_buy,'CO2':CO2}
+        forecasts,self.forecast_archives=forecast_windows(sources,Forecast_start,T,problems)
+        Load_P,PV_P,electricity_cost_sell,electricity_cost_buy,CO2=forecasts.values()
+        #the archives that can not be read are in problems already
+        unread={name for name,values in sources.items() if values is not None and forecasts[name] is None}
+
+        ##Loads, the loads are summed to one load
         if Load_P is None:
-            print('Load_P is not defined')
-            print("please provide the load profile in W with shape of (n_Time_intervals, n_loads) or (n_loads, n_Time_intervals)")
-            print("or provide empty list or array")
-            sys.exit()
-        
-        loadshape=np.shape(Load_P)
-        for i in range(len(loadshape)):
-            if loadshape[i] is not n_Time_intervals:
-                self.Load_N=loadshape[i]
-                index=i
-        
-        if self.Load_N==0:
-            self.Load_P=np.zeros((self.n_Time_intervals, 1))  #in W
+            if 'Load_P' not in unread:
+                problems.append('Load_P is not defined, please provide the load profile in W with shape of (n_Time_intervals, n_loads) or (n_loads, n_Time_intervals) or an empty list')
         else:
-            self.Load_P=np.sum(Load_P,axis=index)  #in W
+            Load_P=time_series(Load_P,T,'Load_P',problems,units=True)
+            self.Load_P=None if Load_P is None else Load_P.sum(axis=1)  #in W
         self.Load_n=1  #number of loads
-        
-
 
         ##PVs
         if PV_P is None:
-            print('PV_P is not defined')
-            print("please provide the PV predections in W with shape of (n_Time_intervals, n_PV) or (n_PV, n_Time_intervals)")
-            print("or provide empty list or array")
-            sys.exit()
-        
-        pvshape=np.shape(PV_P)
-        for i in range(len(pvshape)):
-            if pvshape[i] is not n_Time_intervals:
-                self.PV_n=pvshape[i] # number of PVs
-                index=i
-        if self.PV_n==0:
-            self.PV_P=np.zeros((self.n_Time_intervals, 1))
+            if 'PV_P' not in unread:
+                problems.append('PV_P is not defined, please provide the PV predections in W with shape of (n_Time_intervals, n_PV) or (n_PV, n_Time_intervals) or an empty list')
         else:
-            if index==1:
-                self.PV_P=PV_P   #in W 
+            PV_P=time_series(PV_P,T,'PV_P',problems,units=True)
+            if PV_P is not None:
+                self.PV_n=PV_P.shape[1] # number of PVs
+                self.PV_P=PV_P if self.PV_n>0 else np.zeros((T,1))   #in W
+
+        ##electricity cost and CO2 information
+        for name,values,text in [('electricity_cost_sell',electricity_cost_sell,'the electricity cost predections in cost/Wh'),
+                                 ('electricity_cost_buy',electricity_cost_buy,'the electricity cost predections in cost/Wh'),
+                                 ('CO2',CO2,'the CO2 predections in gCO2/Wh')]:
+            if values is None:
+                if name not in unread:
+                    problems.append('%s is not defined, please provide %s with shape of (n_Time_intervals, )' % (name,text))
             else:
-                self.PV_P=np.transpose(PV_P) 
-        
-
-
-        ##electricity cost information
-        if electricity_cost_sell is None:
-            print('electricity_cost is not defined')
-            print("please provide the electricity cost predections in cost/Wh with shape of (n_Time_intervals, )")
-            sys.exit()
-        self.E_cost_sell=electricity_cost_sell #in cost_unit/Wh for selling to the grid
-        if electricity_cost_buy is None:
-            print('electricity_cost is not defined')
-            print("please provide the electricity cost predections in cost/Wh with shape of (n_Time_intervals, )")
-            sys.exit()
-        self.E_cost_buy=electricity_cost_buy #in cost_unit/Wh for buying from the grid
-
-
-        ##CO2
-        if CO2 is None:
-            print('CO2 is not defined')
-            print("please provide the CO2 predections in gCO2/Wh with shape of (n_Time_intervals, )")
-            sys.exit()
-        self.CO2=CO2 #in gCO2/Wh
-
+                values=time_series(values,T,name,problems)
+            if name=='CO2':
+                self.CO2=values #in gCO2/Wh
+            elif name=='electricity_cost_sell':
+                self.E_cost_sell=values #in cost_unit/Wh for selling to the grid
+            else:
+                self.E_cost_buy=values #in cost_unit/Wh for buying from the grid
 
         ##ESS >>parameters
         if ESS_capacity is None:
-            print('ESS_capacity is not defined!')
+            logger.info('ESS_capacity is not defined!')
             ESS_capacity=[]
-        else:
-            if len(ESS_capacity)==0:
-                print('No ESS in your grid')
-        self.ESS_capacity=ESS_capacity    #in Wh and it should be a list with shape of (n_ESS, )
-        self.ESS_n=len(self.ESS_capacity) #number of ESSs
-        
+        elif np.size(ESS_capacity)==0:
+            logger.info('No ESS in your grid')
+        self.ESS_n=np.size(ESS_capacity) #number of ESSs
+        #in Wh, %, W and % with shape of (n_ESS, )
+        for name,values,text,low,high,strict in [('ESS_capacity',ESS_capacity,'the capacity of ESSs in Wh',0,np.inf,True),
+                                                 ('ESS_SOC_init',ESS_SOC_init,'the initial SOC of ESSs in %',0,100,False),
+                                                 ('ESS_max_charge',ESS_max_charge,'the maximum charge power of ESSs in W',0,np.inf,False),
+                                                 ('ESS_max_discharge',ESS_max_discharge,'the maximum discharge power of ESSs in W',0,np.inf,False),
+                                                 ('ESS_charge_efficiency',ESS_charge_efficiency,'the charge efficiency of ESSs in %',0,100,True),
+                                                 ('ESS_discharge_efficiency',ESS_discharge_efficiency,'the discharge efficiency of ESSs in %',0,100,True)]:
+            setattr(self,name,unit_values([] if self.ESS_n==0 else values,self.ESS_n,name,text,problems,low,high,strict))
 
-        if self.ESS_n==0:
-            self.ESS_SOC_init=[]   #in % and it should be a list with shape of (n_ESS, )
-            self.ESS_max_charge=[] #in W and it should be a list with shape of (n_ESS, )
-            self.ESS_max_discharge= [] #in W and it should be a list with shape of (n_ESS, )
-            self.ESS_charge_efficiency=[] #in % and it should be a list with shape of (n_ESS, )
-            self.ESS_discharge_efficiency=[] #in % and it should be a list with shape of (n_ESS, )
-            
-        else:
-            if ESS_SOC_init is None:
-                print('ESS_SOC_init is not defined')
-                print("please provide the initial SOC of ESSs in % with shape of (n_ESS, )")
-                sys.exit()
-            self.ESS_SOC_init=ESS_SOC_init   #in % and it should be a list with shape of (n_ESS, )
-            if ESS_max_charge is None:
-                print('ESS_max_charge is not defined')
-                print("please provide the maximum charge power of ESSs in W with shape of (n_ESS, )")
-                sys.exit()
-            self.ESS_max_charge=ESS_max_charge #in W and it should be a list with shape of (n_ESS, )
-            if ESS_max_discharge is None:
-                print('ESS_max_discharge is not defined')
-                print("please provide the maximum discharge power of ESSs in W with shape of (n_ESS, )")
-                sys.exit()
-            self.ESS_max_discharge= ESS_max_discharge #in W and it should be a list with shape of (n_ESS, )
-            if ESS_charge_efficiency is None:
-                print('ESS_charge_efficiency is not defined')
-                print("please provide the charge efficiency of ESSs in % with shape of (n_ESS, )")
-                sys.exit()
-            self.ESS_charge_efficiency=ESS_charge_efficiency #in % and it should be a list with shape of (n_ESS, )
-            if ESS_discharge_efficiency is None:
-                print('ESS_discharge_efficiency is not defined')
-                print("please provide the discharge efficiency of ESSs in % with shape of (n_ESS, )")
-                sys.exit()
-            self.ESS_discharge_efficiency=ESS_discharge_efficiency #in % and it should be a list with shape of (n_ESS, )
-            
         ##ESS >> Variables
         self.ESS_SOC=[]
         self.ESS_P=[]
 
-        
-        
         ##eBUS >> parameters
         if eBUS_capacity is None:
-            print('eBUS_capacity is not defined!')
+            logger.info('eBUS_capacity is not defined!')
             eBUS_capacity=[]
-        else:
-            if len(eBUS_capacity)==0:
-                print('No eBUS in your grid')
-
-        self.eBUS_capacity=eBUS_capacity  #in Wh and it should be a list with shape of (n_eBUS, )
-        self.eBUS_n=len(self.eBUS_capacity) #number of eBUSs
-        if self.eBUS_n==0:
-            self.eBUS_SOC_init=[]
-            self.eBUS_max_charge=[]
-            self.eBUS_max_discharge=[]
-            self.eBUS_charge_efficiency=[]
-            self.eBUS_discharge_efficiency=[]
-            self.eBUS_round_trip_energy=[]
-            self.eBus_scedule=[]
-        else:
-            if eBUS_SOC_init is None:
-                print('eBUS_SOC_init is not defined')
-                print("please provide the initial SOC of eBUSs in % with shape of (n_eBUS, )")
-                sys.exit()
-            self.eBUS_SOC_init= eBUS_SOC_init #in % and it should be a list with shape of (n_eBUS, )
-            if eBUS_max_charge is None:
-                print('eBUS_max_charge is not defined')
-                print("please provide the maximum charge power of eBUSs in W with shape of (n_eBUS, )")
-                sys.exit()
-            self.eBUS_max_charge=eBUS_max_charge  #in W and it should be a list with shape of (n_eBUS, )
-            if eBUS_max_discharge is None:
-                print('eBUS_max_discharge is not defined')
-                print("please provide the maximum discharge power of eBUSs in W with shape of (n_eBUS, )")
-                sys.exit()
-            self.eBUS_max_discharge=eBUS_max_discharge  #in W and it should be a list with shape of (n_eBUS, )
-            if eBUS_charge_efficiency is None:
-                print('eBUS_charge_efficiency is not defined')
-                print("please provide the charge efficiency of eBUSs in % with shape of (n_eBUS, )")
-                sys.exit()
-            self.eBUS_charge_efficiency=eBUS_charge_efficiency  #in % and it should be a list with shape of (n_eBUS, )
-            if eBUS_discharge_efficiency is None:
-                print('eBUS_discharge_efficiency is not defined')
-                print("please provide the discharge efficiency of eBUSs in % with shape of (n_eBUS, )")
-                sys.exit()
-            self.eBUS_discharge_efficiency=eBUS_discharge_efficiency #in % and it should be a list with shape of (n_eBUS, )
-            if eBUS_round_trip_energy is None:
-                print('eBUS_round_trip_energy is not defined')
-                print("please provide the energy consumed by ebus for a round trip, in Wh with shape of (n_eBUS, )")
-                sys.exit()
-            self.eBUS_round_trip_energy=eBUS_round_trip_energy  # the energy consumed by ebus for a round trip, in Wh and it should be a list with shape of (n_eBUS, )
+        elif np.size(eBUS_capacity)==0:
+            logger.info('No eBUS in your grid')
+        self.eBUS_n=np.size(eBUS_capacity) #number of eBUSs
+        #in Wh, %, W, %, % and Wh with shape of (n_eBUS, )
+        for name,values,text,low,high,strict in [('eBUS_capacity',eBUS_capacity,'the capacity of eBUSs in Wh',0,np.inf,True),
+                                                 ('eBUS_SOC_init',eBUS_SOC_init,'the initial SOC of eBUSs in %',0,100,False),
+                                                 ('eBUS_max_charge',eBUS_max_charge,'the maximum charge power of eBUSs in W',0,np.inf,False),
+                                                 ('eBUS_max_discharge',eBUS_max_discharge,'the maximum discharge power of eBUSs in W',0,np.inf,False),
+                                                 ('eBUS_charge_efficiency',eBUS_charge_efficiency,'the charge efficiency of eBUSs in %',0,100,True),
+                                                 ('eBUS_discharge_efficiency',eBUS_discharge_efficiency,'the discharge efficiency of eBUSs in %',0,100,True),
+                                                 ('eBUS_round_trip_energy',eBUS_round_trip_energy,'the energy consumed by ebus for a round trip, in Wh',0,np.inf,False)]:
+            setattr(self,name,unit_values([] if self.eBUS_n==0 else values,self.eBUS_n,name,text,problems,low,high,strict))
+        #1 while the eBUS is on a trip, with shape of (n_Time_intervals, n_eBUS)
+        self.eBus_scedule=np.zeros((T,0),dtype=np.int8)
+        if self.eBUS_n>0:
             if eBus_scedule is None:
-                print('eBus_scedule is not defined')
-                print("please provide the eBus_scedule in % with shape of (n_Time_intervals, n_eBUS) or (n_eBUS, n_Time_intervals)")
-                sys.exit()
-            eBus_shape=np.shape(eBus_scedule)
-            if eBus_shape[0] is not n_Time_intervals:
-                self.eBus_scedule=np.transpose(eBus_scedule)
-            self.eBus_scedule=eBus_scedule
-        
+                problems.append('eBus_scedule is not defined, please provide the eBus_scedule in 0 and 1 with shape of (n_Time_intervals, n_eBUS) or (n_eBUS, n_Time_intervals)')
+            else:
+                self.eBus_scedule=time_series(eBus_scedule,T,'eBus_scedule',problems,units=True,dtype=np.int8,schedule=True)
+                if self.eBus_scedule is not None and self.eBus_scedule.shape[1]!=self.eBUS_n:
+                    problems.append('eBus_scedule has %d eBUSs, please provide the eBus_scedule of the %d eBUSs of eBUS_capacity' % (self.eBus_scedule.shape[1],self.eBUS_n))
+
         ##eBUS Variables
         self.eBUS_SOC=[]
         self.eBUS_P=[]
 
-
-
         ##Grid parameters
-        if Grid_max_in is None:
-            print('Grid_max_in is not defined')
-            print("please provide the maximum power of the grid in W")
-            sys.exit()
+        for name,values in [('Grid_max_in',Grid_max_in),('Grid_max_out',Grid_max_out)]:
+            if values is None:
+                problems.append('%s is not defined, please provide the maximum power of the grid in W' % name)
+            elif not isinstance(values,(int,float,np.number)) or not values>=0:
+                problems.append('%s is not correct, please provide the maximum power of the grid in W as a non negative number' % name)
         self.Grid_max_in=Grid_max_in #in W
-
-        if Grid_max_out is None:
-            print('Grid_max_out is not defined')
-            print("please provide the maximum power of the grid in W")
-            sys.exit()
         self.Grid_max_out=Grid_max_out #in W
         ##Grid Variables
         self.allPowers=[]
 
-        ##OFs
+        ##OFs, always in the order SC, EC, CO2 (an OF that is not given has the weight 0), the weights of the model are read in this order
+        def OF_weights(OFs,name):
+            if not isinstance(OFs,dict) or any(key not in ['SC','EC','CO2'] for key in OFs):
+                problems.append("%s is not correct, please provide the OFs and their weights, example: {'SC':43,'EC':33,'CO2':24}" % name)
+                return None
+            weights=unit_values([OFs.get(key,0) for key in ['SC','EC','CO2']],3,name,'the weights of the OFs in %',problems,0)
+            return None if weights is None else dict(zip(['SC','EC','CO2'],weights.tolist()))
         if Grid_OFs is None:
-            print('OFs is not defined')
-            print("please provide the OFs")
-            print("example: {'SC':43,'EC':33,'CO2':24}")
-            sys.exit()
-        if len(Grid_OFs)<3:
-            sc=Grid_OFs.get('SC')
-            if sc is None:
-                sc=0
-            ec=Grid_OFs.get('EC')
-            if ec is None:
-                ec=0
-            co2=Grid_OFs.get('CO2')
-            if co2 is None:
-                co2=0
-            self.Grid_OFs={'SC':sc,'EC':ec,'CO2':co2}
+            problems.append("OFs is not defined, please provide the OFs, example: {'SC':43,'EC':33,'CO2':24}")
+            self.Grid_OFs=None
         else:
-            self.Grid_OFs=Grid_OFs #the objective functions and their weights, the sum of weights should be 100%
-        
+            self.Grid_OFs=OF_weights(Grid_OFs,'Grid_OFs') #the objective functions and their weights, the sum of weights should be 100%
+            if self.Grid_OFs is not None and sum(self.Grid_OFs.values())<=0:
+                problems.append('Grid_OFs is not correct, please provide at least one positive weight')
 
         ##EVs >> parameters
-        if EV_er is None:
-            print('No EV is charging!')
+        if EV_sessions is not None:
+            #one EV per session, its schedule is made from the session
+            try:
+                EV_er,EV_scedule,EV_charger_ID=EV_session_records(EV_sessions,n_Time_intervals)
+            except MOEMSInputError as error:
+                problems+=error.problems
+                EV_er=[]
+        elif EV_er is None:
+            logger.info('No EV is charging!')
             EV_er=[]
-        self.EV_er=EV_er  #in Wh and it should be a list with shape of (n_EV, )
-        self.EV_n=len(self.EV_er) #number of EVs
-        if self.EV_n==0:
-            self.EV_scedule=[]
-            self.EV_max_charge=[]
-            self.EV_max_discharge=[]
-            self.EV_charge_efficiency=[]
-            self.EV_discharge_efficiency=[]
-            self.EV_n_charger=0
-            self.EV_charger_ID=[]
-            self.EV_OFs=[]
-            self.EV_smartcharge=[]
-        else:
-            shapeschedule=np.shape(EV_scedule)
-            for i in range(len(shapeschedule)):
-                if shapeschedule[i] is not n_Time_intervals:
-                    index=i
-            if index==0:
-                self.EV_scedule=np.transpose(EV_scedule)
+        self.EV_n=np.size(EV_er) #number of EVs
+        n=self.EV_n
+        if n==0:
+            EV_n_charger=0
+        elif not isinstance(EV_n_charger,(int,np.integer)) or EV_n_charger<1:
+            problems.append('EV_n_charger is not correct, please provide the number of chargers in your grid as a positive integer')
+            EV_n_charger=0
+        self.EV_n_charger=EV_n_charger #number of chargers in your grid and it should be an integer
+        #in Wh, W, W, %, % with shape of (n_EV, ), the phases of the chargers with shape of (EV_n_charger, ) and the chargers (from 1) of the EVs
+        for name,values,text,n_units,low,high,strict,dtype in [('EV_er',EV_er,'the energy required by EVs in Wh',n,0,np.inf,False,np.float64),
+                                                               ('EV_max_charge',EV_max_charge,'the maximum charge power of EVs in W',n,0,np.inf,True,np.float64),
+                                                               ('EV_max_discharge',EV_max_discharge,'the maximum discharge power of EVs in W',n,0,np.inf,False,np.float64),
+                                                               ('EV_charge_efficiency',EV_charge_efficiency,'the charge efficiency of EVs in %',n,0,100,True,np.float64),
+                                                               ('EV_discharge_efficiency',EV_discharge_efficiency,'the discharge efficiency of EVs in %',n,0,100,True,np.float64),
+                                                               ('EV_charger_phase',EV_charger_phase,'the phase of chargers',EV_n_charger,0,np.inf,True,np.int64),
+                                                               ('EV_charger_ID',EV_charger_ID,'the ID of the charger of every EV',n,1,max(EV_n_charger,1),False,np.int64)]:
+            setattr(self,name,unit_values([] if n==0 else values,n_units,name,text,problems,low,high,strict,dtype))
+        #1 while the EV is connected to its charger, with shape of (n_Time_intervals, n_EV)
+        self.EV_scedule=np.zeros((T,0),dtype=np.int8)
+        if n>0:
+            if EV_scedule is None:
+                problems.append('EV_scedule is not defined, please provide the EV_scedule in 0 and 1 with shape of (n_Time_intervals, n_EV) or (n_EV, n_Time_intervals)')
             else:
-                self.EV_scedule=EV_scedule # shape is (n_Time_intervals, n_EV) or (n_EV, n_Time_intervals) and if connected to charger 1 and if not 0
-            
-            self.EV_max_charge=EV_max_charge  #in W and it should be a list with shape of (n_EV, )
-            self.EV_max_discharge=EV_max_discharge #in W and it should be a list with shape of (n_EV, )
-            self.EV_charge_efficiency=EV_charge_efficiency #in % and it should be a list with shape of (n_EV, )
-            self.EV_discharge_efficiency=EV_discharge_efficiency #in % and it should be a list with shape of (n_EV, )
-            self.EV_n_charger=EV_n_charger #number of chargers in your grid and it should be an integer
-            self.EV_charger_phase=EV_charger_phase #the phase of chargers and it should be a list with shape of (EV_n_charger, )
-            self.EV_charger_ID=EV_charger_ID #the ID of chargers and it should be a list with shape of (n_EV, )
-
-            for i in range(self.EV_n):
-                sc=EV_OFs[i].get('SC')
-                if sc is None:
-                    sc=0
-                ec=EV_OFs[i].get('EC')
-                if ec is None:
-                    ec=0
-                co2=EV_OFs[i].get('CO2')
-                if co2 is None:
-                    co2=0
-                EV_OFs[i]={'SC':sc,'EC':ec,'CO2':co2}
-            self.EV_OFs=EV_OFs #the objective functions and their weights, the sum of weights should be 100% and it should be a list with shape of (n_EV, )
-            self.EV_smartcharge=EV_smartcharge #if the EV user asks for smart charging or not and it should be a list with shape of (n_EV, )
+                self.EV_scedule=time_series(EV_scedule,T,'EV_scedule',problems,units=True,dtype=np.int8,schedule=True)
+                if self.EV_scedule is not None and self.EV_scedule.shape[1]!=n:
+                    problems.append('EV_scedule has %d EVs, please provide the EV_scedule of the %d EVs of EV_er' % (self.EV_scedule.shape[1],n))
+        #the objective functions and their weights of every EV in the order SC, EC, CO2, and if the EV user asks for smart charging or not
+        self.EV_OFs=[]
+        self.EV_smartcharge=[]
+        if n>0:
+            if EV_OFs is None or len(EV_OFs)!=n:
+                problems.append("EV_OFs is not correct, please provide the OFs and their weights of every EV with shape of (%d, ), example: {'SC':50,'EC':50}" % n)
+            else:
+                self.EV_OFs=[OF_weights(OFs,'EV_OFs of EV %d' % (i+1)) for i,OFs in enumerate(EV_OFs)]
+            if EV_smartcharge is None or len(EV_smartcharge)!=n or any(smart not in ['yes','no'] for smart in EV_smartcharge):
+                problems.append("EV_smartcharge is not correct, please provide 'yes' or 'no' for every EV with shape of (%d, )" % n)
+            else:
+                self.EV_smartcharge=list(EV_smartcharge)
         self.chargingPowers=np.multiply([6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32],230)
         
         
@@ -352,21 +1635,123 @@ class ModelParameters:
         ## Model parameters
         self.instance=[]
         self.solver=Solver
+        if Grid_limit not in ['unit','aggregate']:
+            problems.append("Grid_limit is not defined correctly, please provide 'unit' or 'aggregate'")
+        self.Grid_limit=Grid_limit
+        if EV_formulation not in ['EV','charger','session']:
+            problems.append("EV_formulation is not defined correctly, please provide 'EV', 'charger' or 'session'")
+        if not isinstance(Workers,(int,np.integer)) or Workers<1:
+            problems.append('Workers is not correct, please provide the number of worker processes as a positive integer')
+        if EV_formulation=='charger' and not problems:
+            #the sessions on the chargers are checked here, the model finds them again when it is built
+            try:
+                charger_sessions(schedule_rows(self.EV_scedule,n_Time_intervals,self.EV_n),self.EV_charger_ID,self.EV_n_charger,n_Time_intervals)
+            except MOEMSInputError as error:
+                problems+=error.problems
+        if problems:
+            self.timer.stop()
+            raise MOEMSInputError(problems)
+        self.EV_formulation=EV_formulation
+        self.Workers=Workers
+        #every time interval is one interval of Time_Resolution, Solve_aggregated gives its reduced model longer ones
+        self.Interval_lengths=None
+
+        ## Stages: configure (here) >> Build >> Solve >> Results, every stage is done once and kept
+        self.model=None
+        self.instance=None
+        self.session=None
+        self.Base_OFs_found=False
+        self.Base_OFs_optimal=None
+        self.solved=False
+        self.optimal=None
+        self.extracted=False
+        self.timer.stop()
+        if not Lazy:
+            self.Build()
+            self.Find_Base_OFs()
+            self.Find_results()
 
-        ## Model
-        self.model=self.create_model()
+        
 
-        ## Results
-        #create instance of the model
-        self.instance = self.model.create_instance()
-        self.Find_Base_OFs()
-        self.Find_results()
+    def __getstate__(self):
+        #the model can not be pickled (its rules are local functions), worker processes build their own model from the inputs
+        state=self.__dict__.copy()
+        for name in ['model','instance','session','timer']:
+            state.pop(name,None)
+        return state
+
+    def __setstate__(self,state):
+        #the copy is not built, the results that were found are kept
+        self.__dict__.update(state)
+        self.model=None
+        self.instance=None
+        self.session=None
+        #the copy (a worker process) does not time its phases
+        self.timer=PhaseTimer()
+        self.Base_OFs_found=False
+        self.solved=False
+
+    def Build(self):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
 
-        
+        builds the model and its solver session, if they are not built yet
+        returns the instance
+        """
+        if self.instance is None:
+            with self.timer.phase('build'):
+                with self.timer.phase('create_model'):
+                    self.model=self.create_model()
+                #the model is concrete, so it is its own instance
+                self.instance=self.model
+                #one solver session for all the solves of the instance
+                with self.timer.phase('session'):
+                    self.session=SolverSession(self.instance,self.solver,timer=self.timer)
+        return self.instance
+
+    def Solve(self):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        builds the model if needed, finds the base OFs if they are not found yet and solves the model with the weights of Grid_OFs
+        if it is not solved yet, the results are found by Results
+        returns (and keeps in optimal) True if the solver found the optimum of the base problems and the model, False if it did not
+        (the solution of the solver is kept, the solver logs why it stopped)
+        """
+        self.Build()
+        if not self.Base_OFs_found:
+            self.Find_Base_OFs()
+        if not self.solved:
+            #assign the weights of the OFs into the model
+            wofs=[self.Grid_OFs.get('SC'),self.Grid_OFs.get('EC'),self.Grid_OFs.get('CO2')]
+            for i in range(len(self.Grid_OFs)):
+                self.instance.w_OF_Grid[i+1]=wofs[i]
+            #solve the model
+            with self.timer.phase('solve'):
+                self.session.solve()
+            self.solved=True
+            self.extracted=False
+            self.optimal=self.Base_OFs_optimal and self.session.optimal
+        return self.optimal
+
+    def Results(self):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        solves the model if needed and fills the outputs (ESS_P, ESS_SOC, ..., allPowers) with the solution, if they are not filled yet
+        returns optimal as Solve
+        """
+        if not self.extracted:
+            self.Solve()
+            with self.timer.phase('results'):
+                self.Extract_results()
+        return self.optimal
 
     def create_model(self):
         # Create model
-        model = AbstractModel()
+        # the model is concrete: every parameter is filled in bulk from the arrays held on self,
+        # so no python callback is evaluated per index while the model is built
+        model = ConcreteModel()
         ############################################################
         # Define sets
         model.t = RangeSet(self.n_Time_intervals) #range for time intervals
@@ -379,52 +1764,69 @@ class ModelParameters:
         model.n_EV_charger = RangeSet(self.EV_n_charger) #range for EV chargers
         ############################################################
         # Define parameters
+        #the schedules have n_Time_intervals x n_units entries, they are used as fixed data in the rules instead of Params
+        eBus_scedule=schedule_rows(self.eBus_scedule,self.n_Time_intervals,self.eBUS_n)
+        #the session formulation only reads the connected intervals of the EVs, Replan builds its model again for a new schedule
+        sparse=self.EV_formulation=='session'
+        connected=EV_connected_intervals(self.EV_scedule,self.n_Time_intervals,self.EV_n) if sparse else None
+        EV_scedule=None if sparse else schedule_rows(self.EV_scedule,self.n_Time_intervals,self.EV_n)
+        if sparse:
+            #the connected (t, n_EV) of the EVs
+            model.EV_connected = Set(dimen=2, initialize=connected['index'])
+        #Replan changes the schedules in place and builds the constraints that depend on them again
+        model.schedule_rows={'eBUS':eBus_scedule,'EV':EV_scedule}
+        model.schedule_constraints={}
+        model.schedule_expressions={}
+        model.schedule_bounds={}
+        #the charger formulation reads the sessions of the EVs on the chargers, Replan finds them again for a new schedule
+        charger=self.EV_formulation=='charger'
+        sessions=charger_sessions(EV_scedule,self.EV_charger_ID,self.EV_n_charger,self.n_Time_intervals) if charger else None
+        model.charger_sessions=sessions
+        #forecasts, initial SOCs and energy required by the EVs are mutable, Replan changes them
         #OFs
-        OF_name=[]
-        for i in range(len(self.Grid_OFs)):
-            OF_name.append(list(self.Grid_OFs.keys())[i])
-        model.OF_name = Param(model.n_OF, within=Any,initialize=lambda model, n_OF: OF_name[n_OF-1])
+        model.OF_name = Param(model.n_OF, within=Any,initialize=param_data(list(self.Grid_OFs.keys())))
         #grid params
         model.grid_max_in = Param(initialize=self.Grid_max_in)
         model.grid_max_out = Param(initialize=self.Grid_max_out)
         #electricity price
-        model.E_cost_sell = Param(model.t, initialize=lambda model, t: self.E_cost_sell[t-1])
-        model.E_cost_buy = Param(model.t, initialize=lambda model, t: self.E_cost_buy[t-1])
+        model.E_cost_sell = Param(model.t, initialize=param_data(self.E_cost_sell),mutable=True)
+        model.E_cost_buy = Param(model.t, initialize=param_data(self.E_cost_buy),mutable=True)
         #co2
-        model.CO2 = Param(model.t, initialize=lambda model, t: self.CO2[t-1])
+        model.CO2 = Param(model.t, initialize=param_data(self.CO2),mutable=True)
         #load
-        model.P_load = Param(model.t, initialize=lambda model, t: self.Load_P[t-1])
+        model.P_load = Param(model.t, initialize=param_data(self.Load_P),mutable=True)
         #pv
-        model.PV = Param(model.t,model.n_pv, initialize=lambda model, t,n_pv: self.PV_P[t-1][n_pv-1])
+        model.PV = Param(model.t,model.n_pv, initialize=param_data(self.PV_P,(self.n_Time_intervals,self.PV_n)),mutable=True)
         #ess
-        model.ESS_capacity = Param(model.n_ess,initialize=lambda model,n_ess: self.ESS_capacity[n_ess-1])
-        model.ESS_SOC_init = Param(model.n_ess,initialize=lambda model,n_ess: self.ESS_SOC_init[n_ess-1])
-        model.ESS_max_charge = Param(model.n_ess,initialize=lambda model,n_ess: self.ESS_max_charge[n_ess-1])
-        model.ESS_max_discharge = Param(model.n_ess,initialize=lambda model,n_ess: self.ESS_max_discharge[n_ess-1])
-        model.ESS_charge_efficiency = Param(model.n_ess,initialize=lambda model,n_ess: self.ESS_charge_efficiency[n_ess-1])
-        model.ESS_discharge_efficiency = Param(model.n_ess,initialize=lambda model,n_ess: self.ESS_discharge_efficiency[n_ess-1])
+        model.ESS_capacity = Param(model.n_ess,initialize=param_data(self.ESS_capacity))
+        model.ESS_SOC_init = Param(model.n_ess,initialize=param_data(self.ESS_SOC_init),mutable=True)
+        model.ESS_max_charge = Param(model.n_ess,initialize=param_data(self.ESS_max_charge))
+        model.ESS_max_discharge = Param(model.n_ess,initialize=param_data(self.ESS_max_discharge))
+        model.ESS_charge_efficiency = Param(model.n_ess,initialize=param_data(self.ESS_charge_efficiency))
+        model.ESS_discharge_efficiency = Param(model.n_ess,initialize=param_data(self.ESS_discharge_efficiency))
         #eBUS
-        model.eBus_scedule = Param(model.t,model.n_eBus, initialize=lambda model, t,n_eBus: self.eBus_scedule[t-1][n_eBus-1])
-        model.eBUS_capacity = Param(model.n_eBus ,initialize=lambda model,n_eBus: self.eBUS_capacity[n_eBus-1])
-        model.eBUS_max_charge = Param(model.n_eBus ,initialize=lambda model,n_eBus: self.eBUS_max_charge[n_eBus-1])
-        model.eBUS_max_discharge = Param(model.n_eBus ,initialize=lambda model,n_eBus: self.eBUS_max_discharge[n_eBus-1])
-        model.eBUS_charge_efficiency = Param(model.n_eBus ,initialize=lambda model,n_eBus: self.eBUS_charge_efficiency[n_eBus-1])
-        model.eBUS_discharge_efficiency = Param(model.n_eBus ,initialize=lambda model,n_eBus: self.eBUS_discharge_efficiency[n_eBus-1])
-        model.eBUS_round_trip_energy = Param(model.n_eBus ,initialize=lambda model,n_eBus: self.eBUS_round_trip_energy[n_eBus-1])
-        model.eBUS_SOC_init = Param(model.n_eBus, initialize=lambda model,n_eBus: self.eBUS_SOC_init[n_eBus-1])
+        model.eBUS_capacity = Param(model.n_eBus ,initialize=param_data(self.eBUS_capacity))
+        model.eBUS_max_charge = Param(model.n_eBus ,initialize=param_data(self.eBUS_max_charge))
+        model.eBUS_max_discharge = Param(model.n_eBus ,initialize=param_data(self.eBUS_max_discharge))
+        model.eBUS_charge_efficiency = Param(model.n_eBus ,initialize=param_data(self.eBUS_charge_efficiency))
+        model.eBUS_discharge_efficiency = Param(model.n_eBus ,initialize=param_data(self.eBUS_discharge_efficiency))
+        model.eBUS_round_trip_energy = Param(model.n_eBus ,initialize=param_data(self.eBUS_round_trip_energy))
+        model.eBUS_SOC_init = Param(model.n_eBus, initialize=param_data(self.eBUS_SOC_init),mutable=True)
         #EV
-        model.EV_scedule = Param(model.t,model.n_EV, initialize=lambda model, t,n_EV: self.EV_scedule[t-1][n_EV-1])
-        model.EV_er=Param(model.n_EV, initialize=lambda model,n_EV: self.EV_er[n_EV-1])
-        model.EV_charger_ID=Param(model.n_EV, initialize=lambda model,n_EV: self.EV_charger_ID[n_EV-1])
+        model.EV_er=Param(model.n_EV, initialize=param_data(self.EV_er),mutable=True)
+        model.EV_charger_ID=Param(model.n_EV, initialize=param_data(self.EV_charger_ID))
 
         
-        model.EV_max_charge = Param(model.n_EV, initialize=lambda model,n_EV_charger: self.EV_max_charge[n_EV_charger-1])
-        model.EV_max_discharge = Param(model.n_EV, initialize=lambda model,n_EV_charger: self.EV_max_discharge[n_EV_charger-1])
-        model.EV_charge_efficiency = Param(model.n_EV, initialize=lambda model,n_EV_charger: self.EV_charge_efficiency[n_EV_charger-1])
-        model.EV_discharge_efficiency = Param(model.n_EV, initialize=lambda model,n_EV_charger: self.EV_discharge_efficiency[n_EV_charger-1])
-        model.Charger_n_phase = Param(model.n_EV_charger, initialize=lambda model,n_EV_charger: self.EV_charger_phase[n_EV_charger-1])
+        model.EV_max_charge = Param(model.n_EV, initialize=param_data(self.EV_max_charge))
+        model.EV_max_discharge = Param(model.n_EV, initialize=param_data(self.EV_max_discharge))
+        model.EV_charge_efficiency = Param(model.n_EV, initialize=param_data(self.EV_charge_efficiency))
+        model.EV_discharge_efficiency = Param(model.n_EV, initialize=param_data(self.EV_discharge_efficiency))
+        model.Charger_n_phase = Param(model.n_EV_charger, initialize=param_data(self.EV_charger_phase))
         #time
         model.deltaT=Param(initialize=self.Time_Resolution/60)
+        #the number of intervals of Time_Resolution in every time interval, they are longer in the reduced model of Solve_aggregated
+        #and weight the OFs and the energies (1 is left out of the expressions by pyomo)
+        length=[1]*self.n_Time_intervals if self.Interval_lengths is None else list(self.Interval_lengths)
         model.n_Time_intervals=Param(initialize=self.n_Time_intervals)
         ############################################################
         # Define variables
@@ -435,8 +1837,17 @@ class ModelParameters:
         model.P_eBUS = Var(model.t,model.n_eBus)#,within=NonNegativeReals, bounds=(0*model.eBUS_max_charge, model.eBUS_max_charge))
         model.SOC_eBUS = Var(model.t,model.n_eBus, within=NonNegativeReals)#, bounds=(model.eBUS_round_trip_energy, model.eBUS_capacity))
         #EV
-        model.P_EV = Var(model.t,model.n_EV)#,
-        model.EV_SOC = Var(model.t,model.n_EV, within=NonNegativeReals)
+        if charger:
+            #one power and SOC per charger, the EV on the charger has its power and SOC
+            model.P_charger = Var(model.t,model.n_EV_charger)
+            model.SOC_charger = Var(model.t,model.n_EV_charger, within=NonNegativeReals)
+        elif sparse:
+            #the power and SOC of an EV only while it is connected
+            model.P_EV = Var(model.EV_connected)
+            model.EV_SOC = Var(model.EV_connected, within=NonNegativeReals)
+        else:
+            model.P_EV = Var(model.t,model.n_EV)#,
+            model.EV_SOC = Var(model.t,model.n_EV, within=NonNegativeReals)
         
         ##aggregate power var for buying or selling from the grid
         model.P_grid_con = Var(model.t, within=NonNegativeReals)  # power consumed from the grid
@@ -453,74 +1864,72 @@ class ModelParameters:
         list_EV_wOFs=[]
         for i in range(self.EV_n):
             list_EV_wOFs.append([self.EV_OFs[i].get('SC'),self.EV_OFs[i].get('EC'),self.EV_OFs[i].get('CO2')])
-        model.w_OF_EV=Param(model.n_EV,model.n_OF, initialize=lambda model, n_EV,n_OF: list_EV_wOFs[n_EV-1][n_OF-1],mutable=True)
-        model.EV_smartchargeing=Param(model.n_EV,initialize=lambda model, n_EV: self.EV_smartcharge[n_EV-1],mutable=True)
+        model.w_OF_EV=Param(model.n_EV,model.n_OF, initialize=param_data(list_EV_wOFs,(self.EV_n,len(self.Grid_OFs))),mutable=True)
+        model.EV_smartchargeing=Param(model.n_EV,initialize=param_data(self.EV_smartcharge),mutable=True)
         
+        ############################################################
+        ## Define expressions
+        #the aggregate powers are built once per time interval and shared by the objective function and the constraints
+        #positive power means consumption and negative power means production
+        def P_site_rule(model, t):
+            #power of the site without EVs: loads - PVs + ESSs + eBUSs
+            return sum(model.P_load[t] for n in model.n_l) - sum(model.PV[t,n] for n in model.n_pv) + sum(model.P_ESS[t,n] for n in model.n_ess) + sum(model.P_eBUS[t,n] for n in model.n_eBus)
+        model.P_site = Expression(model.t, rule=P_site_rule)
+
+        def P_net_rule(model, t):
+            #net power of the site including EVs, it is the power exchanged with the grid
+            if charger:
+                return model.P_site[t] + sum(model.P_charger[t,c] for c in model.n_EV_charger)
+            if sparse:
+                return model.P_site[t] + sum(model.P_EV[t,n] for n in connected['EVs'][t-1])
+            return model.P_site[t] + sum(model.P_EV[t,n] for n in model.n_EV)
+        model.P_net = Expression(model.t, rule=P_net_rule)
+
+        def OF_Grid_rule(model, i):
+            #value of the grid objective functions
+            if model.OF_name[i]=='CO2':
+                return sum(length[t-1]*model.P_site[t] * model.CO2[t] for t in model.t) #CO2 minimization
+            elif model.OF_name[i]=='SC':
+                return sum(length[t-1]*model.P_site[t]**2 for t in model.t) #self consumption maximization
+            elif model.OF_name[i]=='EC':
+                return sum(length[t-1]*(model.P_grid_con[t]*model.E_cost_buy[t]-model.P_grid_pro[t]*model.E_cost_sell[t]) for t in model.t) #electricity cost minimization
+        model.OF_Grid = Expression(model.n_OF, rule=OF_Grid_rule)
+
+        def EV_powers(model, n_EV):
+            #the time intervals and powers of an EV, in the charger formulation only the connected intervals of its charger
+            if charger:
+                c=sessions['charger'][n_EV-1]
+                return [(t,model.P_charger[t,c]) for t in sessions['intervals'][n_EV-1]]
+            if sparse:
+                return [(t,model.P_EV[t,n_EV]) for t in connected['intervals'][n_EV-1]]
+            return [(t,model.P_EV[t,n_EV]) for t in model.t]
+
+        def OF_EV_rule(model, n_EV, i):
+            #value of the objective functions for every EV, note that EC is extra just for making sure the EV is charging in the cheapest time
+            if model.OF_name[i]=='CO2':
+                return sum(length[t-1]*P * model.CO2[t] for t,P in EV_powers(model,n_EV))
+            elif model.OF_name[i]=='SC':
+                return sum(length[t-1]*P**2 for t,P in EV_powers(model,n_EV))
+            elif model.OF_name[i]=='EC':
+                return sum(length[t-1]*P * model.E_cost_buy[t] for t,P in EV_powers(model,n_EV))
+        model.OF_EV = Expression(model.n_EV, model.n_OF, rule=OF_EV_rule)
+        if charger:
+            #the connected intervals change with the schedule, Replan gives the expressions their new terms
+            model.schedule_expressions['OF_EV']=OF_EV_rule
+
         ############################################################
         ## Define objective function
         def OF_cost_rule(model):
-            if len(model.n_l.data())<1:
-                p_loads = [[0 for t in model.t] for n in range(1)]
-            else:
-                p_loads = [[model.P_load[t] for t in model.t] for n in model.n_l]
-            if len(model.n_pv.data())<1:
-                p_PV= [[0 for t in model.t] for n in range(1)]
-            else:
-                p_PV = [[model.PV[t,n] for t in model.t] for n in model.n_pv]
-            if len(model.n_ess.data())<1:
-                p_ESS= [[0 for t in model.t] for n in range(1)]
-            else:
-                p_ESS = [[model.P_ESS[t,n] for t in model.t] for n in model.n_ess]
-            if len(model.n_eBus.data())<1:
-                p_eBUS= [[0 for t in model.t] for n in range(1)]
-            else:
-                p_eBUS = [[model.P_eBUS[t,n] for t in model.t] for n in model.n_eBus]
-            if len(model.n_EV.data())<1:
-                p_EV= [[0 for t in model.t] for n in range(1)]
-            else:
-                p_EV = [[model.P_EV[t,n] for t in model.t] for n in model.n_EV]
-            # allPowers=np.sum([np.sum(p_loads,axis=0),np.sum(p_EV,axis=0),np.sum(p_eBUS,axis=0),np.sum(p_ESS,axis=0),np.multiply(np.sum(p_PV,axis=0),-1)],axis=0)
-            allPowers=np.sum([np.sum(p_loads,axis=0),np.sum(p_eBUS,axis=0),np.sum(p_ESS,axis=0),np.multiply(np.sum(p_PV,axis=0),-1)],axis=0)
-            
             OF=0
-            for i in range(1,len(model.OF_name)+1):
-                if model.OF_name[i]=='CO2':
-                    OFv=sum((allPowers[t-1]) * model.CO2[t] for t in model.t) #CO2 minimization
-                    OFv_EV=[]
-                    if len(model.n_EV.data())>1:
-                        for EVn in range(len(model.n_EV.data())):
-                            OFv_EV.append(sum((p_EV[EVn][t-1]) * model.CO2[t] for t in model.t))
-                    else:
-                        OFv_EV=[0]
-                elif model.OF_name[i]=='SC':
-                    OFv=sum((allPowers[t-1])**2 for t in model.t) #self consumption maximization
-                    OFv_EV=[]
-                    if len(model.n_EV.data())>1:
-                        for EVn in range(len(model.n_EV.data())):
-                            OFv_EV.append(sum((p_EV[EVn][t-1])**2 for t in model.t))
-                    else:
-                        OFv_EV=[0]
-                elif model.OF_name[i]=='EC':
-                    #grid cost
-                    OFv=sum(model.P_grid_con[t]*model.E_cost_buy[t]-model.P_grid_pro[t]*model.E_cost_sell[t] for t in model.t) #electricity cost minimization
-                    
-                    #cost related to EVs, note that this is extra just for making sure the EV is charging in the cheapest time
-                    OFv_EV=[]
-                    if len(model.n_EV.data())>1:
-                        for EVn in range(len(model.n_EV.data())):
-                            OFv_EV.append(sum((p_EV[EVn][t-1]) * model.E_cost_buy[t] for t in model.t))
-                    else:
-                        OFv_EV=[0]
-                
-                if len(model.n_EV.data())>1:
-                    OF=OF+model.w_OF_Grid[i]*OFv/model.OF_Base[i]
-                    for EVn in range(1,len(model.n_EV.data())+1):
+            for i in model.n_OF:
+                OF=OF+model.w_OF_Grid[i]*model.OF_Grid[i]/model.OF_Base[i]
+                #the EV terms are only added for more than one EV
+                if len(model.n_EV)>1:
+                    for EVn in model.n_EV:
                         if model.EV_smartchargeing[EVn]()=='yes':
-                            OF=OF+model.w_OF_EV[EVn,i]*OFv_EV[EVn-1]/model.OF_Base[i]
+                            OF=OF+model.w_OF_EV[EVn,i]*model.OF_EV[EVn,i]/model.OF_Base[i]
                         else:
-                            OF=OF+model.w_OF_Grid[i]*OFv_EV[EVn-1]/model.OF_Base[i]
-                else:
-                    OF=OF+model.w_OF_Grid[i]*OFv/model.OF_Base[i]
+                            OF=OF+model.w_OF_Grid[i]*model.OF_EV[EVn,i]/model.OF_Base[i]
             return OF
         model.OF = Objective(rule=OF_cost_rule,sense = minimize)
         ############################################################
@@ -529,121 +1938,97 @@ class ModelParameters:
 
         ##electricity cost constraint
         if True: 
-            #for model.P_grid_con >= allPowers
+            #for model.P_grid_con >= P_net
             def Electricity_Cost_Constraint_rule(model, t):
-                if len(model.n_l.data())<1:
-                    p_loads = [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_loads = [[model.P_load[t] for t in model.t] for n in model.n_l]
-                if len(model.n_pv.data())<1:
-                    p_PV= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_PV = [[model.PV[t,n] for t in model.t] for n in model.n_pv]
-                if len(model.n_ess.data())<1:
-                    p_ESS= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_ESS = [[model.P_ESS[t,n] for t in model.t] for n in model.n_ess]
-                if len(model.n_eBus.data())<1:
-                    p_eBUS= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_eBUS = [[model.P_eBUS[t,n] for t in model.t] for n in model.n_eBus]
-                if len(model.n_EV.data())<1:
-                    p_EV= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_EV = [[model.P_EV[t,n] for t in model.t] for n in model.n_EV]
-                # allPowers=np.sum([np.sum(p_loads,axis=0),np.sum(p_EV,axis=0),np.sum(p_eBUS,axis=0),np.sum(p_ESS,axis=0),np.multiply(np.sum(p_PV,axis=0),-1)],axis=0)
-                allPowers=np.sum([np.sum(p_EV,axis=0),np.sum(p_loads,axis=0),np.sum(p_eBUS,axis=0),np.sum(p_ESS,axis=0),np.multiply(np.sum(p_PV,axis=0),-1)],axis=0)
-                
-                return model.P_grid_con[t] >= allPowers[t-1]
+                return model.P_grid_con[t] >= model.P_net[t]
             model.Electricity_Cost_Constraint = Constraint(model.t, rule=Electricity_Cost_Constraint_rule)
-            
-            
-            #for model.P_grid_pro <= allPowers
+
+        if False:
+            #not needed, it is implied by the link constraint below together with P_grid_con>=0
+            #for model.P_grid_pro <= P_net
             def Electricity_Cost_Constraint_rule1(model, t):
-                if len(model.n_l.data())<1:
-                    p_loads = [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_loads = [[model.P_load[t] for t in model.t] for n in model.n_l]
-                if len(model.n_pv.data())<1:
-                    p_PV= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_PV = [[model.PV[t,n] for t in model.t] for n in model.n_pv]
-                if len(model.n_ess.data())<1:
-                    p_ESS= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_ESS = [[model.P_ESS[t,n] for t in model.t] for n in model.n_ess]
-                if len(model.n_eBus.data())<1:
-                    p_eBUS= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_eBUS = [[model.P_eBUS[t,n] for t in model.t] for n in model.n_eBus]
-                if len(model.n_EV.data())<1:
-                    p_EV= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_EV = [[model.P_EV[t,n] for t in model.t] for n in model.n_EV]
-                # allPowers=np.sum([np.sum(p_loads,axis=0),np.sum(p_EV,axis=0),np.sum(p_eBUS,axis=0),np.sum(p_ESS,axis=0),np.multiply(np.sum(p_PV,axis=0),-1)],axis=0)
-                allPowers=np.sum([np.sum(p_EV,axis=0),np.sum(p_loads,axis=0),np.sum(p_eBUS,axis=0),np.sum(p_ESS,axis=0),np.multiply(np.sum(p_PV,axis=0),-1)],axis=0)
-                
-                return model.P_grid_pro[t] <= allPowers[t-1]
+                return model.P_grid_pro[t] <= model.P_net[t]
             model.Electricity_Cost_Constraint1 = Constraint(model.t, rule=Electricity_Cost_Constraint_rule1)
-            
-            
-            
+
+        if True:
             #for link between P_grid_con and P_grid_pro
             def Electricity_Cost_Constraint_rule2(model, t):
-                if len(model.n_l.data())<1:
-                    p_loads = [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_loads = [[model.P_load[t] for t in model.t] for n in model.n_l]
-                if len(model.n_pv.data())<1:
-                    p_PV= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_PV = [[model.PV[t,n] for t in model.t] for n in model.n_pv]
-                if len(model.n_ess.data())<1:
-                    p_ESS= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_ESS = [[model.P_ESS[t,n] for t in model.t] for n in model.n_ess]
-                if len(model.n_eBus.data())<1:
-                    p_eBUS= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_eBUS = [[model.P_eBUS[t,n] for t in model.t] for n in model.n_eBus]
-                if len(model.n_EV.data())<1:
-                    p_EV= [[0 for t in model.t] for n in range(1)]
-                else:
-                    p_EV = [[model.P_EV[t,n] for t in model.t] for n in model.n_EV]
-                # allPowers=np.sum([np.sum(p_loads,axis=0),np.sum(p_EV,axis=0),np.sum(p_eBUS,axis=0),np.sum(p_ESS,axis=0),np.multiply(np.sum(p_PV,axis=0),-1)],axis=0)
-                allPowers=np.sum([np.sum(p_EV,axis=0),np.sum(p_loads,axis=0),np.sum(p_eBUS,axis=0),np.sum(p_ESS,axis=0),np.multiply(np.sum(p_PV,axis=0),-1)],axis=0)
-                
-                return model.P_grid_pro[t]+model.P_grid_con[t] == allPowers[t-1]
+                return model.P_grid_pro[t]+model.P_grid_con[t] == model.P_net[t]
             model.Electricity_Cost_Constraint1 = Constraint(model.t, rule=Electricity_Cost_Constraint_rule2)
                 
 
         ## Grid constraints
-        if True:
+        if self.Grid_limit=='unit' and not charger and not sparse:
             #power balance between load, PV, eBus, EV, ESS and the power of the grid
             def Power_Balance_Constraint_rule(model, t,n_pv,n_ess,n_eBus,n_EV):
                 return (-model.grid_max_out,model.P_load[t]-model.PV[t,n_pv] + model.P_ESS[t,n_ess]+ model.P_eBUS[t,n_eBus]+ model.P_EV[t,n_EV], model.grid_max_in)
             model.Power_Balance_Constraint = Constraint(model.t,model.n_pv,model.n_ess,model.n_eBus,model.n_EV, rule=Power_Balance_Constraint_rule)
 
         
-        if True:
             #power balance between load, eBus, EV, ESS and the power of the grid
             def Power_Balance_Constraint_rule1(model, t,n_ess,n_eBus,n_EV):
                 return (-model.grid_max_out,model.P_load[t] + model.P_ESS[t,n_ess]+ model.P_eBUS[t,n_eBus]+ model.P_EV[t,n_EV], model.grid_max_in)
             model.Power_Balance_Constraint1 = Constraint(model.t,model.n_ess,model.n_eBus,model.n_EV, rule=Power_Balance_Constraint_rule1)
 
+        if self.Grid_limit=='unit' and charger:
+            #the rows of the EV formulation without the repeated ones: one for every charger with an EV and one without EV (index 0)
+            #if an EV is not connected in the time interval
+            model.n_EV_charger_site = RangeSet(0,self.EV_n_charger)
+            def charger_power(model, t, c):
+                if c==0:
+                    return 0 if sessions['idle'][t-1] else None
+                return model.P_charger[t,c] if sessions['EV'][t-1][c-1]>0 else None
+
+            def Power_Balance_Constraint_rule(model, t,n_pv,n_ess,n_eBus,c):
+                P=charger_power(model,t,c)
+                if P is None:
+                    return Constraint.Skip
+                return (-model.grid_max_out,model.P_load[t]-model.PV[t,n_pv] + model.P_ESS[t,n_ess]+ model.P_eBUS[t,n_eBus]+ P, model.grid_max_in)
+            model.Power_Balance_Constraint = Constraint(model.t,model.n_pv,model.n_ess,model.n_eBus,model.n_EV_charger_site, rule=Power_Balance_Constraint_rule)
+            model.schedule_constraints['Power_Balance_Constraint']=((model.t,model.n_pv,model.n_ess,model.n_eBus,model.n_EV_charger_site),Power_Balance_Constraint_rule)
+
+            def Power_Balance_Constraint_rule1(model, t,n_ess,n_eBus,c):
+                P=charger_power(model,t,c)
+                if P is None:
+                    return Constraint.Skip
+                return (-model.grid_max_out,model.P_load[t] + model.P_ESS[t,n_ess]+ model.P_eBUS[t,n_eBus]+ P, model.grid_max_in)
+            model.Power_Balance_Constraint1 = Constraint(model.t,model.n_ess,model.n_eBus,model.n_EV_charger_site, rule=Power_Balance_Constraint_rule1)
+            model.schedule_constraints['Power_Balance_Constraint1']=((model.t,model.n_ess,model.n_eBus,model.n_EV_charger_site),Power_Balance_Constraint_rule1)
+
+        if self.Grid_limit=='unit' and sparse:
+            #the rows of the EV formulation without the repeated ones: one for every connected EV and one without EV (index 0)
+            #if an EV is not connected in the time interval
+            model.EV_site = Set(dimen=2, initialize=[(t,n) for t in model.t for n in ([0] if len(connected['EVs'][t-1])<self.EV_n else [])+connected['EVs'][t-1]])
+            def Power_Balance_Constraint_rule(model, t,n_EV,n_pv,n_ess,n_eBus):
+                P=model.P_EV[t,n_EV] if n_EV>0 else 0
+                return (-model.grid_max_out,model.P_load[t]-model.PV[t,n_pv] + model.P_ESS[t,n_ess]+ model.P_eBUS[t,n_eBus]+ P, model.grid_max_in)
+            model.Power_Balance_Constraint = Constraint(model.EV_site,model.n_pv,model.n_ess,model.n_eBus, rule=Power_Balance_Constraint_rule)
+
+            def Power_Balance_Constraint_rule1(model, t,n_EV,n_ess,n_eBus):
+                P=model.P_EV[t,n_EV] if n_EV>0 else 0
+                return (-model.grid_max_out,model.P_load[t] + model.P_ESS[t,n_ess]+ model.P_eBUS[t,n_eBus]+ P, model.grid_max_in)
+            model.Power_Balance_Constraint1 = Constraint(model.EV_site,model.n_ess,model.n_eBus, rule=Power_Balance_Constraint_rule1)
+
+        if self.Grid_limit=='aggregate':
+            #the net power of the whole site is limited by the grid connection, one row per time interval
+            def Power_Balance_Constraint_rule(model, t):
+                return (-model.grid_max_out, model.P_net[t], model.grid_max_in)
+            model.Power_Balance_Constraint = Constraint(model.t, rule=Power_Balance_Constraint_rule)
+
         ## ESS constraints
         if True:
             #power limit of the ESS  >>    model.P_ESS[t,n_ess] > 0 means charge 
-            def ESS_power_Constraint_rule(model, t,n_ess):
-                return (-model.ESS_max_discharge[n_ess], model.P_ESS[t,n_ess], model.ESS_max_charge[n_ess])
-            model.ESS_power_Constraint = Constraint(model.t,model.n_ess, rule=ESS_power_Constraint_rule)
+            #the limits of a single variable are its bounds, they are not rows of the model
+            def ESS_power_bounds_rule(model, t,n_ess):
+                return (-model.ESS_max_discharge[n_ess], model.ESS_max_charge[n_ess])
+            set_bounds(model.P_ESS, ESS_power_bounds_rule)
         
         if False:
             #power change limit of the ESS  >>    model.P_ESS[t,n_ess] can not change when EV charging 
             def ESS_power_Constraint_rule1(model, t,n_ess, n_EV):
                 if t==model.t.first():
                     return Constraint.Skip
-                if model.EV_scedule[t,n_EV]==1:
+                if EV_scedule[t-1][n_EV-1]==1:
                     return (-model.ESS_max_discharge[n_ess], model.P_ESS[t,n_ess], 0.1)
                 else:
                     return Constraint.Skip
@@ -651,9 +2036,9 @@ class ModelParameters:
     
         if True:
             #SOC limit of the ESS
-            def ESS_SOC_Constraint_rule(model, t,n_ess):
-                return (0.2*model.ESS_capacity[n_ess], model.ESS_SOC[t,n_ess], 0.9*model.ESS_capacity[n_ess])
-            model.ESS_SOC_Constraint = Constraint(model.t,model.n_ess, rule=ESS_SOC_Constraint_rule)
+            def ESS_SOC_bounds_rule(model, t,n_ess):
+                return (0.2*model.ESS_capacity[n_ess], 0.9*model.ESS_capacity[n_ess])
+            set_bounds(model.ESS_SOC, ESS_SOC_bounds_rule)
         
         if True:
             # State of charge of the ESS # positive P_ESS means charging (load) #negative P_ESS means discharging (generation)
@@ -661,15 +2046,12 @@ class ModelParameters:
                 Model_for_SOC='Kezo'
                 if Model_for_SOC=="Kezo":   #the model for for online optimization in Kezo with regresion model for SOC of ESS
                     if t==model.t.first():
-                        return model.ESS_SOC[t,n_ess] == model.ESS_SOC_init[n_ess]/100*model.ESS_capacity[n_ess]+ (model.P_ESS[t,n_ess]*model.ESS_charge_efficiency[n_ess]/100*model.deltaT)
-                    a=0.99707
-                    b=0.185707/model.deltaT  # considering deltaT=15min, 
-                    c=0.004025
-                    return model.ESS_SOC[t,n_ess] == a*model.ESS_SOC[t-1,n_ess] + (b*model.P_ESS[t,n_ess]*model.ESS_charge_efficiency[n_ess]/100*model.deltaT)+c
+                        return model.ESS_SOC[t,n_ess] == model.ESS_SOC_init[n_ess]/100*model.ESS_capacity[n_ess]+ (model.P_ESS[t,n_ess]*model.ESS_charge_efficiency[n_ess]/100*model.deltaT*length[t-1])
+                    return model.ESS_SOC[t,n_ess] == ESS_SOC_regression(model.ESS_SOC[t-1,n_ess],model.P_ESS[t,n_ess],model.ESS_charge_efficiency[n_ess],model.deltaT,length[t-1])
                 else:
                     if t == model.t.first():
-                        return model.ESS_SOC[t,n_ess] == model.ESS_SOC_init[n_ess]/100*model.ESS_capacity[n_ess]+ (model.P_ESS[t,n_ess]*model.ESS_charge_efficiency[n_ess]/100*model.deltaT)
-                    return model.ESS_SOC[t,n_ess] == model.ESS_SOC[t-1,n_ess] + (model.P_ESS[t,n_ess]*model.ESS_charge_efficiency[n_ess]/100*model.deltaT)
+                        return model.ESS_SOC[t,n_ess] == model.ESS_SOC_init[n_ess]/100*model.ESS_capacity[n_ess]+ (model.P_ESS[t,n_ess]*model.ESS_charge_efficiency[n_ess]/100*model.deltaT*length[t-1])
+                    return model.ESS_SOC[t,n_ess] == model.ESS_SOC[t-1,n_ess] + (model.P_ESS[t,n_ess]*model.ESS_charge_efficiency[n_ess]/100*model.deltaT*length[t-1])
             model.ESS_State_of_Charge_Constraint = Constraint(model.t,model.n_ess, rule=ESS_State_of_Charge_Constraint_rule)
 
 
@@ -677,40 +2059,37 @@ class ModelParameters:
             
         #note that P_eBUS is zero while eBUS is not in station # positive P_eBUS means charging (load)
         if True:
-            #power limit of the eBUS
-            def eBUS_power_Constraint_rule1(model, t,n_eBus):
-                if model.eBus_scedule[t,n_eBus] == 1:
-                    return model.P_eBUS[t,n_eBus] == model.P_eBUS[t,n_eBus]*0
-                else:
-                    return model.P_eBUS[t,n_eBus] == model.P_eBUS[t,n_eBus]
-            model.eBUS_power_Constraint = Constraint(model.t,model.n_eBus, rule=eBUS_power_Constraint_rule1)
-        if True:
+            #power limit of the eBUS, P_eBUS is fixed to 0 while the eBUS is on a trip
             #max min power fro eBUS
-            def e_BUS_power_Constraint_rule(model, t,n_eBus):
-                #return (-model.eBUS_max_discharge[n_eBus], model.P_eBUS[t,n_eBus], model.eBUS_max_charge[n_eBus])
-                return (0, model.P_eBUS[t,n_eBus], model.eBUS_max_charge[n_eBus])
-            model.e_BUS_power_Constraint1 = Constraint(model.t,model.n_eBus, rule=e_BUS_power_Constraint_rule)
+            def eBUS_power_bounds_rule(model, t,n_eBus):
+                if eBus_scedule[t-1][n_eBus-1] == 1:
+                    return None
+                #return (-model.eBUS_max_discharge[n_eBus], model.eBUS_max_charge[n_eBus])
+                return (0, model.eBUS_max_charge[n_eBus])
+            set_bounds(model.P_eBUS, eBUS_power_bounds_rule)
+            model.schedule_bounds['P_eBUS']=eBUS_power_bounds_rule
         if True:
             #SOC limit of the eBUS
-            def e_BUS_SOC_Constraint_rule(model, t,n_eBus):
-                return (model.eBUS_round_trip_energy[n_eBus], model.SOC_eBUS[t,n_eBus], model.eBUS_capacity[n_eBus])
-            model.e_BUS_SOC_Constraint = Constraint(model.t,model.n_eBus, rule=e_BUS_SOC_Constraint_rule)
+            def e_BUS_SOC_bounds_rule(model, t,n_eBus):
+                return (model.eBUS_round_trip_energy[n_eBus], model.eBUS_capacity[n_eBus])
+            set_bounds(model.SOC_eBUS, e_BUS_SOC_bounds_rule)
         if True:
             #SOC rule of the eBUS
             def eBUS_State_of_Charge_Constraint_rule(model, t,n_eBus):
                 if t == model.t.first():
                     #if value(model.P_eBUS[t,n_eBus])>0:
-                    #    return model.SOC_eBUS[t,n_eBus] == model.eBUS_init[n_eBus]*model.eBUS_capacity[n_eBus]+ (model.P_eBUS[t,n_eBus]*model.eBUS_charge_efficiency*model.deltaT)-(model.eBus_scedule[t,n_eBus]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT)
+                    #    return model.SOC_eBUS[t,n_eBus] == model.eBUS_init[n_eBus]*model.eBUS_capacity[n_eBus]+ (model.P_eBUS[t,n_eBus]*model.eBUS_charge_efficiency*model.deltaT)-(eBus_scedule[t-1][n_eBus-1]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT)
                     #else:
-                    #    return model.SOC_eBUS[t,n_eBus] == model.eBUS_init[n_eBus]*model.eBUS_capacity[n_eBus]+ (model.P_eBUS[t,n_eBus]*model.eBUS_discharge_efficiency*model.deltaT)-(model.eBus_scedule[t,n_eBus]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT)  
-                    return model.SOC_eBUS[t,n_eBus] == model.eBUS_SOC_init[n_eBus]/100*model.eBUS_capacity[n_eBus]+ (model.P_eBUS[t,n_eBus]*model.eBUS_charge_efficiency[n_eBus]/100*model.deltaT)-(model.eBus_scedule[t,n_eBus]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT)
+                    #    return model.SOC_eBUS[t,n_eBus] == model.eBUS_init[n_eBus]*model.eBUS_capacity[n_eBus]+ (model.P_eBUS[t,n_eBus]*model.eBUS_discharge_efficiency*model.deltaT)-(eBus_scedule[t-1][n_eBus-1]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT)  
+                    return model.SOC_eBUS[t,n_eBus] == model.eBUS_SOC_init[n_eBus]/100*model.eBUS_capacity[n_eBus]+ (model.P_eBUS[t,n_eBus]*model.eBUS_charge_efficiency[n_eBus]/100*model.deltaT*length[t-1])-(eBus_scedule[t-1][n_eBus-1]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT*length[t-1])
                 #if value(model.P_eBUS[t,n_eBus])>0:
-                #    return model.SOC_eBUS[t,n_eBus] == model.SOC_eBUS[t-1,n_eBus] + (model.P_eBUS[t,n_eBus]*model.eBUS_charge_efficiency*model.deltaT)-(model.eBus_scedule[t,n_eBus]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT)
+                #    return model.SOC_eBUS[t,n_eBus] == model.SOC_eBUS[t-1,n_eBus] + (model.P_eBUS[t,n_eBus]*model.eBUS_charge_efficiency*model.deltaT)-(eBus_scedule[t-1][n_eBus-1]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT)
                 #else:
-                #    return model.SOC_eBUS[t,n_eBus] == model.SOC_eBUS[t-1,n_eBus] + (model.P_eBUS[t,n_eBus]*model.eBUS_discharge_efficiency*model.deltaT)-(model.eBus_scedule[t,n_eBus]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT)
-                return model.SOC_eBUS[t,n_eBus] == model.SOC_eBUS[t-1,n_eBus] + (model.P_eBUS[t,n_eBus]*model.eBUS_charge_efficiency[n_eBus]/100*model.deltaT)-(model.eBus_scedule[t,n_eBus]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT)
+                #    return model.SOC_eBUS[t,n_eBus] == model.SOC_eBUS[t-1,n_eBus] + (model.P_eBUS[t,n_eBus]*model.eBUS_discharge_efficiency*model.deltaT)-(eBus_scedule[t-1][n_eBus-1]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT)
+                return model.SOC_eBUS[t,n_eBus] == model.SOC_eBUS[t-1,n_eBus] + (model.P_eBUS[t,n_eBus]*model.eBUS_charge_efficiency[n_eBus]/100*model.deltaT*length[t-1])-(eBus_scedule[t-1][n_eBus-1]*model.eBUS_round_trip_energy[n_eBus]*model.deltaT*length[t-1])
 
             model.eBUS_State_of_Charge_Constraint = Constraint(model.t,model.n_eBus, rule=eBUS_State_of_Charge_Constraint_rule)
+            model.schedule_constraints['eBUS_State_of_Charge_Constraint']=((model.t,model.n_eBus),eBUS_State_of_Charge_Constraint_rule)
 
         if True:
             def eBUS_State_of_Charge_last_Constraint_rule(model, t,n_eBus):
@@ -727,56 +2106,44 @@ class ModelParameters:
         ## EV constraints
             
         #Note that P_EV is zero while EV is not in station # positive P_eBUS means charging (load)
-        if True:
-            #power limit of the EV
-            def EV_power_Constraint_rule(model, t,n_EV):
-                if model.EV_scedule[t,n_EV] == 0:
-                    return model.P_EV[t,n_EV] == model.P_EV[t,n_EV]*0
-                else:
-                    return model.P_EV[t,n_EV] == model.P_EV[t,n_EV]
-            model.EV_power_Constraint = Constraint(model.t,model.n_EV, rule=EV_power_Constraint_rule)
-        
-        if True:
-            #max min power for EV and give max power when smart charging is off
-            def EV_power_Constraint1_rule(model, t,n_EV):
-                if model.EV_scedule[t,n_EV] == 0:
-                    return Constraint.Skip
-                else:
-                    if model.EV_smartchargeing[n_EV]()=='no':
-                        return (model.EV_max_charge[model.EV_charger_ID[n_EV]]*0.95, model.P_EV[t,n_EV], model.EV_max_charge[model.EV_charger_ID[n_EV]])
-                    else:
-                        return (0, model.P_EV[t,n_EV], model.EV_max_charge[model.EV_charger_ID[n_EV]])
-                    #return (1380, model.P_EV[t,n_EV], model.EV_max_charge[model.EV_charger_ID[n_EV]])
-            model.EV_power_Constraint1 = Constraint(model.t,model.n_EV, rule=EV_power_Constraint1_rule)
-        
-        if True:
-            #power can not be less than 6A
-            def EV_power_can_not_be_less_than_6A_rule(model, t,n_EV):
-                if model.EV_scedule[t,n_EV] == 0:
-                    return Constraint.Skip
-                else:
-                    return model.P_EV[t,n_EV] >= 1440*model.Charger_n_phase[model.EV_charger_ID[n_EV]] #1440 w #6A for single phase charger
-            model.EV_power_can_not_be_less_than_6A = Constraint(model.t,model.n_EV, rule=EV_power_can_not_be_less_than_6A_rule)
-
-        if True:
+        def EV_power_bounds(model, n_EV, c):
+            #the bounds of the power of the EV n_EV connected to the charger c: the maximum power of the EV (95% of it when smart charging is off)
+            #and at least 6A on the phases of the charger (1440 w for single phase charger)
+            lower=1440*value(model.Charger_n_phase[c])
+            if model.EV_smartchargeing[n_EV]()=='no':
+                lower=max(lower,0.95*value(model.EV_max_charge[n_EV]))
+            return (lower, model.EV_max_charge[n_EV])
+
+        if not charger and not sparse:
+            #power limit of the EV, P_EV is fixed to 0 while the EV is not connected
+            #max min power for EV and give max power when smart charging is off, power can not be less than 6A
+            def EV_power_bounds_rule(model, t,n_EV):
+                if EV_scedule[t-1][n_EV-1] == 0:
+                    return None
+                return EV_power_bounds(model, n_EV, model.EV_charger_ID[n_EV])
+            set_bounds(model.P_EV, EV_power_bounds_rule)
+            model.schedule_bounds['P_EV']=EV_power_bounds_rule
+
+        if not charger and not sparse:
             #SOC limit of the EV  between soc_now and full charge==energy required for full charge
-            def EV_SOC_Constraint_rule1(model, t,n_EV):
-                return (0, model.EV_SOC[t,n_EV], model.EV_er[n_EV])
-            model.EV_SOC_Constraint = Constraint(model.t,model.n_EV, rule=EV_SOC_Constraint_rule1)
+            def EV_SOC_bounds_rule(model, t,n_EV):
+                return (0, model.EV_er[n_EV])
+            set_bounds(model.EV_SOC, EV_SOC_bounds_rule)
         
-        if True:
+        if not charger and not sparse:
             #SOC rule of the EV
             def EV_State_of_Charge_Constraint_rule(model, t,n_EV):
                 if t == model.t.first():
-                    return model.EV_SOC[t,n_EV] == (model.P_EV[t,n_EV]*model.EV_charge_efficiency[model.EV_charger_ID[n_EV]]/100*model.deltaT)
+                    return model.EV_SOC[t,n_EV] == (model.P_EV[t,n_EV]*model.EV_charge_efficiency[n_EV]/100*model.deltaT*length[t-1])
                 if t>3:
-                    if model.EV_scedule[t,n_EV]-model.EV_scedule[t-1,n_EV]==-1:
-                        return model.EV_SOC[t,n_EV] == (model.P_EV[t,n_EV]*model.EV_charge_efficiency[model.EV_charger_ID[n_EV]]/100*model.deltaT)
-                return model.EV_SOC[t,n_EV] == model.EV_SOC[t-1,n_EV] + (model.P_EV[t,n_EV]*model.EV_charge_efficiency[model.EV_charger_ID[n_EV]]/100*model.deltaT)
+                    if EV_scedule[t-1][n_EV-1]-EV_scedule[t-2][n_EV-1]==-1:
+                        return model.EV_SOC[t,n_EV] == (model.P_EV[t,n_EV]*model.EV_charge_efficiency[n_EV]/100*model.deltaT*length[t-1])
+                return model.EV_SOC[t,n_EV] == model.EV_SOC[t-1,n_EV] + (model.P_EV[t,n_EV]*model.EV_charge_efficiency[n_EV]/100*model.deltaT*length[t-1])
             model.EV_State_of_Charge_Constraint = Constraint(model.t,model.n_EV, rule=EV_State_of_Charge_Constraint_rule)
+            model.schedule_constraints['EV_State_of_Charge_Constraint']=((model.t,model.n_EV),EV_State_of_Charge_Constraint_rule)
 
 
-        if True:
+        if not charger and not sparse:
             #insure 98% of the energy is charged before departure
             def EV_State_of_Charge_last_Constraint_rule(model, t,n_EV):
                 
@@ -784,12 +2151,90 @@ class ModelParameters:
                     return Constraint.Skip
                 if t==model.t.last():
                     return Constraint.Skip
-                if model.EV_scedule[t+1,n_EV]-model.EV_scedule[t,n_EV]==-1:
+                if EV_scedule[t][n_EV-1]-EV_scedule[t-1][n_EV-1]==-1:
                     return model.EV_SOC[t,n_EV] >= 0.98*model.EV_er[n_EV]
                 else:
                     return Constraint.Skip
                 
             model.EV_State_of_Charge_Constraint1 = Constraint(model.t,model.n_EV, rule=EV_State_of_Charge_last_Constraint_rule)
+            model.schedule_constraints['EV_State_of_Charge_Constraint1']=((model.t,model.n_EV),EV_State_of_Charge_last_Constraint_rule)
+
+        ## EV constraints of the session formulation
+        #the rules of the EV formulation for the connected intervals, P_EV and EV_SOC do not exist while the EV is not connected
+        if sparse:
+            #max min power for EV and give max power when smart charging is off, power can not be less than 6A
+            def EV_power_bounds_rule(model, t,n_EV):
+                return EV_power_bounds(model, n_EV, model.EV_charger_ID[n_EV])
+            set_bounds(model.P_EV, EV_power_bounds_rule)
+
+        if sparse:
+            #SOC limit of the EV  between soc_now and full charge==energy required for full charge
+            def EV_SOC_bounds_rule(model, t,n_EV):
+                return (0, model.EV_er[n_EV])
+            set_bounds(model.EV_SOC, EV_SOC_bounds_rule)
+
+        if sparse:
+            #SOC rule of the EV, it goes on from the SOC that the EV formulation keeps or starts from 0
+            def EV_State_of_Charge_Constraint_rule(model, t,n_EV):
+                previous=connected['previous'].get((t,n_EV))
+                if previous is None:
+                    return model.EV_SOC[t,n_EV] == (model.P_EV[t,n_EV]*model.EV_charge_efficiency[n_EV]/100*model.deltaT*length[t-1])
+                return model.EV_SOC[t,n_EV] == model.EV_SOC[previous] + (model.P_EV[t,n_EV]*model.EV_charge_efficiency[n_EV]/100*model.deltaT*length[t-1])
+            model.EV_State_of_Charge_Constraint = Constraint(model.EV_connected, rule=EV_State_of_Charge_Constraint_rule)
+
+        if sparse:
+            #insure 98% of the energy is charged before departure
+            def EV_State_of_Charge_last_Constraint_rule(model, t,n_EV):
+                if (t,n_EV) in connected['departure']:
+                    return model.EV_SOC[t,n_EV] >= 0.98*model.EV_er[n_EV]
+                return Constraint.Skip
+            model.EV_State_of_Charge_Constraint1 = Constraint(model.EV_connected, rule=EV_State_of_Charge_last_Constraint_rule)
+
+        ## charger constraints
+        #the EV on a charger has the power and SOC of the charger, the rules are the ones of the EVs for the EV of the charger
+        if charger:
+            #power limit of the charger, its power is fixed to 0 while no EV is connected
+            #max min power for the EV on the charger and give max power when smart charging is off, power can not be less than 6A
+            def Charger_power_bounds_rule(model, t,c):
+                n_EV=sessions['EV'][t-1][c-1]
+                if n_EV == 0:
+                    return None
+                return EV_power_bounds(model, n_EV, c)
+            set_bounds(model.P_charger, Charger_power_bounds_rule)
+            model.schedule_bounds['P_charger']=Charger_power_bounds_rule
+
+        if charger:
+            #SOC limit of the EV on the charger (of the last EV after it departed) between 0 and the energy required for full charge
+            #the SOC of a charger is fixed to 0 before its first session (a charger without sessions is idle all the time)
+            def Charger_SOC_bounds_rule(model, t,c):
+                n_EV=sessions['owner'][t-1][c-1]
+                if n_EV == 0:
+                    return None
+                return (0, model.EV_er[n_EV])
+            set_bounds(model.SOC_charger, Charger_SOC_bounds_rule)
+            model.schedule_bounds['SOC_charger']=Charger_SOC_bounds_rule
+
+        if charger:
+            #SOC rule of the charger, it starts again for every session as the SOC of the EV with the efficiency of that EV
+            def Charger_State_of_Charge_Constraint_rule(model, t,c):
+                n_EV=sessions['owner'][t-1][c-1]
+                if n_EV == 0:
+                    return Constraint.Skip
+                efficiency=model.EV_charge_efficiency[n_EV]
+                if sessions['reset'][t-1][c-1]:
+                    return model.SOC_charger[t,c] == (model.P_charger[t,c]*efficiency/100*model.deltaT*length[t-1])
+                return model.SOC_charger[t,c] == model.SOC_charger[t-1,c] + (model.P_charger[t,c]*efficiency/100*model.deltaT*length[t-1])
+            model.Charger_State_of_Charge_Constraint = Constraint(model.t,model.n_EV_charger, rule=Charger_State_of_Charge_Constraint_rule)
+            model.schedule_constraints['Charger_State_of_Charge_Constraint']=((model.t,model.n_EV_charger),Charger_State_of_Charge_Constraint_rule)
+
+        if charger:
+            #insure 98% of the energy is charged before departure
+            def Charger_State_of_Charge_last_Constraint_rule(model, t,c):
+                if sessions['departure'][t-1][c-1]:
+                    return model.SOC_charger[t,c] >= 0.98*model.EV_er[sessions['EV'][t-1][c-1]]
+                return Constraint.Skip
+            model.Charger_State_of_Charge_Constraint1 = Constraint(model.t,model.n_EV_charger, rule=Charger_State_of_Charge_last_Constraint_rule)
+            model.schedule_constraints['Charger_State_of_Charge_Constraint1']=((model.t,model.n_EV_charger),Charger_State_of_Charge_last_Constraint_rule)
 
         return model
 
@@ -804,19 +2249,71 @@ class ModelParameters:
         """
         #find the base OFs
 
-        #define the solver
-        solver = SolverFactory(self.solver)
         #assign the weights of the OFs as zero and base OFs as 1 for all OFs
         for i in range(1,len(self.Grid_OFs)+1):
             self.instance.OF_Base[i]=1
             self.instance.w_OF_Grid[i]=0
 
         #solve the model and find based OF value while wOF for an objective function is 1 and the rest are 0
-        for i in range(1,len(self.Grid_OFs)+1):
-            self.instance.w_OF_Grid[i]=1
-            results = solver.solve(self.instance)
-            self.instance.OF_Base[i]=value(self.instance.OF)
+        #the solves of the worker processes are timed as one phase
+        self.Base_OFs_optimal=True
+        with self.timer.phase('base_OFs'):
+            if self.Workers>1:
+                self.Find_Base_OFs_parallel()
+            else:
+                for i in range(1,len(self.Grid_OFs)+1):
+                    self.instance.w_OF_Grid[i]=1
+                    with self.timer.phase(self.instance.OF_name[i]):
+                        results = self.session.solve()
+                    self.instance.OF_Base[i]=base_OF_value(value(self.instance.OF))
+                    self.Base_OFs_optimal=self.Base_OFs_optimal and self.session.optimal
+                    self.instance.w_OF_Grid[i]=0
+        #the solution is the one of the last base problem now
+        self.Base_OFs_found=True
+        self.solved=False
+        return True
+
+
+
+    def Find_Base_OFs_parallel(self):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+        """
+        #find the base OFs with the base problems solved by self.Workers worker processes, every worker has its own instance
+        #the base problem of OF i only depends on the base OF j<i that smart charging EVs give a weight to (the w_OF_EV terms stay in the OF)
+        #so the base problems without such a dependency are solved at the same time and the results are the same as in Find_Base_OFs
+        n_OF=len(self.Grid_OFs)
+        depends={}
+        for i in range(1,n_OF+1):
+            depends[i]=set()
+            if self.EV_n>1:
+                for j in range(1,i):
+                    for n in self.instance.n_EV:
+                        if self.instance.EV_smartchargeing[n]()=='yes' and self.instance.w_OF_EV[n,j]()!=0:
+                            depends[i].add(j)
+        OF_Base={}
+        values={}
+        with ProcessPoolExecutor(max_workers=min(self.Workers,n_OF)) as pool:
+            running={}
+            while len(OF_Base)<n_OF:
+                #start the base problems with all their dependencies solved
+                for i in range(1,n_OF+1):
+                    if i not in OF_Base and i not in running.values() and depends[i].issubset(OF_Base):
+                        #a dependent base problem starts from the solution of the last base problem it depends on
+                        start=values[max(depends[i])] if depends[i] else None
+                        running[pool.submit(solve_base_OF,self,i,{j:OF_Base[j] for j in depends[i]},start)]=i
+                done,_=wait(running,return_when=FIRST_COMPLETED)
+                for future in done:
+                    i=running.pop(future)
+                    OF,values[i],optimal=future.result()
+                    OF_Base[i]=base_OF_value(OF)
+                    self.Base_OFs_optimal=self.Base_OFs_optimal and optimal
+        for i in range(1,n_OF+1):
+            self.instance.OF_Base[i]=OF_Base[i]
             self.instance.w_OF_Grid[i]=0
+        #like in Find_Base_OFs, the final solve starts from the solution of the last base problem
+        for v,val in zip(self.instance.component_data_objects(Var),values[n_OF]):
+            v.set_value(val,skip_validation=True)
         return True
 
     
@@ -825,74 +2322,980 @@ class ModelParameters:
         """
         @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
         """
-        #define the solver
-        solver = SolverFactory(self.solver)
-        #assign the weights of the OFs into the model
-        wofs=[self.Grid_OFs.get('SC'),self.Grid_OFs.get('EC'),self.Grid_OFs.get('CO2')]
-        for i in range(len(self.Grid_OFs)):
-            self.instance.w_OF_Grid[i+1]=wofs[i]
-        #solve the model
-        Res=solver.solve(self.instance)
+        #solve the model again, also if it was solved before, and find the results
+        self.solved=False
+        self.extracted=False
+        return self.Results()
+
 
+
+    def Extract_results(self):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+        """
         ##find the results and fill  the variable with results
+        #all the outputs are arrays with shape of (n_units, n_Time_intervals)
+        T=self.n_Time_intervals
+        #one pass over the values of all variables, the values of every variable are a slice of it in the order of its indices (t, n)
+        values,slices=self.session.solution()
+        def unit_time(name,n):
+            return values[slices[name]].reshape(T,n).T.copy()
+
         #ESS
         if self.ESS_n>0:
-            self.ESS_P = [[value(self.instance.P_ESS[t,n]) for t in self.instance.t] for n in self.instance.n_ess]
-            self.ESS_SOC = [[value(self.instance.ESS_SOC[t,n]) for t in self.instance.t] for n in self.instance.n_ess]
+            self.ESS_P = unit_time('P_ESS',self.ESS_n)
+            self.ESS_SOC = unit_time('ESS_SOC',self.ESS_n)
         else:
-            self.ESS_P =[np.zeros((self.n_Time_intervals))]
-            self.ESS_SOC =[np.zeros((self.n_Time_intervals))]
+            self.ESS_P =np.zeros((1,T))
+            self.ESS_SOC =np.zeros((1,T))
         
         
         #eBUS
         if self.eBUS_n>0:
-            self.eBUS_P = [[value(self.instance.P_eBUS[t,n]) for t in self.instance.t] for n in self.instance.n_eBus]
-            self.eBUS_SOC = [[value(self.instance.SOC_eBUS[t,n]) for t in self.instance.t] for n in self.instance.n_eBus]
+            self.eBUS_P = unit_time('P_eBUS',self.eBUS_n)
+            self.eBUS_SOC = unit_time('SOC_eBUS',self.eBUS_n)
         else:
-            self.eBUS_P =[np.zeros((self.n_Time_intervals))]
-            self.eBUS_SOC =[np.zeros((self.n_Time_intervals))]
+            self.eBUS_P =np.zeros((1,T))
+            self.eBUS_SOC =np.zeros((1,T))
         
         
         #EV
         if self.EV_n>0:
-            self.EV_P = [[value(self.instance.P_EV[t,n]) for t in self.instance.t] for n in self.instance.n_EV]
-            self.EV_SOC = [[value(self.instance.EV_SOC[t,n]) for t in self.instance.t] for n in self.instance.n_EV]
-            self.EV_plan = [[value(self.instance.EV_scedule[t,n]) for t in self.instance.t] for n in self.instance.n_EV]
-        
-            #find the dicrete schedule for EV charging if the chargers are current controllable
-            self.EV_P_discrete=[]
-            self.EV_SOC_discrete=[]
-            for i in range(self.EV_n):
-                a=[]
-                b=[]
-                if self.EV_max_charge[self.EV_charger_ID[i]-1]==7000:
-                    chargingPowers=self.chargingPowers
-                elif self.EV_max_charge[self.EV_charger_ID[i]-1]==22000:
-                    chargingPowers=np.multiply(self.chargingPowers,3)
-                else:
-                    chargingPowers=np.multiply(self.chargingPowers,1)
-
-                a,b=self.DiscretizationPlanning(self.EV_P[i], np.sum(self.EV_P[i]),self.EV_plan[i], chargingPowers, powerLimitsUpper = [], prices = None, beta = 1, efficiency = None, intervalMerge=None)
-                self.EV_P_discrete.append(a)
-                self.EV_SOC_discrete.append(b)
+            if self.EV_formulation=='charger':
+                #every EV has the power of its charger while it is connected and its SOC is found from its powers as in the EV formulation
+                self.EV_P = self.Charger_EV_powers(unit_time('P_charger',self.EV_n_charger))
+                self.EV_SOC = EVFleet(self).SOC(self.EV_P)
+            elif self.EV_formulation=='session':
+                #the values of the connected intervals, the SOC of the other intervals is the one of the EV formulation
+                self.EV_P = self.Session_EV_values(values[slices['P_EV']])
+                self.EV_SOC = self.EV_SOC_plan(self.EV_P)
+            else:
+                self.EV_P = unit_time('P_EV',self.EV_n)
+                self.EV_SOC = unit_time('EV_SOC',self.EV_n)
+            self.EV_plan = np.transpose(np.reshape(self.EV_scedule,(T,self.EV_n))).astype(float)
+            self.Discretize_EVs()
         else:
-            self.EV_P =[np.zeros((self.n_Time_intervals))]
-            self.EV_SOC =[np.zeros((self.n_Time_intervals))]
-            self.EV_plan =[np.zeros((self.n_Time_intervals))]
-            self.EV_P_discrete=[np.zeros((self.n_Time_intervals))]
-            self.EV_SOC_discrete=[np.zeros((self.n_Time_intervals))]
+            self.EV_P =np.zeros((1,T))
+            self.EV_SOC =np.zeros((1,T))
+            self.EV_plan =np.zeros((1,T))
+            self.EV_P_discrete=np.zeros((1,T))
+            self.EV_SOC_discrete=np.zeros((1,T))
         
-        self.Load_P = [[self.instance.P_load[t] for t in self.instance.t] for n in self.instance.n_l]
-        self.PV_P = [[self.instance.PV[t,n] for t in self.instance.t] for n in self.instance.n_pv]
+        #the inputs self.Load_P and self.PV_P are kept as they are, the model is built again from them by the worker processes
+        Load_P = np.fromiter((p.value for p in self.instance.P_load.values()),dtype=float,count=T)
+        PV_P = np.fromiter((p.value for p in self.instance.PV.values()),dtype=float,count=T*self.PV_n)
         
         #agregared power
         #FIXME add the new EV schedule to all power list it is based on not discrete schedule
-        self.allPowers=np.sum([np.sum(self.Load_P,axis=0),np.sum(self.EV_P,axis=0),np.sum(self.eBUS_P,axis=0),np.sum(self.ESS_P,axis=0),np.multiply(np.sum(self.PV_P,axis=0),-1)],axis=0)
-        
+        self.allPowers=Load_P+self.EV_P.sum(axis=0)+self.eBUS_P.sum(axis=0)+self.ESS_P.sum(axis=0)-PV_P.reshape(T,self.PV_n).sum(axis=1)
+        self.extracted=True
+        return True
+
+    def Charger_EV_powers(self,P_charger):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        the powers of the EVs from the powers of the chargers of the charger formulation, every EV has the power of its charger
+        while it is connected and zero otherwise
+        P_charger (array): with shape of (..., EV_n_charger, n_Time_intervals), the last axis can also have length 1 for the first interval
+        returns the powers with shape of (..., n_EV, n_Time_intervals)
+        """
+        T=self.n_Time_intervals
+        connected=np.reshape(schedule_rows(self.EV_scedule,T,self.EV_n),(T,self.EV_n)).T==1
+        P_charger=np.asarray(P_charger,dtype=float)
+        return P_charger[...,np.array(self.EV_charger_ID,dtype=int)-1,:]*connected[:,:P_charger.shape[-1]]
+
+    def Session_EV_values(self,values):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        the values of the EVs from the values of the connected intervals of the session formulation, zero while an EV is not connected
+        values (array): with shape of (..., n_connected) in the order of the connected (t, n_EV) of the model
+        returns the values with shape of (..., n_EV, n_Time_intervals)
+        """
+        T=self.n_Time_intervals
+        t,n=np.nonzero(np.reshape(self.EV_scedule,(T,self.EV_n))==1)
+        values=np.asarray(values,dtype=float)
+        result=np.zeros(values.shape[:-1]+(self.EV_n,T))
+        result[...,n,t]=values
+        return result
+
+    def EV_SOC_plan(self,EV_P):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        the SOC of the EVs for the powers EV_P with shape of (n_EV, n_Time_intervals) with the SOC rule of the EV formulation:
+        the SOC starts again from 0 when an EV leaves (from the fourth interval on)
+        """
+        T=self.n_Time_intervals
+        deltaT=self.Time_Resolution/60
+        plan=np.reshape(self.EV_scedule,(T,self.EV_n)).T
+        efficiency=np.array(self.EV_charge_efficiency,dtype=float)
+        SOC=EV_P*efficiency[:,None]/100*deltaT
+        for t in range(1,T):
+            kept=np.ones(self.EV_n) if t<3 else (plan[:,t]-plan[:,t-1]!=-1)
+            SOC[:,t]+=kept*SOC[:,t-1]
+        return SOC
+
+    def Discretize_EVs(self):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+        """
+        #find the dicrete schedule for EV charging if the chargers are current controllable
+        #the charging powers of every EV depend on its charger
+        chargingPowers=[]
+        for i in range(self.EV_n):
+            if self.EV_max_charge[i]==7000:
+                chargingPowers.append(self.chargingPowers)
+            elif self.EV_max_charge[i]==22000:
+                chargingPowers.append(np.multiply(self.chargingPowers,3))
+            else:
+                chargingPowers.append(np.multiply(self.chargingPowers,1))
+        with self.timer.phase('discretization'):
+            self.EV_P_discrete,self.EV_SOC_discrete=self.DiscretizationPlanning_fleet(self.EV_P,self.EV_plan,chargingPowers)
+        return True
+
+
+
+    def Save_results(self,Path,Compress=False):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        writes the results, the inputs of the current horizon and the OF values to one binary bundle, open it with load_results
+        Path (str): by default a folder with one .npy file per array and manifest.json, the arrays can be memory mapped
+                    with Compress=True one compressed .npz file (the arrays are read one at a time but can not be memory mapped)
+        arrays: ESS_P, ESS_SOC, eBUS_P, eBUS_SOC, EV_P, EV_SOC, EV_plan, EV_P_discrete, EV_SOC_discrete (n_units, n_Time_intervals), allPowers,
+                Load_P, electricity_cost_sell, electricity_cost_buy, CO2 (n_Time_intervals, ), PV_P (n_PV, n_Time_intervals)
+                and ESS_SOC_init, eBUS_SOC_init, EV_er (n_units, )
+        """
+        self.Results()
+        instance=self.instance
+        T=self.n_Time_intervals
+        def param_values(param,shape=None):
+            values=np.fromiter((p.value for p in param.values()),dtype=float,count=len(param))
+            return values if shape is None else values.reshape(shape).T
+        arrays={'ESS_P':self.ESS_P,'ESS_SOC':self.ESS_SOC,'eBUS_P':self.eBUS_P,'eBUS_SOC':self.eBUS_SOC,
+                'EV_P':self.EV_P,'EV_SOC':self.EV_SOC,'EV_plan':self.EV_plan,'EV_P_discrete':self.EV_P_discrete,'EV_SOC_discrete':self.EV_SOC_discrete,
+                'allPowers':self.allPowers,'Load_P':param_values(instance.P_load),'PV_P':param_values(instance.PV,(T,self.PV_n)),
+                'electricity_cost_sell':param_values(instance.E_cost_sell),'electricity_cost_buy':param_values(instance.E_cost_buy),
+                'CO2':param_values(instance.CO2),'ESS_SOC_init':param_values(instance.ESS_SOC_init),
+                'eBUS_SOC_init':param_values(instance.eBUS_SOC_init),'EV_er':param_values(instance.EV_er)}
+        arrays={name:np.ascontiguousarray(values,dtype=float) for name,values in arrays.items()}
+        manifest={'arrays':{name:{'shape':list(values.shape),'dtype':str(values.dtype)} for name,values in arrays.items()},
+                  'OF':{instance.OF_name[i]:value(instance.OF_Grid[i]) for i in instance.n_OF},
+                  'OF_Base':{instance.OF_name[i]:value(instance.OF_Base[i]) for i in instance.n_OF},
+                  'Grid_OFs':self.Grid_OFs,'Time_Resolution':self.Time_Resolution,'n_Time_intervals':T,'Forecast_start':self.Forecast_start,'Solver':self.solver}
+        with self.timer.phase('save'):
+            if Compress:
+                np.savez_compressed(Path,manifest=np.array(json.dumps(manifest)),**arrays)
+            else:
+                os.makedirs(Path,exist_ok=True)
+                for name,values in arrays.items():
+                    np.save(os.path.join(Path,name+'.npy'),values)
+                with open(os.path.join(Path,'manifest.json'),'w') as file:
+                    json.dump(manifest,file,indent=1)
         return True
 
 
 
+    def update_forecasts(self,Load_P=None,PV_P=None,electricity_cost_sell=None,electricity_cost_buy=None,CO2=None,Base_OFs=False,Solve=True,
+                         Forecast_start=None):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        new forecasts for the same horizon: the built instance is kept and only its mutable params get the new values (in bulk),
+        the model is solved again from the last solution, so a new forecast costs one solve instead of a new model and four solves
+        parameters:
+        Load_P, PV_P, electricity_cost_sell, electricity_cost_buy, CO2: the new forecasts with the same shapes as in ModelParameters,
+                        or archives (see Forecast_start of ModelParameters), the forecasts that are not given are not changed
+        Forecast_start (int): the time interval of the archives where the horizon starts, the forecasts that are not given are read
+                        again from their archives, default is the start of the current horizon
+                        (if an archive ends in the horizon, its last time interval is repeated)
+        Base_OFs (bool): find the base OFs again with the new forecasts, by default the base OFs of the first plan are used
+        Solve (bool): solve the model and find the results now, if False they are found when they are needed (by Results, Save_results, ...)
+        """
+        T=self.n_Time_intervals
+        #the new forecasts are checked and normalised like the inputs of ModelParameters, nothing is changed if one of them is not correct
+        problems=[]
+        if Forecast_start is not None and (not isinstance(Forecast_start,(int,np.integer)) or Forecast_start<0):
+            raise MOEMSInputError(['Forecast_start is not correct, please provide the time interval of the archives where the horizon starts as an integer from 0'])
+        start=self.Forecast_start if Forecast_start is None else Forecast_start
+        sources={'Load_P':Load_P,'PV_P':PV_P,'electricity_cost_sell':electricity_cost_sell,'electricity_cost_buy':electricity_cost_buy,'CO2':CO2}
+        if Forecast_start is not None:
+            sources={name:self.forecast_archives.get(name) if values is None else values for name,values in sources.items()}
+        forecasts,archives=forecast_windows(sources,start,T,problems,Repeat=True)
+        Load_P,PV_P,electricity_cost_sell,electricity_cost_buy,CO2=forecasts.values()
+        if Load_P is not None:
+            Load_P=time_series(Load_P,T,'Load_P',problems,units=True)
+        if PV_P is not None:
+            PV_P=time_series(PV_P,T,'PV_P',problems,units=True)
+            if PV_P is not None and self.PV_n>0 and PV_P.shape[1]!=self.PV_n:
+                problems.append('PV_P has %d PVs, please provide the forecasts of the %d PVs of the model' % (PV_P.shape[1],self.PV_n))
+        forecasts={name:time_series(values,T,name,problems) for name,values in [('electricity_cost_sell',electricity_cost_sell),
+                   ('electricity_cost_buy',electricity_cost_buy),('CO2',CO2)] if values is not None}
+        if problems:
+            raise MOEMSInputError(problems)
+        #the archives that were given replace the old ones, a forecast that is given as an array is not read from an archive anymore
+        self.forecast_archives.update(archives)
+        for name,values in sources.items():
+            if values is not None and name not in archives:
+                self.forecast_archives.pop(name,None)
+        self.Forecast_start=start
+        if Load_P is not None:
+            self.Load_P=Load_P.sum(axis=1)
+        if PV_P is not None and self.PV_n>0:
+            self.PV_P=PV_P
+        self.E_cost_sell=forecasts.get('electricity_cost_sell',self.E_cost_sell)
+        self.E_cost_buy=forecasts.get('electricity_cost_buy',self.E_cost_buy)
+        self.CO2=forecasts.get('CO2',self.CO2)
+
+        ##change the instance in place
+        if self.instance is not None:
+            self.instance.P_load.store_values(param_data(self.Load_P))
+            self.instance.PV.store_values(param_data(self.PV_P,(T,self.PV_n)))
+            self.instance.E_cost_sell.store_values(param_data(self.E_cost_sell))
+            self.instance.E_cost_buy.store_values(param_data(self.E_cost_buy))
+            self.instance.CO2.store_values(param_data(self.CO2))
+        if Base_OFs:
+            self.Base_OFs_found=False
+        self.solved=False
+        self.extracted=False
+        if Solve:
+            return self.Results()
+        return True
+
+
+
+    def Replan(self,Steps=1,Load_P=None,PV_P=None,electricity_cost_sell=None,electricity_cost_buy=None,CO2=None,
+               ESS_SOC_init=None,eBUS_SOC_init=None,EV_delivered=None,eBus_scedule=None,EV_scedule=None,Base_OFs=False):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        receding horizon (MPC): shifts the horizon by Steps time intervals and solves the model again
+        the instance is kept, the forecasts, the initial SOCs and the energy required by the EVs are changed in place
+        and the solve starts from the plan of the previous horizon shifted by Steps intervals
+        the model of the session formulation (EV_formulation='session') is built again for the new horizon
+        parameters:
+        Steps (int): the number of time intervals (of Time_Resolution minutes) that the horizon is shifted
+        Load_P, PV_P, electricity_cost_sell, electricity_cost_buy, CO2, eBus_scedule, EV_scedule: the forecasts for the new horizon
+                        with the same shapes as in ModelParameters, if not given the next window of their archive is read (see Forecast_start
+                        of ModelParameters) or the old forecasts are shifted and their last interval is repeated
+        ESS_SOC_init (array): the SOC of ESSs in % (0 to 100) at the start of the new horizon with shape of (n_ESS, ), default is the SOC of the plan after Steps intervals
+        eBUS_SOC_init (array): the SOC of eBUSs in % (0 to 100) at the start of the new horizon with shape of (n_eBUS, ), default is the SOC of the plan after Steps intervals
+        EV_delivered (array): the energy in Wh (at least 0) that every EV got in the last Steps intervals with shape of (n_EV, ), default is the energy of the plan
+                        it is taken from EV_er, so EV_er is the energy that is still required
+        Base_OFs (bool): find the base OFs again, by default the base OFs of the first plan are used
+
+        outputs/varibales: the same as ModelParameters for the new horizon
+        """
+        T=self.n_Time_intervals
+        if Steps<1 or Steps>=T:
+            raise MOEMSInputError(["Steps is not correct, please provide the number of time intervals to shift between 1 and %d" % (T-1)])
+        #the new schedules are checked before anything is changed
+        problems=[]
+        schedules={}
+        for name,values,n_units in [('eBus_scedule',eBus_scedule,self.eBUS_n),('EV_scedule',EV_scedule,self.EV_n)]:
+            if values is not None and n_units>0:
+                schedules[name]=time_series(values,T,name,problems,units=True,dtype=np.int8,schedule=True)
+                if schedules[name] is not None and schedules[name].shape[1]!=n_units:
+                    problems.append('%s has %d units, please provide the schedule of the %d units of the model' % (name,schedules[name].shape[1],n_units))
+        #the measured SOCs and energies in the same arrays as in ModelParameters
+        measured={}
+        for name,values,text,n_units,high in [('ESS_SOC_init',ESS_SOC_init,'the SOC of ESSs in % at the start of the new horizon',self.ESS_n,100),
+                                              ('eBUS_SOC_init',eBUS_SOC_init,'the SOC of eBUSs in % at the start of the new horizon',self.eBUS_n,100),
+                                              ('EV_delivered',EV_delivered,'the energy in Wh that every EV got in the last Steps intervals',self.EV_n,np.inf)]:
+            if values is not None:
+                measured[name]=unit_values(values,n_units,name,text,problems,0,high)
+        if problems:
+            raise MOEMSInputError(problems)
+        #the plan of the current horizon
+        self.Results()
+        deltaT=self.Time_Resolution/60
+
+        ##the forecasts of the new horizon, if no new forecast is given the next window of its archive is read or the old forecast is shifted
+        #(they are checked before the rest is changed)
+        forecasts={'Load_P':(Load_P,self.Load_P),'PV_P':(PV_P,self.PV_P),'electricity_cost_sell':(electricity_cost_sell,self.E_cost_sell),
+                   'electricity_cost_buy':(electricity_cost_buy,self.E_cost_buy),'CO2':(CO2,self.CO2)}
+        self.update_forecasts(**{name:shift_rows(old,Steps) if new is None and name not in self.forecast_archives else new
+                                 for name,(new,old) in forecasts.items()},Forecast_start=self.Forecast_start+Steps,Solve=False)
+        #the update of the inputs and the instance, the solves are timed as base_OFs, solve and results
+        self.timer.start('replan')
+
+        ##the energy and the SOCs of the plan after Steps intervals
+        #the SOCs of the plan are kept between 0 and 100% (a solver can give them slightly outside their bounds)
+        if EV_delivered is None:
+            measured['EV_delivered']=np.array([sum(self.EV_P[n][t]*self.EV_charge_efficiency[n]/100*deltaT for t in range(Steps)) for n in range(self.EV_n)],dtype=float)
+        self.EV_er=np.maximum(self.EV_er-measured['EV_delivered'],0)
+        if ESS_SOC_init is None:
+            measured['ESS_SOC_init']=np.clip([self.ESS_SOC[n][Steps-1]/self.ESS_capacity[n]*100 for n in range(self.ESS_n)],0,100)
+        self.ESS_SOC_init=np.ascontiguousarray(measured['ESS_SOC_init'],dtype=float)
+        if eBUS_SOC_init is None:
+            measured['eBUS_SOC_init']=np.clip([self.eBUS_SOC[n][Steps-1]/self.eBUS_capacity[n]*100 for n in range(self.eBUS_n)],0,100)
+        self.eBUS_SOC_init=np.ascontiguousarray(measured['eBUS_SOC_init'],dtype=float)
+        if self.eBUS_n>0:
+            self.eBus_scedule=schedules.get('eBus_scedule',shift_rows(self.eBus_scedule,Steps).astype(np.int8))
+        if self.EV_n>0:
+            self.EV_scedule=schedules.get('EV_scedule',shift_rows(self.EV_scedule,Steps).astype(np.int8))
+
+        if self.EV_formulation=='session':
+            #the variables of the EVs are made for the connected intervals, the model of the new horizon is built again
+            #(the solve does not start from the previous plan) with the base OFs of the first plan
+            OF_Base=[value(self.instance.OF_Base[i]) for i in self.instance.n_OF]
+            self.model=self.instance=self.session=None
+            self.Build()
+            self.instance.OF_Base.store_values(param_data(OF_Base))
+        else:
+            ##change the instance in place
+            self.instance.ESS_SOC_init.store_values(param_data(self.ESS_SOC_init))
+            self.instance.eBUS_SOC_init.store_values(param_data(self.eBUS_SOC_init))
+            self.instance.EV_er.store_values(param_data(self.EV_er))
+            self.session.shift(Steps,T)
+
+            #the constraints that depend on the schedules are built again and the bounds are set again when a schedule changed
+            rows=self.instance.schedule_rows
+            new_rows={'eBUS':schedule_rows(self.eBus_scedule,T,self.eBUS_n),'EV':schedule_rows(self.EV_scedule,T,self.EV_n)}
+            if new_rows!=rows:
+                for name in rows:
+                    rows[name][:]=new_rows[name]
+                if self.EV_formulation=='charger':
+                    #the sessions on the chargers of the new schedule, the rules and the EV terms of the OF read them
+                    self.instance.charger_sessions.update(charger_sessions(rows['EV'],self.EV_charger_ID,self.EV_n_charger,T))
+                for name,rule in self.instance.schedule_expressions.items():
+                    expression=self.instance.component(name)
+                    for index in expression:
+                        expression[index].set_value(rule(self.instance,*index))
+                for name,(sets,rule) in self.instance.schedule_constraints.items():
+                    #the implicit index set of the constraint is removed with it
+                    self.instance.del_component(name)
+                    if self.instance.component(name+'_index') is not None:
+                        self.instance.del_component(name+'_index')
+                    self.instance.add_component(name,Constraint(*sets,rule=rule))
+                for name,rule in self.instance.schedule_bounds.items():
+                    #a unit that is connected now is not fixed anymore and gets its bounds, the others are fixed to 0
+                    set_bounds(self.instance.component(name),rule)
+                self.session.reload()
+        self.timer.stop()
+
+        ##solve
+        if Base_OFs:
+            self.Find_Base_OFs()
+        return self.Find_results()
+
+
+    def Find_Pareto_front(self,Weights=None,Step=25,Refine=None,Workers=None):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        finds the Pareto front of the grid OFs by solving the model for many weights of the OFs
+        the built instance and the base OFs of Find_Base_OFs are used again, every solve starts from the solution of a neighbouring weight vector
+        Weights (array): the weights of the OFs in % with shape of (n_points, n_OFs), the columns are in the order of Grid_OFs
+                         default is all the weights with a step of Step %
+        Step (int): the step of the default weights in %
+        Refine (float): if given, a point with the mean weights is added between two neighbouring points
+                        while any of their OFs divided by its base OF differs more than Refine
+        Workers (int): the number of worker processes, default is Workers of the model
+
+        returns (and keeps in Pareto_front) a dict with
+        weights: the weights of the points with shape of (n_points, n_OFs)
+        OFs: the values of the OFs with shape of (n_points, n_OFs)
+        allPowers: the sum of all powers with shape of (n_points, n_Time_intervals)
+        ESS_P: the power of ESSs with shape of (n_points, n_ESS, n_Time_intervals)
+        nondominated: True for the points that no other point is better than in all the OFs
+        """
+        n_OF=len(self.Grid_OFs)
+        if Weights is None:
+            Weights=Pareto_weights(n_OF,Step)
+        Weights=np.array(Weights,dtype=float)
+        if Weights.ndim!=2 or Weights.shape[1]!=n_OF or np.any(Weights<0) or np.any(Weights.sum(axis=1)<=0):
+            raise MOEMSInputError(["Weights is not correct, please provide non negative weights with shape of (n_points, %d) in the order of %s" % (n_OF,list(self.Grid_OFs.keys()))])
+        #the weights are in % like Grid_OFs
+        Weights=Weights/Weights.sum(axis=1,keepdims=True)*100
+        if Workers is None:
+            Workers=self.Workers
+        self.Solve()
+        OF_Base=[value(self.instance.OF_Base[i]) for i in self.instance.n_OF]
+
+        #the instance is given back as it is after Find_results
+        w_OF_Grid=[value(self.instance.w_OF_Grid[i]) for i in self.instance.n_OF]
+        variables=list(self.instance.component_data_objects(Var))
+        solution=[v.value for v in variables]
+
+        pool=ProcessPoolExecutor(max_workers=Workers) if Workers>1 else None
+        try:
+            #the first point starts from the solution of Find_results and the next points from the previous one
+            points=[(w,solution if k==0 else None) for k,w in enumerate(Weights.tolist())]
+            results=self.Pareto_points(points,pool,Workers,OF_Base)
+            front=[(points[k][0],results[k]) for k in range(len(points))]
+            new=set(range(len(front)))
+            while Refine is not None and len(new)>0:
+                #add the mean weights between neighbouring points with a large difference in the OFs, they start from the solution of the first point
+                points=[]
+                where=[]
+                for k in range(len(front)-1):
+                    (wa,ra),(wb,rb)=front[k],front[k+1]
+                    if k not in new and k+1 not in new:
+                        continue
+                    gap=max(abs(ra[0][i]-rb[0][i])/abs(OF_Base[i]) for i in range(n_OF))
+                    #1 % is the smallest difference of the weights
+                    if gap>Refine and max(abs(a-b) for a,b in zip(wa,wb))>1:
+                        points.append(([(a+b)/2 for a,b in zip(wa,wb)],ra[3]))
+                        where.append(k)
+                if len(points)==0:
+                    break
+                results=self.Pareto_points(points,pool,Workers,OF_Base)
+                for j in reversed(range(len(points))):
+                    front.insert(where[j]+1,(points[j][0],results[j]))
+                new=set(where[j]+1+j for j in range(len(points)))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            for i in self.instance.n_OF:
+                self.instance.w_OF_Grid[i]=w_OF_Grid[i-1]
+            for v,val in zip(variables,solution):
+                v.set_value(val,skip_validation=True)
+
+        OFs=np.array([r[0] for w,r in front])
+        #a point is dominated if another point is not worse in any OF and better in one
+        nondominated=np.array([not np.any(np.all(OFs<=OFs[k],axis=1) & np.any(OFs<OFs[k],axis=1)) for k in range(len(OFs))])
+        self.Pareto_front={'weights':np.array([w for w,r in front]),
+                           'OFs':OFs,
+                           'allPowers':np.array([r[1] for w,r in front]),
+                           'ESS_P':np.array([r[2] for w,r in front]),
+                           'nondominated':nondominated}
+        return self.Pareto_front
+
+
+
+    def Pareto_points(self,points,pool,Workers,OF_Base):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+        """
+        #solve the points with the instance or split them into one chunk of neighbouring points per worker
+        with self.timer.phase('Pareto_front'):
+            if pool is None:
+                return solve_Pareto_points(self.instance,self.session,points)
+            size=-(-len(points)//Workers)
+            chunks=[points[k:k+size] for k in range(0,len(points),size)]
+            for k in range(len(chunks)):
+                if chunks[k][0][1] is None:
+                    #a worker has no previous solution, the first point of the chunk starts from the solution of Find_results
+                    chunks[k][0]=(chunks[k][0][0],points[0][1])
+            results=[]
+            for chunk in pool.map(solve_Pareto_chunk,[self]*len(chunks),[OF_Base]*len(chunks),chunks):
+                results+=chunk
+            return results
+
+
+
+    def Solve_stochastic(self,PV_P=None,Load_P=None,Probabilities=None,Rho=None,Iterations=100,Tolerance=10,Workers=None):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        two stage stochastic plan for an ensemble of PV and load forecasts: the powers of the ESSs, eBUSs and EVs in the first time interval
+        are the same in all scenarios (non anticipative) and the later intervals are planned for every scenario
+        it is solved by progressive hedging: the scenario problems are solved one by one on the built instance (only the forecasts change)
+        or by Workers worker processes with one instance each, so the memory does not grow with the number of scenarios,
+        the first interval decisions of the scenarios are pulled to their mean by penalties until they differ less than Tolerance
+        the base OFs of Find_Base_OFs (of the forecast of ModelParameters) are used in all scenarios
+        parameters:
+        PV_P (list): the PV forecast of every scenario with the shapes of ModelParameters, default is the PV forecast of ModelParameters in all scenarios
+        Load_P (list): the load forecast of every scenario with the shapes of ModelParameters, default is the load of ModelParameters in all scenarios
+        Probabilities (array): the probability of every scenario with shape of (n_scenarios, ), default is the same for all
+        Rho (float): the weight of the quadratic penalty per kW^2 of difference, default is found from the first iteration:
+                     the penalty of the largest difference of the scenarios is 5% of the mean OF, a larger Rho agrees faster on a worse decision
+        Tolerance (float): the largest difference in W of a first interval decision of a scenario from the mean and of the mean from the last iteration
+        Iterations (int): the maximum number of iterations
+        Workers (int): the number of worker processes, default is Workers of ModelParameters
+
+        outputs/varibales:
+        Stochastic (dict): first_stage: the powers of the first interval {'ESS_P': (n_ESS, ), 'eBUS_P': (n_eBUS, ), 'EV_P': (n_EV, )},
+                           ESS_P, eBUS_P, EV_P: the plan of every scenario with shape of (n_scenarios, n_units, n_Time_intervals),
+                           allPowers: (n_scenarios, n_Time_intervals), OF: the grid OFs of every scenario (n_scenarios, n_OF),
+                           expected_OF: (n_OF, ), probabilities, iterations, converged, gap (the largest difference of a scenario
+                           from the mean or of the mean from the last iteration in W, for every iteration), rho (the last weight of the penalty),
+                           failures (the scenario solves that the solver did not solve to the optimum) and optimal: True if the decisions
+                           converged without failures, else first_stage is None (the decisions of the scenarios are not the same)
+                           and last_first_stage is the mean of the last iteration
+        returns Stochastic
+        the instance and the results of ModelParameters are not changed
+        """
+        T=self.n_Time_intervals
+        if PV_P is None and Load_P is None:
+            raise MOEMSInputError(["PV_P and Load_P are not defined, please provide the PV or the load forecasts of the scenarios"])
+        n_scenarios=len(PV_P) if PV_P is not None else len(Load_P)
+        if PV_P is not None and Load_P is not None and len(Load_P)!=len(PV_P):
+            raise MOEMSInputError(["the number of scenarios of PV_P and Load_P is not the same, please provide one PV and one load forecast for every scenario"])
+        if PV_P is None:
+            PV_P=[self.PV_P]*n_scenarios
+        PV_P=[time_first(PV,T) for PV in PV_P]
+        if Load_P is None:
+            Load_P=[self.Load_P]*n_scenarios
+        Load_P=[time_first(Load,T) for Load in Load_P]
+        Load_P=[np.sum(Load,axis=1) if Load.ndim==2 else Load for Load in Load_P]
+        if any(np.shape(PV)!=(T,self.PV_n) for PV in PV_P if self.PV_n>0) or any(np.shape(Load)!=(T,) for Load in Load_P):
+            raise MOEMSInputError(["PV_P or Load_P is not correct, please provide the forecasts of every scenario with shape of (n_Time_intervals, n_PV) or (n_PV, n_Time_intervals)"])
+        if Probabilities is None:
+            Probabilities=np.ones(n_scenarios)
+        Probabilities=np.array(Probabilities,dtype=float)
+        if Probabilities.shape!=(n_scenarios,) or np.any(Probabilities<0) or Probabilities.sum()<=0:
+            raise MOEMSInputError(["Probabilities is not correct, please provide non negative probabilities with shape of (%d, )" % n_scenarios])
+        Probabilities=Probabilities/Probabilities.sum()
+        if Workers is None:
+            Workers=self.Workers
+
+        #the deterministic plan, its solution is the start of every scenario and is given back at the end
+        self.Solve()
+        instance=self.instance
+        OF_Base=[value(instance.OF_Base[i]) for i in instance.n_OF]
+        w_OF_Grid=[value(instance.w_OF_Grid[i]) for i in instance.n_OF]
+        solution,slices=self.session.solution()
+        #the first stage decisions are the first values of P_ESS, P_eBUS and P_EV (the values are in the order (t, n))
+        #in the charger formulation the ones of P_charger and in the session formulation the ones of the EVs connected in the first interval,
+        #they are given back for the EVs
+        if self.EV_formulation=='charger':
+            EV=('P_charger',self.EV_n_charger)
+        elif self.EV_formulation=='session':
+            EV=('P_EV',int(np.sum(np.reshape(self.EV_scedule,(T,self.EV_n))[0]==1)))
+        else:
+            EV=('P_EV',self.EV_n)
+        def first_stage(values):
+            return np.concatenate([values[slices[name]][:n] for name,n in [('P_ESS',self.ESS_n),('P_eBUS',self.eBUS_n),EV]])
+        n_first=self.ESS_n+self.eBUS_n+EV[1]
+
+        self.timer.start('stochastic')
+        pool=None
+        if Workers>1:
+            pool=ProcessPoolExecutor(max_workers=min(Workers,n_scenarios),initializer=init_PH_worker,initargs=(self,OF_Base,w_OF_Grid))
+        else:
+            add_PH_objective(instance)
+        try:
+            W=np.zeros((n_scenarios,n_first))
+            xbar=np.zeros(n_first)
+            rho=0
+            starts=[solution]*n_scenarios
+            gaps=[]
+            converged=False
+            #the number of scenario solves that the solver did not solve to the optimum
+            failures=0
+            for iteration in range(Iterations+1):
+                #the first iteration solves the scenarios without penalties
+                args=[Load_P,PV_P,list(W),[xbar]*n_scenarios,[rho]*n_scenarios,starts]
+                if pool is None:
+                    results=[solve_PH_scenario(instance,self.session,*a) for a in zip(*args)]
+                else:
+                    results=list(pool.map(solve_PH_worker,*args))
+                failures+=sum(not r[4] for r in results)
+                starts=[r[0] for r in results]
+                x=np.array([first_stage(r[0]) for r in results]).reshape(n_scenarios,n_first)
+                #the scenarios agree and their mean does not move anymore
+                last=xbar
+                xbar=Probabilities@x
+                gaps.append(float(max(np.max(np.abs(x-xbar),initial=0),np.max(np.abs(xbar-last),initial=0) if iteration>0 else 0)))
+                if gaps[-1]<=Tolerance:
+                    converged=True
+                    break
+                if Rho is None:
+                    Rho=2*0.05*abs(Probabilities@np.array([r[3] for r in results]))/(gaps[0]/1000)**2
+                rho=Rho
+                W=W+rho*(x-xbar)/1000
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            else:
+                #the instance as it was after Solve
+                remove_PH_objective(instance)
+                instance.P_load.store_values(param_data(self.Load_P))
+                instance.PV.store_values(param_data(self.PV_P,(T,self.PV_n)))
+                for v,val in zip(self.session.variables,solution):
+                    v.set_value(float(val),skip_validation=True)
+                self.session.reload()
+            self.timer.stop()
+        optimal=converged and failures==0
+        if not optimal:
+            logger.warning('Solve_stochastic did not converge: the first interval decisions of the scenarios differ by %.3g W after %d iterations, '
+                           '%d scenario solves not solved, first_stage is not given' % (gaps[-1],iteration,failures))
+
+        def plans(name,n):
+            #the plan of every scenario with shape of (n_scenarios, n_units, n_Time_intervals)
+            return np.array([r[0][slices[name]].reshape(T,n).T for r in results]).reshape(n_scenarios,n,T)
+        OF=np.array([r[1] for r in results])
+        if self.EV_formulation=='session':
+            EV_P=self.Session_EV_values(np.array([r[0][slices['P_EV']] for r in results]))
+            EV_first=np.zeros(self.EV_n)
+            EV_first[np.reshape(self.EV_scedule,(T,self.EV_n))[0]==1]=xbar[self.ESS_n+self.eBUS_n:]
+        else:
+            EV_first,EV_P=xbar[self.ESS_n+self.eBUS_n:],plans(*EV)
+        if self.EV_formulation=='charger':
+            EV_first,EV_P=self.Charger_EV_powers(EV_first[:,None])[:,0],self.Charger_EV_powers(EV_P)
+        first={'ESS_P':xbar[:self.ESS_n],'eBUS_P':xbar[self.ESS_n:self.ESS_n+self.eBUS_n],'EV_P':EV_first}
+        self.Stochastic={'first_stage':first if optimal else None,'last_first_stage':first,
+                         'ESS_P':plans('P_ESS',self.ESS_n),'eBUS_P':plans('P_eBUS',self.eBUS_n),'EV_P':EV_P,
+                         'allPowers':np.array([r[2] for r in results]),'OF':OF,'expected_OF':Probabilities@OF,
+                         'probabilities':Probabilities,'iterations':iteration,'converged':converged,'failures':failures,'optimal':optimal,
+                         'gap':gaps,'rho':rho}
+        return self.Stochastic
+
+    def Solve_decomposed(self,Rho=None,Iterations=2000,Tolerance=10,Time_limit=None):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        solves the model by decomposition for sites with many EVs, with Grid_limit='aggregate': the EVs are only coupled to the rest
+        of the site by the net power at the grid connection (EC and the grid limit), so the problem is split by ADMM (sharing form) in
+        the site step: the ESSs and eBUSs with SC and CO2 on P_site, a model without EVs solved by the solver of ModelParameters,
+        the EV step: every EV alone with its own OFs and constraints, it has a closed form (EVFleet.project) that is found for all EVs at once,
+        the grid step: EC and the grid limit on the net power, in closed form for every time interval,
+        the steps agree on the net power by the price rho*u (per kW) that is updated after every iteration
+        the base OFs are found in the same way (one run per OF as in Find_Base_OFs), the model of ModelParameters is not built
+        (use it with Lazy=True), so the size of the problem only grows with the number of EVs in numpy arrays
+        parameters:
+        Rho (float): the first weight of the penalties per kW^2, it is doubled or halved during a run to keep the difference
+                     of the net powers and the change of the grid step in balance, default is the median slope (or curvature) of the OFs per kW
+        Iterations (int): the maximum number of iterations of one run
+        Tolerance (float): in W, a run stops when the net power of the site and EV steps differs less than Tolerance from the one of
+                           the grid step and the grid step changed less than Tolerance in the last iteration, in every time interval
+        Time_limit (float): the seconds for all the runs (the base OFs and the final one), every run gets an equal share of the time that is left,
+                            a run that is stopped by the time gives its last iterate, default is no limit
+        outputs/varibales:
+        ESS_P, ESS_SOC, eBUS_P, eBUS_SOC, EV_P, EV_SOC, EV_plan, EV_P_discrete, EV_SOC_discrete, allPowers as filled by Results
+        Decomposed (dict): OF_Base, OF (the grid OFs of the final run), and for every run (the base OFs and the final one): iterations,
+                           converged, residual (the largest difference of the net powers in W) and time (s), site_failures (the site steps
+                           that the solver did not solve to the optimum) and optimal: True if all the runs converged without site_failures,
+                           else the outputs are not changed and the last iterate (ESS_P, ..., EV_SOC, allPowers) is kept in plan
+        returns Decomposed, optimal is also kept in optimal as by Solve
+        """
+        T=self.n_Time_intervals
+        if self.Grid_limit!='aggregate':
+            raise MOEMSInputError(["Solve_decomposed needs Grid_limit='aggregate', with Grid_limit='unit' every EV is bounded with every ESS, eBUS and PV, please use Results"])
+        if self.EV_n==0:
+            raise MOEMSInputError(['No EV is charging, please use Results'])
+        fleet=EVFleet(self)
+        if not fleet.supported:
+            raise MOEMSInputError(["an EV departs in the first 3 time intervals, its SOC is not one window per session, please use Results"])
+        start_time=time.perf_counter()
+        self.timer.start('decomposed')
+
+        #the site step: the model without EVs, with the objective of add_ADMM_objective
+        site=copy.copy(self)
+        for name in ['EV_er','EV_scedule','EV_max_charge','EV_max_discharge','EV_charge_efficiency','EV_discharge_efficiency',
+                     'EV_charger_phase','EV_charger_ID','EV_OFs','EV_smartcharge']:
+            setattr(site,name,[])
+        site.EV_n=0
+        site.EV_n_charger=0
+        with self.timer.phase('build'):
+            instance=site.create_model()
+            add_ADMM_objective(instance)
+            session=SolverSession(instance,self.solver,timer=self.timer)
+        #the number of site steps that the solver did not solve to the optimum
+        site_failures=[0]
+        def site_step(v,rho):
+            instance.ADMM_rho=rho
+            instance.ADMM_v.store_values(param_data(v))
+            #without ESSs and eBUSs P_site is only the load and the PVs
+            if self.ESS_n+self.eBUS_n>0:
+                session.solve()
+                site_failures[0]+=not session.optimal
+            return np.array([value(instance.P_site[t]) for t in instance.t])/1000
+
+        #the OFs in the order of the model, the weights of the grid OFs are assigned as in Solve
+        names=list(self.Grid_OFs.keys())
+        n_OF=len(names)
+        w_OF_Grid=[self.Grid_OFs.get('SC'),self.Grid_OFs.get('EC'),self.Grid_OFs.get('CO2')][:n_OF]
+        w_OF_EV=np.array([[OFs.get('SC'),OFs.get('EC'),OFs.get('CO2')][:n_OF] for OFs in self.EV_OFs],dtype=float)
+        smart=np.array(self.EV_smartcharge)=='yes'
+        buy=np.asarray(self.E_cost_buy,dtype=float).ravel()
+        sell=np.asarray(self.E_cost_sell,dtype=float).ravel()
+        CO2=np.asarray(self.CO2,dtype=float).ravel()
+        N=self.EV_n+1
+
+        def OF_values(s,x,w,OF_Base):
+            #the grid OFs and OF for the powers s of the site and x of the EVs in kW, as the expressions of the model
+            P_site=s*1000
+            P_EV=x*1000
+            net=P_site+P_EV.sum(axis=0)
+            grid={'SC':np.sum(P_site**2),'CO2':np.sum(P_site*CO2),'EC':np.sum(buy*np.maximum(net,0)+sell*np.maximum(-net,0))}
+            EV={'SC':np.sum(P_EV**2,axis=1),'CO2':P_EV@CO2,'EC':P_EV@buy}
+            OF=0
+            for i,name in enumerate(names):
+                OF=OF+w[i]*grid[name]/OF_Base[i]
+                if self.EV_n>1:
+                    OF=OF+np.sum(np.where(smart,w_OF_EV[:,i],w[i])*EV[name])/OF_Base[i]
+            return [float(grid[name]) for name in names],float(OF)
+
+        def run(w,OF_Base,s,x,time_limit):
+            #one ADMM run for the weights w and the base OFs OF_Base of the grid OFs, from the powers s and x
+            for i in range(n_OF):
+                instance.w_OF_Grid[i+1]=w[i]
+                instance.OF_Base[i+1]=OF_Base[i]
+            k={name:w[i]/OF_Base[i] for i,name in enumerate(names)}
+            #the OFs of the EVs per kW: a*x^2 + b*x, the EV terms are only in OF for more than one EV
+            a=np.zeros(self.EV_n)
+            b=np.zeros((self.EV_n,T))
+            if self.EV_n>1:
+                for i,name in enumerate(names):
+                    c=np.where(smart,w_OF_EV[:,i],w[i])/OF_Base[i]
+                    if name=='SC':
+                        a=a+c*1e6
+                    elif name=='CO2':
+                        b=b+c[:,None]*CO2*1000
+                    elif name=='EC':
+                        b=b+c[:,None]*buy*1000
+            #EC of the net power per kW above and below 0 (the power injected to the grid is paid with the sell price)
+            up=k.get('EC',0)*buy*1000
+            down=-k.get('EC',0)*sell*1000
+            #the weight of the penalties starts from the typical slope (or curvature) of the OFs per kW, the steps move in the first
+            #iterations only if it is not much larger than the OFs
+            scales=np.concatenate([2*a,np.max(np.abs(b),axis=1,initial=0),[np.max(up),np.max(-down),2*k.get('SC',0)*1e6,k.get('CO2',0)*np.max(np.abs(CO2))*1000]])
+            rho=Rho if Rho is not None else (np.median(scales[scales>0]) if np.any(scales>0) else 1)
+            xbar=(s+x.sum(axis=0))/N
+            z=xbar
+            u=np.zeros(T)
+            begin=time.perf_counter()
+            converged=False
+            for iteration in range(1,Iterations+1):
+                s=site_step(s-xbar+z-u,rho)
+                x=fleet.project(x-xbar+z-u,a,b,rho)
+                xbar=(s+x.sum(axis=0))/N
+                #the grid step: the net power q=N*z that minimises EC(q) + rho/(2N)*(q-N*(u+xbar))^2 in the limits of the grid
+                q=N*(u+xbar)
+                q=np.where(q-N/rho*up>0,q-N/rho*up,np.where(q-N/rho*down<0,q-N/rho*down,0))
+                q=np.clip(q,-self.Grid_max_out/1000,self.Grid_max_in/1000)
+                last=z
+                z=q/N
+                u=u+xbar-z
+                primal=N*np.max(np.abs(xbar-z))
+                dual=N*np.max(np.abs(z-last))
+                if max(primal,dual)*1000<=Tolerance:
+                    converged=True
+                    break
+                if time_limit is not None and time.perf_counter()-begin>time_limit:
+                    break
+                #the weight of the penalties keeps the two residuals (both in kW) in balance, u is scaled with it
+                if primal>10*dual:
+                    rho=rho*2
+                    u=u/2
+                elif dual>10*primal:
+                    rho=rho/2
+                    u=u*2
+            info={'iterations':iteration,'converged':converged,'residual':max(primal,dual)*1000,'time':time.perf_counter()-begin}
+            return s,x,info
+
+        try:
+            s=np.zeros(T)
+            x=np.zeros((self.EV_n,T))
+            runs=[]
+            def time_left():
+                if Time_limit is None:
+                    return None
+                return (Time_limit-(time.perf_counter()-start_time))/(n_OF+1-len(runs))
+            #the base OFs as in Find_Base_OFs: the OF of number i alone with the base OFs found before it
+            OF_Base=[1]*n_OF
+            for i in range(n_OF):
+                w=[0]*n_OF
+                w[i]=1
+                with self.timer.phase(names[i]):
+                    s,x,info=run(w,OF_Base,s,x,time_left())
+                runs.append(info)
+                OF_Base[i]=base_OF_value(OF_values(s,x,w,OF_Base)[1])
+            with self.timer.phase('final'):
+                s,x,info=run(w_OF_Grid,OF_Base,s,x,time_left())
+            runs.append(info)
+        finally:
+            self.timer.stop()
+        #the outputs as in Extract_results
+        values,slices=session.solution()
+        def unit_time(name,n):
+            return values[slices[name]].reshape(T,n).T.copy()
+        plan={'ESS_P':unit_time('P_ESS',self.ESS_n) if self.ESS_n>0 else np.zeros((1,T)),
+              'ESS_SOC':unit_time('ESS_SOC',self.ESS_n) if self.ESS_n>0 else np.zeros((1,T)),
+              'eBUS_P':unit_time('P_eBUS',self.eBUS_n) if self.eBUS_n>0 else np.zeros((1,T)),
+              'eBUS_SOC':unit_time('SOC_eBUS',self.eBUS_n) if self.eBUS_n>0 else np.zeros((1,T)),
+              'EV_P':x*1000,'EV_SOC':fleet.SOC(x)*1000,'allPowers':s*1000+x.sum(axis=0)*1000}
+        self.Decomposed={'OF_Base':OF_Base,'OF':OF_values(s,x,w_OF_Grid,OF_Base)[0],'iterations':[info['iterations'] for info in runs],
+                         'converged':[info['converged'] for info in runs],'residual':[info['residual'] for info in runs],
+                         'time':[info['time'] for info in runs],'site_failures':site_failures[0]}
+        not_converged=[name for name,info in zip(names+['final'],runs) if not info['converged']]
+        self.optimal=self.Decomposed['optimal']=not not_converged and site_failures[0]==0
+        if not self.optimal:
+            #the last iterate is only kept in Decomposed, the outputs are not changed
+            self.Decomposed['plan']=plan
+            logger.warning('Solve_decomposed did not converge for %s (difference of the net powers %.3g W, %d site steps not solved), '
+                           'the outputs are not changed, the last iterate is in Decomposed[\'plan\']'
+                           % (', '.join(not_converged) or 'none of the runs',max(info['residual'] for info in runs),site_failures[0]))
+            return self.Decomposed
+        for name,values in plan.items():
+            setattr(self,name,values)
+        self.EV_plan=np.transpose(np.reshape(self.EV_scedule,(T,self.EV_n))).astype(float)
+        self.Discretize_EVs()
+        return self.Decomposed
+
+    def Solve_aggregated(self,Tolerance=0.02,Max_length=None):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        solves the model on a shorter time grid and gives the plan for every time interval: consecutive time intervals with almost the same
+        prices, CO2, load and PV and the same schedules of the eBUSs and EVs are merged into blocks (the first 3 intervals are not merged,
+        the SOC rules of the EVs depend on them), every block has one power per unit and its OF terms and energies are weighted by its
+        length (like intervalMerge of DiscretizationPlanning), the reduced model is built and solved as in Solve
+        the plan is expanded back to every time interval: the powers are the same in all the intervals of a block and the SOCs follow from them,
+        so the SOC limits and the energies of the EVs hold in every interval (a SOC is monotone in a block), the grid limits hold for the
+        mean load and PV of a block
+        parameters:
+        Tolerance (float): the largest difference of a price, CO2, load or PV in a block from its first interval, as a share of the range of the series
+        Max_length (int): the largest number of intervals in a block, default is no limit
+
+        outputs/varibales:
+        ESS_P, ESS_SOC, eBUS_P, eBUS_SOC, EV_P, EV_SOC, EV_plan, EV_P_discrete, EV_SOC_discrete, allPowers as filled by Results
+        Aggregated (dict): lengths (the number of intervals of every block), n_blocks, OF_Base and OF (the grid OFs of the reduced model,
+                           the OF terms of the load and PV inside a block are the ones of their mean), optimal (as Solve of the reduced model) and time (s)
+        """
+        T=self.n_Time_intervals
+        start_time=time.perf_counter()
+        self.timer.start('aggregated')
+        try:
+            #the series that a block has to keep (almost) the same and the schedules that it has to keep the same
+            PV_P=time_first(self.PV_P,T).reshape(T,-1)
+            Load_P=np.reshape(self.Load_P,(T,-1)).sum(axis=1)
+            series=np.column_stack([np.reshape(np.asarray(values,dtype=float),T) for values in [self.E_cost_buy,self.E_cost_sell,self.CO2]]+[Load_P,PV_P])
+            tolerance=Tolerance*np.ptp(series,axis=0)
+            schedules=np.column_stack([np.reshape(schedule_rows(self.eBus_scedule,T,self.eBUS_n),(T,self.eBUS_n)),
+                                       np.reshape(schedule_rows(self.EV_scedule,T,self.EV_n),(T,self.EV_n))])
+            starts=[]
+            for t in range(T):
+                if (t>=3 and starts[-1]>=3 and (Max_length is None or t-starts[-1]<Max_length)
+                    and np.all(np.abs(series[t]-series[starts[-1]])<=tolerance) and np.array_equal(schedules[t],schedules[starts[-1]])):
+                    continue
+                starts.append(t)
+            lengths=np.diff(starts+[T])
+            def block_mean(values):
+                return np.add.reduceat(values,starts,axis=0)/lengths.reshape((-1,)+(1,)*(np.ndim(values)-1))
+
+            #the reduced model: the means of the forecasts and the schedules of the first interval of every block
+            reduced=copy.copy(self)
+            reduced.n_Time_intervals=len(starts)
+            reduced.Interval_lengths=lengths.tolist()
+            reduced.Load_P=block_mean(Load_P)
+            reduced.PV_P=block_mean(PV_P)
+            reduced.E_cost_buy,reduced.E_cost_sell,reduced.CO2=[block_mean(series[:,k]) for k in range(3)]
+            reduced.eBus_scedule=schedules[starts,:self.eBUS_n]
+            reduced.EV_scedule=schedules[starts,self.eBUS_n:]
+            reduced.model=reduced.instance=reduced.session=None
+            reduced.Base_OFs_found=reduced.solved=reduced.extracted=False
+            reduced.Solve()
+
+            ##the plan of every time interval, the powers are the same in all the intervals of a block
+            values,slices=reduced.session.solution()
+            def unit_time(name,n):
+                return np.repeat(values[slices[name]].reshape(len(starts),n).T,lengths,axis=1)
+            deltaT=self.Time_Resolution/60
+            if self.ESS_n>0:
+                #the SOC rule of the model for every interval
+                self.ESS_P=unit_time('P_ESS',self.ESS_n)
+                self.ESS_SOC=np.zeros((self.ESS_n,T))
+                efficiency=np.array(self.ESS_charge_efficiency,dtype=float)
+                SOC=np.array(self.ESS_SOC_init,dtype=float)/100*np.array(self.ESS_capacity,dtype=float)+self.ESS_P[:,0]*efficiency/100*deltaT
+                self.ESS_SOC[:,0]=SOC
+                for t in range(1,T):
+                    SOC=ESS_SOC_regression(SOC,self.ESS_P[:,t],efficiency,deltaT)
+                    self.ESS_SOC[:,t]=SOC
+            else:
+                self.ESS_P=np.zeros((1,T))
+                self.ESS_SOC=np.zeros((1,T))
+            if self.eBUS_n>0:
+                self.eBUS_P=unit_time('P_eBUS',self.eBUS_n)
+                energy=(self.eBUS_P*np.array(self.eBUS_charge_efficiency,dtype=float)[:,None]/100
+                        -schedules[:,:self.eBUS_n].T*np.array(self.eBUS_round_trip_energy,dtype=float)[:,None])*deltaT
+                self.eBUS_SOC=np.array(self.eBUS_SOC_init,dtype=float)[:,None]/100*np.array(self.eBUS_capacity,dtype=float)[:,None]+np.cumsum(energy,axis=1)
+            else:
+                self.eBUS_P=np.zeros((1,T))
+                self.eBUS_SOC=np.zeros((1,T))
+            if self.EV_n>0:
+                if self.EV_formulation=='charger':
+                    self.EV_P=self.Charger_EV_powers(unit_time('P_charger',self.EV_n_charger))
+                elif self.EV_formulation=='session':
+                    self.EV_P=np.repeat(reduced.Session_EV_values(values[slices['P_EV']]),lengths,axis=1)
+                else:
+                    self.EV_P=unit_time('P_EV',self.EV_n)
+                #the SOC rule of the model for every interval
+                self.EV_SOC=self.EV_SOC_plan(self.EV_P)
+                self.EV_plan=schedules[:,self.eBUS_n:].T.astype(float)
+                self.Discretize_EVs()
+            else:
+                self.EV_P=np.zeros((1,T))
+                self.EV_SOC=np.zeros((1,T))
+                self.EV_plan=np.zeros((1,T))
+                self.EV_P_discrete=np.zeros((1,T))
+                self.EV_SOC_discrete=np.zeros((1,T))
+            self.allPowers=Load_P+self.EV_P.sum(axis=0)+self.eBUS_P.sum(axis=0)+self.ESS_P.sum(axis=0)-PV_P.sum(axis=1)
+        finally:
+            self.timer.stop()
+        instance=reduced.instance
+        self.optimal=reduced.optimal
+        self.Aggregated={'lengths':lengths,'n_blocks':len(starts),'OF_Base':[value(instance.OF_Base[i]) for i in instance.n_OF],
+                         'OF':[value(instance.OF_Grid[i]) for i in instance.n_OF],'optimal':reduced.optimal,'time':time.perf_counter()-start_time}
+        return self.Aggregated
+
+
+
+    def DiscretizationPlanning_fleet(self, desired, EV_plan, chargingPowers, chargeRequired=None, prices=None, beta=1):
+        """
+        @author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+        DiscretizationPlanning for all the EVs at once with numpy, the results are the same as DiscretizationPlanning for every EV
+        (without powerLimitsUpper, efficiency and intervalMerge)
+        desired (array): the planned power of the EVs with shape of (n_EV, n_Time_intervals)
+        EV_plan (array): the plan of the EVs with shape of (n_EV, n_Time_intervals)
+        chargingPowers (array): the charging powers of the charger of every EV with shape of (n_EV, n_chargingPowers)
+        chargeRequired (array): the charge of every EV with shape of (n_EV, ), default is the sum of desired
+        prices (array): the prices with shape of (n_Time_intervals, ) or (n_EV, n_Time_intervals), default is zero
+        returns the discrete power and SOC of the EVs with shape of (n_EV, n_Time_intervals)
+        """
+        desired=np.asarray(desired,dtype=float)
+        n_EV,T=desired.shape
+        chargingPowers=np.sort(np.asarray(chargingPowers,dtype=float),axis=1)
+        assert(chargingPowers.shape[1] >= 2)
+        if chargeRequired is None:
+            chargeRequired=[np.sum(desired[n]) for n in range(n_EV)]
+        chargeRequired=np.asarray(chargeRequired,dtype=float)
+        if prices is None:
+            prices=np.zeros((n_EV,T))
+        prices=np.broadcast_to(np.asarray(prices,dtype=float),(n_EV,T))
+
+        #slope of every step j (from chargingPowers[j-1] to chargingPowers[j]) in every time interval, with shape of (n_EV, T, n_steps)
+        #the slopes of a time interval grow with j, so taking the smallest slope first (the heap of DiscretizationPlanning)
+        #is the same as taking the steps in the order of their slopes
+        low=chargingPowers[:,None,:-1]
+        high=chargingPowers[:,None,1:]
+        d=desired[:,:,None]
+        p=prices[:,:,None]
+        slopes=(p*high + beta*(high-d)**2 - (p*low + beta*(low-d)**2)) / (high-low)
+        slopes=slopes.reshape(n_EV,-1)
+        #the steps are sorted by slope, then by time interval and step like the tuples in the heap
+        order=np.argsort(slopes,axis=1,kind='stable')
+        steps=np.broadcast_to(high-low,(n_EV,T,high.shape[2])).reshape(n_EV,-1)
+        steps=np.take_along_axis(steps,order,axis=1)
+
+        #the remaining charge before every step, a step is taken while more than 0.001 is remaining
+        remaining=np.subtract.accumulate(np.concatenate([chargeRequired[:,None],steps],axis=1),axis=1)[:,:-1]
+        sigma=np.minimum(remaining,steps)
+        #after the first step that is not taken completely, no charge is remaining
+        partial=np.cumsum(remaining<=steps,axis=1)
+        taken=(remaining>0.001) & ((partial==0) | ((partial==1) & (remaining<=steps)))
+        result=np.zeros(n_EV*T)
+        rows=np.repeat(np.arange(n_EV)*T,order.shape[1]).reshape(order.shape)
+        index=(rows+order//high.shape[2])[taken]
+        np.add.at(result,index,sigma[taken])
+        result=result.reshape(n_EV,T)
+
+        #SOC is the charge before every time interval until the first departure of the EV
+        EV_plan=np.asarray(EV_plan,dtype=float).reshape(n_EV,T)
+        SOC=np.zeros((n_EV,T))
+        SOC[:,0]=result[:,0]
+        SOC[:,1:]=np.cumsum(result,axis=1)[:,:-1]*(self.Time_Resolution/60)
+        departed=np.cumsum(np.diff(EV_plan,axis=1)==-1,axis=1)>0
+        SOC[:,1:][departed]=0
+        return result,SOC
+
+
 
     def DiscretizationPlanning(self, desired, chargeRequired,EV_plan, chargingPowers, powerLimitsUpper = [], prices = None, beta = 1, efficiency = None, intervalMerge=None):
         """
@@ -935,13 +3338,13 @@ class ModelParameters:
                 association = (slope, pair)
                 slopes.append(association)
 
+        #the slopes are kept in a heap, so the smallest slope is found without sorting all of them in every step
+        heapq.heapify(slopes)
+
         #now append the other options:
         while(remainingCharge > 0.001 and len(slopes)>0):
-            #sort the slopes
-            slopes.sort()
-
-            i = slopes[0][1][0]
-            j = slopes[0][1][1]
+            #take the smallest slope
+            slope, (i, j) = heapq.heappop(slopes)
 
             assert(j>0)
 
@@ -950,8 +3353,6 @@ class ModelParameters:
             result[i] += sigma / intervalMerge[i]
             remainingCharge -= sigma
 
-            slopes.pop(0)
-
             if(j < len(chargingPowers)-1):
                 if len(powerLimitsUpper) == 0 or chargingPowers[j+1] <= powerLimitsUpper[i]:
                     #add new entry to replace
@@ -962,7 +3363,7 @@ class ModelParameters:
                     #add the association
                     pair = (i, j+1)
                     association = (slope, pair)
-                    slopes.append(association)
+                    heapq.heappush(slopes, association)
         
         SOC=[np.sum(result[0])]
         k=0
@@ -0,0 +1,28 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+compares solving synthetic sites one after the other (ModelParameters in a loop) with Batch and 1, 2 and 4 workers,
+the throughput only grows up to the number of CPUs
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_batch.py [n_sites]
+"""
+import os,sys,time
+import numpy as np
+from common import ModelParameters
+from synthetic import synthetic_site
+from MOEMS import Batch
+
+
+if __name__=='__main__':
+    n_sites=int(sys.argv[1]) if len(sys.argv)>1 else 8
+    Scenarios={'site %d'%k:dict(synthetic_site(T=48,n_EV=3,n_ESS=1,seed=k),Solver='scipy') for k in range(n_sites)}
+    print('%d sites, %d CPUs'%(n_sites,os.cpu_count()))
+    print('%-12s %10s %18s %10s %8s'%('','wall [s]','sites per minute','speedup','same'))
+    start=time.perf_counter()
+    serial={name:ModelParameters(**Scenario).allPowers for name,Scenario in Scenarios.items()}
+    loop=time.perf_counter()-start
+    print('%-12s %10.2f %18.1f %10s %8s'%('loop',loop,60*n_sites/loop,'-','-'))
+    for Workers in [1,2,4]:
+        batch=Batch(Scenarios,Workers=Workers)
+        results=batch.run_all()
+        same=all(results[name]['status']=='ok' and np.allclose(results[name]['MOEMS'].allPowers,serial[name]) for name in Scenarios)
+        print('%-12s %10.2f %18.1f %10.2f %8s'%('%d workers'%Workers,batch.report['wall'],60*batch.report['throughput'],loop/batch.report['wall'],same))
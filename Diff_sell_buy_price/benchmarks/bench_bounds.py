@@ -0,0 +1,84 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+the size of the problem that the solver gets (the NL file of ipopt: variables, constraints and nonzeros of the Jacobian)
+and the time to build and solve it with the scipy solver, for the inputs of ../Base_Version/main_a_day.py (2 ESSs, 2 EVs, 96 intervals,
+SC, EC and CO2, its one electricity_cost is given as the buy and the sell price, it is infeasible: the minimum powers of its EVs
+(6A on the charger, 95% of the maximum without smart charging) in all their connected intervals give more than EV_er, so only its size
+is compared), of main_a_day_with_no_Ebus_EV_selling_buying.py
+(2 ESSs, 96 intervals, EC only) and the sites of benchmarks/synthetic.py with eBUSs and EVs in the EV and the charger formulations
+the power and SOC limits of a single variable are its bounds and the powers of the units that are not connected are fixed,
+run it on an older version of the model to see the size of the model with these limits as constraints
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_bounds.py
+"""
+import os,time,tempfile
+import numpy as np
+from common import ModelParameters,BuildOnly
+from synthetic import synthetic_site,public_site
+from pyomo.environ import value
+
+
+def base_main_a_day():
+    #the inputs of ../Base_Version/main_a_day.py, the model of Base_Version has one electricity_cost for buying and selling
+    T=96
+    PV=np.sin(np.linspace(-np.pi,0,48))**2
+    cost=[0.2]*40+[0.3]*20+[0.2]*36
+    return dict(Time_Resolution=15,n_Time_intervals=T,Grid_max_in=30000,Grid_max_out=30000,Grid_OFs={'EC':10,'SC':80,'CO2':10},
+                Load_P=[[0]*40+[1500]*20+[0]*36,[0]*50+[2000]*25+[0]*21],PV_P=[[0]*24+(PV*17000).tolist()+[0]*24,[0]*24+(PV*26000).tolist()+[0]*24],
+                electricity_cost_buy=cost,electricity_cost_sell=cost,CO2=[8]*40+[5]*20+[12]*28+[8]*8,
+                ESS_capacity=[13000,13000],ESS_SOC_init=[26,30],ESS_max_charge=[12000,12000],ESS_max_discharge=[12000,12000],
+                ESS_charge_efficiency=[100,100],ESS_discharge_efficiency=[100,100],
+                eBUS_capacity=[],eBUS_SOC_init=[],eBUS_max_charge=[],eBUS_max_discharge=[],eBUS_charge_efficiency=[],eBUS_discharge_efficiency=[],
+                eBUS_round_trip_energy=[],eBus_scedule=[],
+                EV_er=[15000,21000],EV_scedule=[[0]*40+[1]*28+[0]*28,[0]*72+[1]*24],EV_max_charge=[11000,7000],EV_max_discharge=[0,0],
+                EV_charge_efficiency=[100,100],EV_discharge_efficiency=[100,100],EV_n_charger=3,EV_charger_phase=[3,1,3],EV_charger_ID=[1,2],
+                EV_OFs=[{'EC':50,'SC':10,'CO2':40},{'EC':60,'CO2':20}],EV_smartcharge=['yes','no'])
+
+
+def main_a_day():
+    #the inputs of main_a_day_with_no_Ebus_EV_selling_buying.py with the loads, PVs and CO2 that it gives before it sets them to 0
+    #(without load and PV the base OF of SC is 0 and the OF can not be scaled by it)
+    T=96
+    PV=np.sin(np.linspace(-np.pi,0,48))**2
+    return dict(Time_Resolution=15,n_Time_intervals=T,Grid_max_in=30000,Grid_max_out=30000,Grid_OFs={'EC':100,'SC':0,'CO2':0},
+                Load_P=[[0]*40+[1500]*20+[0]*36,[0]*50+[2000]*25+[0]*21],PV_P=[[0]*24+(PV*17000).tolist()+[0]*24,[0]*24+(PV*26000).tolist()+[0]*24],
+                electricity_cost_buy=[0.2]*40+[0.3]*20+[0.2]*36,electricity_cost_sell=[0.1]*40+[0.15]*20+[0.1]*36,CO2=[8]*40+[5]*20+[12]*28+[8]*8,
+                ESS_capacity=[13000,13000],ESS_SOC_init=[26,30],ESS_max_charge=[12000,12000],ESS_max_discharge=[12000,12000],
+                ESS_charge_efficiency=[100,100],ESS_discharge_efficiency=[100,100])
+
+
+def NL_size(instance):
+    #the variables, constraints and nonzeros of the Jacobian in the header of the NL file, the fixed variables are not in it
+    #the weights and base OFs of the built model are not set yet, they do not change the size
+    for i in instance.n_OF:
+        instance.w_OF_Grid[i]=1
+        instance.OF_Base[i]=1
+    with tempfile.TemporaryDirectory() as folder:
+        path=os.path.join(folder,'model.nl')
+        instance.write(path,format='nl')
+        with open(path) as f:
+            header=[next(f) for k in range(8)]
+    n_vars,n_cons=[int(a) for a in header[1].split()[:2]]
+    nonzeros=int(header[7].split()[0])
+    return n_vars,n_cons,nonzeros
+
+
+CASES=[('Base main_a_day',base_main_a_day,{}),
+       ('main_a_day',main_a_day,{}),
+       ('96 x 10 EVs',lambda: synthetic_site(T=96,n_EV=10,n_ESS=2,n_eBUS=1),{}),
+       ('288 x 20 EVs',lambda: synthetic_site(T=288,n_EV=20,n_ESS=2,n_eBUS=2),{}),
+       ('96 x 10 chargers',lambda: public_site(T=96,n_charger=10,n_sessions=100),{'EV_formulation':'charger'})]
+
+
+if __name__=='__main__':
+    print('%-18s %10s %12s %10s %10s %10s %14s %8s'%('case','variables','constraints','nonzeros','build [s]','solve [s]','OF','optimal'))
+    for name,inputs,options in CASES:
+        data=inputs()
+        start=time.perf_counter()
+        instance=BuildOnly(Solver='scipy',**options,**data).instance
+        build_time=time.perf_counter()-start
+        n_vars,n_cons,nonzeros=NL_size(instance)
+        start=time.perf_counter()
+        MOEMS=ModelParameters(Solver='scipy',**options,**data)
+        solve_time=time.perf_counter()-start
+        print('%-18s %10d %12d %10d %10.2f %10.2f %14.9f %8s'%(name,n_vars,n_cons,nonzeros,build_time,solve_time,value(MOEMS.instance.OF),MOEMS.optimal))
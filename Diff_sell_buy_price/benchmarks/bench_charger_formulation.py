@@ -0,0 +1,53 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+the EV formulation against the charger formulation (EV_formulation='charger') on public sites of benchmarks/synthetic.py,
+where every charger is shared by a chain of short sessions: the size and the build time of the models and, with --solve,
+the time and OF of the solve (base OFs and the solve with the scipy backend), the OFs are the same but the solutions can differ
+where the OF is flat
+check_idle_chargers first solves sites with more chargers than EVs (chargers without a session) in both formulations, before and after
+a Replan, and fails if the OFs are not the same
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_charger_formulation.py [--solve]
+"""
+import sys,time
+import numpy as np
+from common import BuildOnly,ModelParameters
+from synthetic import public_site
+from pyomo.environ import value,Var,Constraint
+
+
+def check_idle_chargers():
+    #5 chargers with 2 sessions (3 chargers are idle all the time) and 10 chargers with 12 sessions (some idle before their first session)
+    for n_charger,n_sessions in [(5,2),(10,12)]:
+        data=public_site(T=96,n_charger=n_charger,n_sessions=n_sessions)
+        OFs={}
+        for formulation in ['EV','charger']:
+            MOEMS=ModelParameters(Solver='scipy',EV_formulation=formulation,**data)
+            OF=value(MOEMS.instance.OF)
+            MOEMS.Replan(Steps=3)
+            OFs[formulation]=[OF,value(MOEMS.instance.OF)]
+        np.testing.assert_allclose(OFs['charger'],OFs['EV'],rtol=1e-6)
+        print('idle chargers: %d chargers, %d sessions, OF %.6f and %.6f after Replan in both formulations'%(n_charger,n_sessions,*OFs['EV']))
+
+
+if __name__=='__main__':
+    solve='--solve' in sys.argv
+    check_idle_chargers()
+    print('%4s %8s %8s %-8s %10s %12s %10s %10s %10s'%('T','chargers','sessions','model','variables','constraints','build [s]','solve [s]','OF'))
+    for T,n_charger,n_sessions in [(96,10,100),(96,30,400)]:
+        data=public_site(T=T,n_charger=n_charger,n_sessions=n_sessions)
+        for formulation in ['EV','charger']:
+            start=time.perf_counter()
+            MOEMS=BuildOnly(EV_formulation=formulation,**data)
+            build_time=time.perf_counter()-start
+            instance=MOEMS.instance
+            n_variables=sum(len(var) for var in instance.component_objects(Var))
+            n_constraints=sum(len(con) for con in instance.component_objects(Constraint,active=True))
+            solve_time,OF='-','-'
+            if solve:
+                MOEMS=ModelParameters(Solver='scipy',Lazy=True,EV_formulation=formulation,**data)
+                start=time.perf_counter()
+                MOEMS.Results()
+                solve_time='%.1f'%(time.perf_counter()-start)
+                OF='%.6f'%value(MOEMS.instance.OF)
+            print('%4d %8d %8d %-8s %10d %12d %10.1f %10s %10s'%(T,n_charger,n_sessions,formulation,n_variables,n_constraints,build_time,solve_time,OF))
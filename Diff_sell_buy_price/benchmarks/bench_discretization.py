@@ -0,0 +1,76 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+compares DiscretizationPlanning (slopes in a heap) with the old version that sorted the list of slopes in every step
+for one EV that is connected for the whole horizon of 1440 intervals (1 minute resolution)
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_discretization.py
+"""
+import time
+from types import SimpleNamespace
+import numpy as np
+from common import ModelParameters
+
+
+def DiscretizationPlanning_list(Time_Resolution, desired, chargeRequired,EV_plan, chargingPowers, powerLimitsUpper = [], prices = None, beta = 1, efficiency = None, intervalMerge=None):
+    #the old version: the slopes are sorted and the first one is popped in every step
+    result = [0] * len(desired)
+    remainingCharge = chargeRequired
+    if efficiency is None:
+        efficiency = [1] * len(chargingPowers)
+    if prices is None:
+        prices = [0] * len(desired)
+    if intervalMerge is None:
+        intervalMerge = [1] * len(desired)
+    chargingPowers.sort()
+    slopes = []
+    for i in range(0, len(desired)):
+        if len(powerLimitsUpper) == 0 or chargingPowers[1] <= powerLimitsUpper[i]:
+            slope = ((prices[i] * chargingPowers[1] * efficiency[1] + beta * intervalMerge[i] * pow((chargingPowers[1] * efficiency[1]) - desired[i], 2) \
+                    - (prices[i] * chargingPowers[0]  * efficiency[0] + beta * intervalMerge[i] * pow((chargingPowers[0] * efficiency[0]) - desired[i], 2) )) \
+                    / (intervalMerge[i]*((chargingPowers[1] * efficiency[1]) - (chargingPowers[0] * efficiency[0])))).real
+            slopes.append((slope, (i, 1)))
+    while(remainingCharge > 0.001 and len(slopes)>0):
+        slopes.sort()
+        i = slopes[0][1][0]
+        j = slopes[0][1][1]
+        sigma = min(remainingCharge, intervalMerge[i]*(chargingPowers[j] - chargingPowers[j-1]))
+        result[i] += sigma / intervalMerge[i]
+        remainingCharge -= sigma
+        slopes.pop(0)
+        if(j < len(chargingPowers)-1):
+            if len(powerLimitsUpper) == 0 or chargingPowers[j+1] <= powerLimitsUpper[i]:
+                slope = ((prices[i]*chargingPowers[j+1]*efficiency[j+1] + beta * intervalMerge[i] * pow((chargingPowers[j+1] * efficiency[j+1])- desired[i], 2) \
+                    - (prices[i] * chargingPowers[j] * efficiency[j] + beta * intervalMerge[i] * pow((chargingPowers[j] * efficiency[j]) - desired[i], 2) )) \
+                    / (intervalMerge[i]*((chargingPowers[j+1] * efficiency[j+1]) - (chargingPowers[j] * efficiency[j])))).real
+                slopes.append((slope, (i, j+1)))
+    SOC=[np.sum(result[0])]
+    k=0
+    for it in range(1,len(result)):
+        if EV_plan[it]-EV_plan[it-1]==-1:
+            k=1
+        if k==0:
+            SOC.append(np.multiply(np.sum(result[0:it]),Time_Resolution/60))
+        else:
+            SOC.append(0)
+    return result,SOC
+
+
+if __name__=='__main__':
+    T=1440
+    MOEMS=SimpleNamespace(Time_Resolution=1)
+    chargingPowers=np.multiply(list(range(6,33)),230*3)
+    rng=np.random.default_rng(0)
+    desired=(rng.uniform(0.2,1,T)*chargingPowers[-1]).tolist()
+    EV_plan=[1]*T
+    print('one EV, %d intervals, %d charging powers'%(T,len(chargingPowers)))
+    print('%16s %12s %12s %10s %8s'%('charge required','list [s]','heap [s]','speedup','same'))
+    for share in [0.25,0.5,1]:
+        chargeRequired=share*np.sum(desired)
+        start=time.perf_counter()
+        old=DiscretizationPlanning_list(1,desired,chargeRequired,EV_plan,chargingPowers.copy())
+        list_time=time.perf_counter()-start
+        start=time.perf_counter()
+        new=ModelParameters.DiscretizationPlanning(MOEMS,desired,chargeRequired,EV_plan,chargingPowers.copy())
+        heap_time=time.perf_counter()-start
+        same=old[0]==new[0] and np.array_equal(old[1],new[1])
+        print('%15.0f%% %12.3f %12.3f %10.1f %8s'%(share*100,list_time,heap_time,list_time/heap_time,same))
@@ -0,0 +1,55 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+compares Extract_results (one pass over the values of all variables into numpy arrays) with the old extraction
+that called value() for every variable of every output, the variables get random values instead of being solved
+and the EV discretization is skipped in both, the first Extract_results also makes the list of the variables of the instance
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_extract_results.py
+"""
+import time
+import numpy as np
+from pyomo.environ import *
+from common import BuildOnly,ModelParameters,site
+
+
+class ExtractOnly(BuildOnly):
+    #builds the model and extracts the results without solving it
+    Extract_results=ModelParameters.Extract_results
+    def DiscretizationPlanning_fleet(self,desired,EV_plan,chargingPowers):
+        return np.zeros(np.shape(desired)),np.zeros(np.shape(desired))
+
+
+def extract_old(MOEMS):
+    #the old extraction: nested list comprehensions with one value() per variable
+    instance=MOEMS.instance
+    ESS_P = [[value(instance.P_ESS[t,n]) for t in instance.t] for n in instance.n_ess]
+    ESS_SOC = [[value(instance.ESS_SOC[t,n]) for t in instance.t] for n in instance.n_ess]
+    eBUS_P = [[value(instance.P_eBUS[t,n]) for t in instance.t] for n in instance.n_eBus]
+    eBUS_SOC = [[value(instance.SOC_eBUS[t,n]) for t in instance.t] for n in instance.n_eBus]
+    EV_P = [[value(instance.P_EV[t,n]) for t in instance.t] for n in instance.n_EV]
+    EV_SOC = [[value(instance.EV_SOC[t,n]) for t in instance.t] for n in instance.n_EV]
+    Load_P = [[value(instance.P_load[t]) for t in instance.t] for n in instance.n_l]
+    PV_P = [[value(instance.PV[t,n]) for t in instance.t] for n in instance.n_pv]
+    allPowers=np.sum([np.sum(Load_P,axis=0),np.sum(EV_P,axis=0),np.sum(eBUS_P,axis=0),np.sum(ESS_P,axis=0),np.multiply(np.sum(PV_P,axis=0),-1)],axis=0)
+    return ESS_P,ESS_SOC,eBUS_P,eBUS_SOC,EV_P,EV_SOC,allPowers
+
+
+if __name__=='__main__':
+    rng=np.random.default_rng(0)
+    print('%6s %6s %12s %14s %14s %10s %8s'%('T','n_EV','old [s]','first [s]','again [s]','speedup','same'))
+    for T,n_EV in [(96,10),(96,100),(96,1000),(1440,100)]:
+        MOEMS=ExtractOnly(Grid_limit='aggregate',**site(T,n_EV,n_eBUS=2))
+        for v in MOEMS.instance.component_data_objects(Var):
+            v.set_value(rng.uniform(0,1000),skip_validation=True)
+        start=time.perf_counter()
+        old=extract_old(MOEMS)
+        old_time=time.perf_counter()-start
+        start=time.perf_counter()
+        MOEMS.Extract_results()
+        first_time=time.perf_counter()-start
+        start=time.perf_counter()
+        MOEMS.Extract_results()
+        new_time=time.perf_counter()-start
+        new=(MOEMS.ESS_P,MOEMS.ESS_SOC,MOEMS.eBUS_P,MOEMS.eBUS_SOC,MOEMS.EV_P,MOEMS.EV_SOC,MOEMS.allPowers)
+        same=all(np.allclose(np.array(a,dtype=float),b,rtol=1e-12,atol=1e-9) for a,b in zip(old,new))
+        print('%6d %6d %12.3f %14.3f %14.3f %10.1f %8s'%(T,n_EV,old_time,first_time,new_time,old_time/new_time,same))
@@ -0,0 +1,93 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+Solve_decomposed against the model with all the EVs in it (Results) on small fleets: the solution of Solve_decomposed (its last iterate if it did not converge) is put into
+the built model to check its constraints and its OF with the same base OFs, then Solve_decomposed alone for large fleets
+with a time budget (the model with all the EVs is not built for them)
+the sites have Grid_limit='aggregate' and a grid connection of 6 kW per EV, so the grid limit is shared by the EVs
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_fleet_admm.py [time budget in s]
+"""
+import sys,time
+import numpy as np
+from common import ModelParameters
+from synthetic import synthetic_site
+from pyomo.environ import value,Constraint,Var
+
+
+def fleet_site(T,n_EV,seed=0):
+    data=synthetic_site(T=T,n_EV=n_EV,n_ESS=2,n_eBUS=1,Grid_limit='aggregate',seed=seed)
+    data['Grid_max_in']=data['Grid_max_out']=max(n_EV*6000,50000)
+    return data
+
+
+def plan(decomposed):
+    #the outputs of Solve_decomposed, or its last iterate if it did not converge
+    if decomposed.Decomposed['optimal']:
+        return {name:getattr(decomposed,name) for name in ['ESS_P','ESS_SOC','eBUS_P','eBUS_SOC','EV_P','EV_SOC','allPowers']}
+    return decomposed.Decomposed['plan']
+
+
+def check(MOEMS,decomposed):
+    #the OF of the built model with the base OFs of decomposed, for its own solution and for the one of decomposed
+    #and the largest violation of a constraint or a bound by the solution of decomposed
+    P=plan(decomposed)
+    instance=MOEMS.Build()
+    w_OF_Grid=[MOEMS.Grid_OFs.get('SC'),MOEMS.Grid_OFs.get('EC'),MOEMS.Grid_OFs.get('CO2')]
+    for i in instance.n_OF:
+        instance.OF_Base[i]=decomposed.Decomposed['OF_Base'][i-1]
+        instance.w_OF_Grid[i]=w_OF_Grid[i-1]
+    MOEMS.session.solve()
+    OF=value(instance.OF)
+    for t in instance.t:
+        for name,SOC,n_units,unit in [('P_ESS','ESS_SOC',instance.n_ess,'ESS'),('P_eBUS','SOC_eBUS',instance.n_eBus,'eBUS'),
+                                       ('P_EV','EV_SOC',instance.n_EV,'EV')]:
+            for n in n_units:
+                getattr(instance,name)[t,n].value=P[unit+'_P'][n-1,t-1]
+                getattr(instance,SOC)[t,n].value=P[unit+'_SOC'][n-1,t-1]
+        net=value(instance.P_net[t])
+        instance.P_grid_con[t].value=max(net,0)
+        instance.P_grid_pro[t].value=min(net,0)
+    violation=0
+    for con in instance.component_data_objects(Constraint,active=True):
+        body=value(con.body)
+        if con.lower is not None:
+            violation=max(violation,value(con.lower)-body)
+        if con.upper is not None:
+            violation=max(violation,body-value(con.upper))
+    for v in instance.component_data_objects(Var):
+        #the limits of a single variable are its bounds, the powers of the units that are not connected are fixed to 0
+        if v.fixed:
+            violation=max(violation,abs(v.value))
+            continue
+        if v.lb is not None:
+            violation=max(violation,v.lb-v.value)
+        if v.ub is not None:
+            violation=max(violation,v.value-v.ub)
+    return OF,value(instance.OF),violation
+
+
+if __name__=='__main__':
+    budget=float(sys.argv[1]) if len(sys.argv)>1 else 600
+    print('small fleets, T=48')
+    print('%6s %12s %12s %12s %12s %12s %14s %10s'%('n_EV','model [s]','ADMM [s]','OF model','OF ADMM','violation W','|dP| max [W]','optimal'))
+    for n_EV in [3,10,30]:
+        data=fleet_site(48,n_EV)
+        start=time.perf_counter()
+        MOEMS=ModelParameters(Solver='scipy',**data)
+        model_time=time.perf_counter()-start
+        decomposed=ModelParameters(Solver='scipy',Lazy=True,**data)
+        start=time.perf_counter()
+        decomposed.Solve_decomposed()
+        ADMM_time=time.perf_counter()-start
+        OF,OF_ADMM,violation=check(ModelParameters(Solver='scipy',Lazy=True,**data),decomposed)
+        print('%6d %12.1f %12.1f %12.6f %12.6f %12.2g %14.0f %10s'%(n_EV,model_time,ADMM_time,OF,OF_ADMM,violation,
+                                                             np.max(np.abs(MOEMS.allPowers-plan(decomposed)['allPowers'])),decomposed.Decomposed['optimal']))
+
+    print('large fleets, T=96, time budget %g s'%budget)
+    print('%6s %10s %12s %14s %12s'%('n_EV','time [s]','iterations','converged','residual W'))
+    for n_EV in [500,5000]:
+        decomposed=ModelParameters(Solver='scipy',Lazy=True,**fleet_site(96,n_EV))
+        start=time.perf_counter()
+        result=decomposed.Solve_decomposed(Time_limit=budget)
+        print('%6d %10.1f %12s %14s %12.1f'%(n_EV,time.perf_counter()-start,sum(result['iterations']),
+                                             '%d of %d'%(sum(result['converged']),len(result['converged'])),max(result['residual'])))
@@ -0,0 +1,80 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+compares DiscretizationPlanning_fleet (all EVs at once) with a loop of DiscretizationPlanning (one EV after the other)
+and checks that both give the same discrete powers and SOCs, check_equivalence fails if they are not the same for fleets with
+several sessions per EV, intervals without planned power in a session and 1- and 3-phase chargers
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_fleet_discretization.py
+"""
+import time
+from types import SimpleNamespace
+import numpy as np
+from common import ModelParameters
+
+
+def fleet(T,n_EV,rng):
+    #every EV is connected once, its planned power is between 6A and the maximum of its charger
+    chargingPowers=np.multiply([6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32],230)
+    tables=np.array([chargingPowers*rng.choice([1,3]) for n in range(n_EV)])
+    EV_plan=np.zeros((n_EV,T))
+    EV_P=np.zeros((n_EV,T))
+    for n in range(n_EV):
+        arrival=rng.integers(0,T//2)
+        departure=rng.integers(arrival+1,T)
+        EV_plan[n,arrival:departure]=1
+        EV_P[n,arrival:departure]=rng.uniform(tables[n,0],tables[n,-1],departure-arrival)
+    return EV_P,EV_plan,tables
+
+
+def fleet_sessions(T,n_EV,rng,phases=(1,3)):
+    #every EV is connected 1 to 4 times with a gap of at least one interval, a third of the connected intervals have no planned power
+    chargingPowers=np.multiply([6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32],230)
+    tables=np.array([chargingPowers*rng.choice(phases) for n in range(n_EV)])
+    EV_plan=np.zeros((n_EV,T))
+    EV_P=np.zeros((n_EV,T))
+    for n in range(n_EV):
+        arrival=int(rng.integers(0,T//4))
+        for session in range(rng.integers(1,5)):
+            departure=int(rng.integers(arrival+1,min(arrival+T//4,T)+1))
+            EV_plan[n,arrival:departure]=1
+            EV_P[n,arrival:departure]=rng.uniform(tables[n,0],tables[n,-1],departure-arrival)*(rng.uniform(size=departure-arrival)>1/3)
+            arrival=departure+int(rng.integers(1,T//8))
+            if arrival>=T-1:
+                break
+    return EV_P,EV_plan,tables
+
+
+def compare(MOEMS,EV_P,EV_plan,tables):
+    #the powers and SOCs of DiscretizationPlanning_fleet and of a loop of DiscretizationPlanning, and the time of both
+    start=time.perf_counter()
+    loop=[ModelParameters.DiscretizationPlanning(MOEMS,EV_P[n].tolist(),np.sum(EV_P[n].tolist()),EV_plan[n].tolist(),tables[n].copy()) for n in range(len(EV_P))]
+    loop_time=time.perf_counter()-start
+    start=time.perf_counter()
+    P,SOC=ModelParameters.DiscretizationPlanning_fleet(MOEMS,EV_P,EV_plan,tables)
+    fleet_time=time.perf_counter()-start
+    return P,SOC,np.array([a for a,b in loop],dtype=float),np.array([b for a,b in loop],dtype=float),loop_time,fleet_time
+
+
+def check_equivalence():
+    rng=np.random.default_rng(1)
+    for T,n_EV,phases in [(96,50,(1,)),(96,50,(3,)),(96,200,(1,3)),(288,50,(1,3))]:
+        MOEMS=SimpleNamespace(Time_Resolution=int(1440/T))
+        EV_P,EV_plan,tables=fleet_sessions(T,n_EV,rng,phases)
+        P,SOC,loop_P,loop_SOC=compare(MOEMS,EV_P,EV_plan,tables)[:4]
+        np.testing.assert_array_equal(P,loop_P)
+        np.testing.assert_array_equal(SOC,loop_SOC)
+        print('equivalent: T=%d, %d EVs, %d sessions, %d connected intervals without power, %s-phase'
+              %(T,n_EV,int(np.sum(np.diff(EV_plan,axis=1,prepend=0)==1)),int(np.sum((EV_plan==1) & (EV_P==0))),'/'.join(map(str,phases))))
+
+
+if __name__=='__main__':
+    check_equivalence()
+    rng=np.random.default_rng(0)
+    print('%6s %6s %12s %12s %10s %14s %14s'%('T','n_EV','loop [s]','fleet [s]','speedup','max diff P','max diff SOC'))
+    for T,n_EV in [(96,10),(96,100),(96,500),(1440,10),(1440,50)]:
+        MOEMS=SimpleNamespace(Time_Resolution=int(1440/T))
+        EV_P,EV_plan,tables=fleet(T,n_EV,rng)
+        P,SOC,loop_P,loop_SOC,loop_time,fleet_time=compare(MOEMS,EV_P,EV_plan,tables)
+        diff_P=np.max(np.abs(P-loop_P))
+        diff_SOC=np.max(np.abs(SOC-loop_SOC)/np.maximum(1,np.abs(SOC)))
+        print('%6d %6d %12.3f %12.3f %10.1f %14.2e %14.2e'%(T,n_EV,loop_time,fleet_time,loop_time/fleet_time,diff_P,diff_SOC))
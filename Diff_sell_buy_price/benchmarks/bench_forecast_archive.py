@@ -0,0 +1,85 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+the forecasts of a day (T=1440, 1-minute data) taken from archives of 1 month to 4 years of 1-minute data (load, 2 PVs, prices and CO2):
+the archive is read whole and sliced in the script (np.load, np.loadtxt) or given to ModelParameters with Forecast_start (only the window
+of the horizon is read), the time and the peak RSS of a lazy ModelParameters at the end of the archive and of the next 24 horizons
+(one hour apart, update_forecasts with Forecast_start), the archives are written and every case is run in its own process,
+so its peak RSS is not mixed with the other cases (the peak RSS of a process is kept by the processes that it starts)
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_forecast_archive.py
+"""
+import os,sys,json,time,tempfile,subprocess
+import numpy as np
+from common import ModelParameters,site
+from scaling import peak_rss
+from MOEMS import ForecastArchive
+
+
+T=1440
+NAMES=['Load_P','PV_P','electricity_cost_buy','electricity_cost_sell','CO2']
+COLUMNS={'Load_P':[0],'PV_P':[1,2],'electricity_cost_buy':3,'electricity_cost_sell':4,'CO2':5}
+CASES=[('npy',30),('npy',365),('npy',4*365),('csv',30),('csv',365)]
+
+
+def write_archive(folder,days):
+    #one .npy file per forecast and one .csv file with all of them (a header and one row per minute)
+    N=days*1440
+    rng=np.random.default_rng(0)
+    data=np.column_stack([1000+500*rng.random(N),np.maximum(0,np.sin(np.arange(N)/1440*2*np.pi-np.pi/2))[:,None]*[17000,25000],
+                          0.2+0.1*rng.random(N),0.1+0.05*rng.random(N),5+3*rng.random(N)])
+    for name,columns in COLUMNS.items():
+        np.save(os.path.join(folder,'%s_%d.npy'%(name,days)),np.ascontiguousarray(data[:,columns]))
+    np.savetxt(os.path.join(folder,'year_%d.csv'%days),data,delimiter=',',fmt='%.6f',header='load,pv1,pv2,buy,sell,co2',comments='')
+
+
+def run_case(folder,format,days,method):
+    data=site(T,n_EV=0)
+    N=days*1440
+    start=N-T-24*60
+    if format=='npy':
+        paths={name:os.path.join(folder,'%s_%d.npy'%(name,days)) for name in NAMES}
+    else:
+        path=os.path.join(folder,'year_%d.csv'%days)
+    begin=time.perf_counter()
+    if method=='archive':
+        sources=paths if format=='npy' else {name:ForecastArchive(path,Columns=COLUMNS[name]) for name in NAMES}
+        data.update(sources)
+        MOEMS=ModelParameters(Lazy=True,Forecast_start=start,**data)
+    else:
+        if format=='npy':
+            whole={name:np.load(paths[name]) for name in NAMES}
+        else:
+            table=np.loadtxt(path,delimiter=',',skiprows=1)
+            whole={name:table[:,COLUMNS[name]] for name in NAMES}
+        data.update({name:values[start:start+T] for name,values in whole.items()})
+        MOEMS=ModelParameters(Lazy=True,**data)
+    first=time.perf_counter()-begin
+    begin=time.perf_counter()
+    for hour in range(1,25):
+        if method=='archive':
+            MOEMS.update_forecasts(Forecast_start=start+hour*60,Solve=False)
+        else:
+            MOEMS.update_forecasts(Solve=False,**{name:values[start+hour*60:start+hour*60+T] for name,values in whole.items()})
+    return {'first':first,'next':(time.perf_counter()-begin)/24,'peak_rss_MB':peak_rss()}
+
+
+if __name__=='__main__':
+    if len(sys.argv)>1 and sys.argv[1]=='--case':
+        print(json.dumps(run_case(sys.argv[2],sys.argv[3],int(sys.argv[4]),sys.argv[5])))
+        sys.exit()
+    if len(sys.argv)>1 and sys.argv[1]=='--write':
+        write_archive(sys.argv[2],int(sys.argv[3]))
+        sys.exit()
+    with tempfile.TemporaryDirectory() as folder:
+        for days in sorted(set(days for format,days in CASES)):
+            subprocess.run([sys.executable,__file__,'--write',folder,str(days)],check=True)
+        print('%-6s %6s %10s %-8s %12s %14s %10s'%('format','days','size [MB]','method','first [s]','next hour [s]','RSS [MB]'))
+        for format,days in CASES:
+            if format=='npy':
+                size=sum(os.path.getsize(os.path.join(folder,'%s_%d.npy'%(name,days))) for name in NAMES)
+            else:
+                size=os.path.getsize(os.path.join(folder,'year_%d.csv'%days))
+            for method in ['whole','archive']:
+                child=subprocess.run([sys.executable,__file__,'--case',folder,format,str(days),method],capture_output=True,text=True)
+                result=json.loads(child.stdout.strip().splitlines()[-1])
+                print('%-6s %6d %10.1f %-8s %12.3f %14.4f %10.0f'%(format,days,size/1e6,method,result['first'],result['next'],result['peak_rss_MB']))
@@ -0,0 +1,41 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+compares Grid_limit='unit' (one row per combination of PV, ESS, eBUS and EV) with Grid_limit='aggregate' (one row per time interval):
+number of constraints, size of the NL file and time of one ipopt solve
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_grid_limit.py [n_PV n_ESS n_eBUS n_EV]
+"""
+import os,sys,time,tempfile
+from pyomo.environ import *
+from pyomo.common.errors import ApplicationError
+from common import BuildOnly,site
+
+
+if __name__=='__main__':
+    n_PV,n_ESS,n_eBUS,n_EV=[int(a) for a in sys.argv[1:5]] if len(sys.argv)>4 else [2,4,10,20]
+    solver=SolverFactory('ipopt')
+    print('site: %d PV, %d ESS, %d eBUS, %d EV, 96 intervals'%(n_PV,n_ESS,n_eBUS,n_EV))
+    print('%10s %12s %14s %14s %12s'%('Grid_limit','build [s]','constraints','NL file [MB]','ipopt [s]'))
+    for Grid_limit in ['unit','aggregate']:
+        start=time.perf_counter()
+        MOEMS=BuildOnly(Grid_limit=Grid_limit,**site(96,n_EV,n_PV=n_PV,n_ESS=n_ESS,n_eBUS=n_eBUS))
+        build=time.perf_counter()-start
+        instance=MOEMS.instance
+        n_constraints=instance.nconstraints()
+
+        nl_file=os.path.join(tempfile.mkdtemp(),'model.nl')
+        for i in instance.w_OF_Grid:
+            instance.w_OF_Grid[i]=1
+            instance.OF_Base[i]=1
+        instance.write(nl_file,format='nl')
+        nl_size=os.path.getsize(nl_file)/1e6
+        os.remove(nl_file)
+
+        try:
+            start=time.perf_counter()
+            solver.solve(instance)
+            solve='%12.3f'%(time.perf_counter()-start)
+        except ApplicationError:
+            #ipopt is not on the PATH or can not run on this system
+            solve='%12s'%'n/a'
+        print('%10s %12.3f %14d %14.2f %s'%(Grid_limit,build,n_constraints,nl_size,solve))
@@ -0,0 +1,18 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+measures how long it takes to build the optimisation model for growing horizons (T) and EV fleets (N)
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_model_build.py
+"""
+import time
+from common import BuildOnly,site
+
+
+if __name__=='__main__':
+    print('%6s %6s %12s %16s'%('T','N','build [s]','us per (T x N)'))
+    for T in [24,96,288,1440]:
+        for N in [2,10,50]:
+            start=time.perf_counter()
+            BuildOnly(**site(T,N))
+            build=time.perf_counter()-start
+            print('%6d %6d %12.3f %16.1f'%(T,N,build,build/(T*N)*1e6))
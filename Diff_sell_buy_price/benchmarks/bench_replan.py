@@ -0,0 +1,43 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+compares a new ModelParameters for every re-plan with Replan, which shifts the horizon of the kept instance by one interval
+the update of the instance is measured without solving, the whole re-plan (with the ipopt solves) only if ipopt can run
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_replan.py [n_EV]
+"""
+import sys,time
+from pyomo.common.errors import ApplicationError
+from common import BuildOnly,site
+from MOEMS import ModelParameters
+
+
+if __name__=='__main__':
+    n_EV=int(sys.argv[1]) if len(sys.argv)>1 else 20
+    data=site(96,n_EV,n_eBUS=2)
+    print('site: 2 PV, 2 ESS, 2 eBUS, %d EV, 96 intervals'%n_EV)
+
+    #update of the instance without the solves
+    start=time.perf_counter()
+    MOEMS=BuildOnly(**data)
+    build=time.perf_counter()-start
+    start=time.perf_counter()
+    MOEMS.Replan(Steps=1,ESS_SOC_init=[30,30],eBUS_SOC_init=[80,80],EV_delivered=[0]*n_EV)
+    replan=time.perf_counter()-start
+    print('%-32s %10.3f s'%('new ModelParameters, build',build))
+    print('%-32s %10.3f s'%('Replan, update in place',replan))
+
+    #whole re-plan
+    try:
+        start=time.perf_counter()
+        MOEMS=ModelParameters(**data)
+        new=time.perf_counter()-start
+        times=[]
+        for k in range(4):
+            start=time.perf_counter()
+            MOEMS.Replan(Steps=1)
+            times.append(time.perf_counter()-start)
+        print('%-32s %10.3f s'%('new ModelParameters, 4 solves',new))
+        print('%-32s %10.3f s'%('Replan, 1 warm solve (mean)',sum(times)/len(times)))
+    except ApplicationError:
+        #ipopt is not on the PATH or can not run on this system
+        print('%-32s %10s'%('whole re-plan','n/a'))
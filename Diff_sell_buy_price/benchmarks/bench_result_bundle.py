@@ -0,0 +1,57 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+compares the ten CSV files of main_Szerhij.py (np.savetxt) with Save_results (a folder of .npy files or one compressed .npz file)
+and the reading of them back, the model is not solved, its variables get random values
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_result_bundle.py
+"""
+import os,time,shutil,tempfile
+import numpy as np
+from pyomo.environ import *
+from common import BuildOnly,site
+from MOEMS import load_results
+
+
+def size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path,name)) for name in os.listdir(path))
+
+
+if __name__=='__main__':
+    rng=np.random.default_rng(0)
+    names=['ESS_SOC','ESS_P','eBUS_SOC','eBUS_P','allPowers','EV_SOC','EV_SOC_discrete','EV_P','EV_P_discrete','EV_plan']
+    print('%6s %6s %-12s %10s %10s %12s %8s'%('T','n_EV','format','write [s]','read [s]','size [MB]','same'))
+    for T,n_EV in [(96,100),(1440,1000)]:
+        MOEMS=BuildOnly(Grid_limit='aggregate',**site(T,n_EV,n_eBUS=2))
+        for v in MOEMS.instance.component_data_objects(Var):
+            v.set_value(rng.uniform(0,1000),skip_validation=True)
+        for i in MOEMS.instance.n_OF:
+            MOEMS.instance.OF_Base[i]=1
+        for name in names:
+            n=MOEMS.EV_n if name.startswith('EV') else 2
+            setattr(MOEMS,name,rng.uniform(0,1000,(n,T)))
+        MOEMS.allPowers=rng.uniform(0,1000,T)
+        folder=tempfile.mkdtemp()
+
+        start=time.perf_counter()
+        for name in names:
+            np.savetxt(os.path.join(folder,name+'.csv'),getattr(MOEMS,name),delimiter=',')
+        write=time.perf_counter()-start
+        start=time.perf_counter()
+        csv={name:np.loadtxt(os.path.join(folder,name+'.csv'),delimiter=',') for name in names}
+        read=time.perf_counter()-start
+        same=all(np.array_equal(csv[name],getattr(MOEMS,name)) for name in names)
+        print('%6d %6d %-12s %10.3f %10.3f %12.2f %8s'%(T,n_EV,'10 CSV',write,read,sum(size(os.path.join(folder,name+'.csv')) for name in names)/1e6,same))
+
+        for label,path,Compress in [('npy folder',os.path.join(folder,'results'),False),('npz',os.path.join(folder,'results.npz'),True)]:
+            start=time.perf_counter()
+            MOEMS.Save_results(path,Compress=Compress)
+            write=time.perf_counter()-start
+            start=time.perf_counter()
+            with load_results(path) as bundle:
+                arrays={name:np.array(bundle[name]) for name in names}
+            read=time.perf_counter()-start
+            same=all(np.array_equal(arrays[name],getattr(MOEMS,name)) for name in names)
+            print('%6d %6d %-12s %10.3f %10.3f %12.2f %8s'%(T,n_EV,label,write,read,size(path)/1e6,same))
+        shutil.rmtree(folder)
@@ -0,0 +1,40 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+the EV formulation against the session formulation (EV_formulation='session', the powers and SOCs of the EVs only in their connected
+time intervals) on public sites of benchmarks/synthetic.py: the size, the build time and the peak RSS of the built models,
+the EVs are given as EV_sessions records, the EV formulation is only built for the day sites (one week of 1-minute data
+with thousands of sessions has n_Time_intervals x n_EV = tens of millions of EV variables in it)
+every case runs in its own process, so its peak RSS is not mixed with the other cases
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_session_formulation.py
+"""
+import sys,json,time,subprocess
+from common import BuildOnly
+from synthetic import public_site
+from scaling import peak_rss
+from pyomo.environ import Var,Constraint
+
+
+CASES=[(96,10,100,1,'EV'),(96,10,100,1,'session'),(1440,30,600,1,'EV'),(1440,30,600,1,'session'),(10080,50,4000,7,'session')]
+
+
+def run_case(T,n_charger,n_sessions,days,formulation):
+    data=public_site(T=T,n_charger=n_charger,n_sessions=n_sessions,days=days,Records=True)
+    start=time.perf_counter()
+    instance=BuildOnly(EV_formulation=formulation,**data).instance
+    build_time=time.perf_counter()-start
+    return {'variables':sum(len(var) for var in instance.component_objects(Var)),
+            'constraints':sum(len(con) for con in instance.component_objects(Constraint,active=True)),
+            'build':build_time,'peak_rss_MB':peak_rss()}
+
+
+if __name__=='__main__':
+    if len(sys.argv)>1 and sys.argv[1]=='--case':
+        print(json.dumps(run_case(*[int(a) for a in sys.argv[2:6]],sys.argv[6])))
+        sys.exit()
+    print('%6s %8s %8s %-8s %10s %12s %10s %10s'%('T','chargers','sessions','model','variables','constraints','build [s]','RSS [MB]'))
+    for case in CASES:
+        child=subprocess.run([sys.executable,__file__,'--case']+[str(c) for c in case],capture_output=True,text=True)
+        result=json.loads(child.stdout.strip().splitlines()[-1])
+        print('%6d %8d %8d %-8s %10d %12d %10.1f %10.0f'%(case[0],case[1],case[2],case[4],result['variables'],result['constraints'],
+                                                         result['build'],result['peak_rss_MB']))
@@ -0,0 +1,44 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+compares the python backend (Solver='scipy') with ipopt: time of ModelParameters (base OFs and results) and the base OFs
+the sites are the shipped examples main_Szerhij.py and main_a_day_with_no_Ebus_EV_selling_buying.py (their example_inputs)
+and the synthetic sites of common.py, ipopt is shown as n/a if it is not on the PATH or can not run on this system
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_solver_backend.py
+"""
+import time
+import numpy as np
+from pyomo.common.errors import ApplicationError
+from common import ModelParameters,site
+import main_Szerhij,main_a_day_with_no_Ebus_EV_selling_buying
+
+
+def feasible_site(n_EV,n_eBUS):
+    #every EV needs at least 6A for the 12 hours it is connected
+    data=site(96,n_EV,n_eBUS=n_eBUS)
+    data['EV_er']=[60000]*n_EV
+    return data
+
+
+def run(Solver,data):
+    start=time.perf_counter()
+    MOEMS=ModelParameters(Solver=Solver,**data)
+    return time.perf_counter()-start,np.array([MOEMS.instance.OF_Base[i].value for i in MOEMS.instance.n_OF])
+
+
+if __name__=='__main__':
+    print('%-30s %12s %12s %16s'%('site','scipy [s]','ipopt [s]','max diff OF_Base'))
+    for name,data in [('main_Szerhij.py',main_Szerhij.example_inputs()),
+                      ('main_a_day_...selling_buying',main_a_day_with_no_Ebus_EV_selling_buying.example_inputs()),
+                      ('2 PV, 2 ESS',site(96,0)),
+                      ('2 PV, 2 ESS, 1 eBUS, 3 EV',feasible_site(3,1)),
+                      ('2 PV, 2 ESS, 2 eBUS, 20 EV',feasible_site(20,2))]:
+        scipy_time,scipy_OF=run('scipy',data)
+        try:
+            ipopt_time,ipopt_OF=run('ipopt',data)
+            ipopt='%12.3f'%ipopt_time
+            diff='%16.2e'%np.max(np.abs(scipy_OF-ipopt_OF)/np.maximum(1,np.abs(ipopt_OF)))
+        except ApplicationError:
+            ipopt='%12s'%'n/a'
+            diff='%16s'%'n/a'
+        print('%-30s %12.3f %s %s'%(name,scipy_time,ipopt,diff))
@@ -0,0 +1,30 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+memory and time of Solve_stochastic for ensembles of 5, 20 and 50 PV scenarios (two iterations of progressive hedging),
+the peak memory of the stochastic phase (tracemalloc, Timing='memory') is compared with the memory of one instance per scenario
+that a model with all the scenarios in it (extensive form) would need
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_stochastic.py
+"""
+import time
+import numpy as np
+from common import ModelParameters
+from synthetic import synthetic_site
+
+
+if __name__=='__main__':
+    data=synthetic_site(T=48,n_EV=3,n_ESS=1,n_eBUS=1,seed=3)
+    PV_P=np.array(data['PV_P'])
+    MOEMS=ModelParameters(Solver='scipy',Timing='memory',**data)
+    instance=MOEMS.timings['build/create_model']['allocated']
+    print('one instance: %.1f MB'%(instance/1e6))
+    print('%10s %12s %16s %16s %22s'%('scenarios','time [s]','s per scenario','peak [MB]','one instance each [MB]'))
+    rng=np.random.default_rng(0)
+    for n_scenarios in [5,20,50]:
+        ensemble=[PV_P*f for f in rng.uniform(0.5,1.5,n_scenarios)]
+        MOEMS.timings.pop('stochastic',None)
+        start=time.perf_counter()
+        MOEMS.Solve_stochastic(PV_P=ensemble,Iterations=1)
+        wall=time.perf_counter()-start
+        peak=MOEMS.timings['stochastic']['peak']
+        print('%10d %12.1f %16.2f %16.1f %22.1f'%(n_scenarios,wall,wall/n_scenarios/2,peak/1e6,n_scenarios*instance/1e6))
@@ -0,0 +1,57 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+Solve_aggregated against Results on the sites of benchmarks/synthetic.py: the number of blocks of the reduced model, the time of
+both and the OF of the full model for its own solution and for the plan of Solve_aggregated (put into the built full model,
+with the same base OFs), with the largest violation of a constraint or a bound of the full model by that plan
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_temporal_aggregation.py
+"""
+import time
+from common import ModelParameters
+from synthetic import synthetic_site
+from pyomo.environ import value,Constraint,Var
+
+
+def check(MOEMS,aggregated):
+    #the OF of the solved full model and of the plan of aggregated in it, and the largest violation of a constraint or a bound by that plan
+    instance=MOEMS.instance
+    OF=value(instance.OF)
+    for name,SOC,P,S in [('P_ESS','ESS_SOC',aggregated.ESS_P,aggregated.ESS_SOC),('P_eBUS','SOC_eBUS',aggregated.eBUS_P,aggregated.eBUS_SOC),
+                         ('P_EV','EV_SOC',aggregated.EV_P,aggregated.EV_SOC)]:
+        for t,n in getattr(instance,name):
+            getattr(instance,name)[t,n].value=P[n-1,t-1]
+            getattr(instance,SOC)[t,n].value=S[n-1,t-1]
+    for t in instance.t:
+        net=value(instance.P_net[t])
+        instance.P_grid_con[t].value=max(net,0)
+        instance.P_grid_pro[t].value=min(net,0)
+    violation=0
+    for con in instance.component_data_objects(Constraint,active=True):
+        body=value(con.body)
+        if con.lower is not None:
+            violation=max(violation,value(con.lower)-body)
+        if con.upper is not None:
+            violation=max(violation,body-value(con.upper))
+    for v in instance.component_data_objects(Var):
+        #the limits of a single variable are its bounds, the powers of the units that are not connected are fixed to 0
+        if v.fixed:
+            violation=max(violation,abs(v.value))
+            continue
+        if v.lb is not None:
+            violation=max(violation,v.lb-v.value)
+        if v.ub is not None:
+            violation=max(violation,v.value-v.ub)
+    return OF,value(instance.OF),violation
+
+
+if __name__=='__main__':
+    print('%4s %5s %7s %10s %10s %12s %12s %12s'%('T','n_EV','blocks','full [s]','agg. [s]','OF full','OF agg.','violation W'))
+    for T,n_EV in [(96,5),(96,20),(288,5),(288,20)]:
+        data=synthetic_site(T=T,n_EV=n_EV,n_ESS=2,n_eBUS=1)
+        start=time.perf_counter()
+        MOEMS=ModelParameters(Solver='scipy',**data)
+        full_time=time.perf_counter()-start
+        aggregated=ModelParameters(Solver='scipy',Lazy=True,**data)
+        result=aggregated.Solve_aggregated()
+        OF,OF_aggregated,violation=check(MOEMS,aggregated)
+        print('%4d %5d %7d %10.1f %10.1f %12.6f %12.6f %12.2g'%(T,n_EV,result['n_blocks'],full_time,result['time'],OF,OF_aggregated,violation))
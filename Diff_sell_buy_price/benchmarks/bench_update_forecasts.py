@@ -0,0 +1,35 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+new prices for a site: a new ModelParameters (build, base OFs and the solve) against update_forecasts on the built model
+with new base OFs (the same results) and with the base OFs of the first plan (one solve), the time of update_forecasts is split
+into the runs of the solver and the rest (update of the params and constraints, results)
+run it from the Diff_sell_buy_price folder:  python benchmarks/bench_update_forecasts.py
+"""
+import time
+import numpy as np
+from common import ModelParameters
+from synthetic import synthetic_site
+
+
+if __name__=='__main__':
+    print('%6s %6s %10s %-16s %12s %10s %10s %8s'%('T','n_EV','new [s]','update','update [s]','run [s]','rest [s]','same'))
+    for T,n_EV in [(96,3),(96,10)]:
+        data=synthetic_site(T=T,n_EV=n_EV,n_ESS=2,n_eBUS=1)
+        MOEMS=ModelParameters(Solver='scipy',Timing=True,**data)
+        #the prices of the next day: 20% higher in the evening
+        buy=np.array(data['electricity_cost_buy'])*np.where(np.arange(T)>=3*T//4,1.2,1)
+        sell=buy/2
+
+        start=time.perf_counter()
+        new=ModelParameters(Solver='scipy',**dict(data,electricity_cost_buy=buy,electricity_cost_sell=sell))
+        new_time=time.perf_counter()-start
+
+        for Base_OFs in [True,False]:
+            MOEMS.timings.clear()
+            start=time.perf_counter()
+            MOEMS.update_forecasts(electricity_cost_buy=buy,electricity_cost_sell=sell,Base_OFs=Base_OFs)
+            update_time=time.perf_counter()-start
+            run=sum(times['wall'] for phase,times in MOEMS.timings.items() if phase.endswith('/run'))
+            same=np.allclose(MOEMS.allPowers,new.allPowers,atol=1e-3) if Base_OFs else '-'
+            print('%6d %6d %10.2f %-16s %12.2f %10.2f %10.2f %8s'%(T,n_EV,new_time,'new base OFs' if Base_OFs else 'same base OFs',update_time,run,update_time-run,same))
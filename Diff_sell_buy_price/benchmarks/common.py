@@ -0,0 +1,38 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+shared helpers of the benchmark scripts
+"""
+import os,sys
+import numpy as np
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MOEMS import ModelParameters
+
+
+class BuildOnly(ModelParameters):
+    #only builds the model, the solves and the results are skipped
+    def __init__(self,**kwargs):
+        super().__init__(Lazy=True,**kwargs)
+        self.Build()
+    def Solve(self):
+        return True
+    def Extract_results(self):
+        return True
+
+
+def site(T,n_EV,n_PV=2,n_ESS=2,n_eBUS=0):
+    #a site where every EV is connected for the middle half of the horizon and every eBUS is on a trip for one eighth of it
+    pv=np.sin(np.linspace(0,np.pi,T))**2*17000
+    EV_scedule=np.zeros((T,n_EV))
+    EV_scedule[T//4:3*T//4,:]=1
+    eBus_scedule=np.zeros((T,n_eBUS))
+    eBus_scedule[T//4:3*T//8,:]=1
+    return dict(Time_Resolution=int(1440/T),n_Time_intervals=T,Grid_max_in=30000*(1+n_EV//10),Grid_max_out=30000*(1+n_EV//10),Grid_OFs={'SC':80,'EC':10,'CO2':10},
+                Load_P=[[1000]*T],PV_P=[pv*(1+0.5*i) for i in range(n_PV)],electricity_cost_buy=[0.2]*T,electricity_cost_sell=[0.1]*T,CO2=[5]*T,
+                ESS_capacity=[13000]*n_ESS,ESS_SOC_init=[30]*n_ESS,ESS_max_charge=[12000]*n_ESS,ESS_max_discharge=[12000]*n_ESS,
+                ESS_charge_efficiency=[100]*n_ESS,ESS_discharge_efficiency=[100]*n_ESS,
+                eBUS_capacity=[300000]*n_eBUS,eBUS_SOC_init=[80]*n_eBUS,eBUS_max_charge=[50000]*n_eBUS,eBUS_max_discharge=[0]*n_eBUS,
+                eBUS_charge_efficiency=[100]*n_eBUS,eBUS_discharge_efficiency=[100]*n_eBUS,eBUS_round_trip_energy=[20000]*n_eBUS,eBus_scedule=eBus_scedule,
+                EV_er=[10000]*n_EV,EV_scedule=EV_scedule,EV_max_charge=[11000]*n_EV,EV_max_discharge=[0]*n_EV,EV_charge_efficiency=[100]*n_EV,
+                EV_discharge_efficiency=[100]*n_EV,EV_n_charger=n_EV,EV_charger_phase=[3]*n_EV,EV_charger_ID=list(range(1,n_EV+1)),
+                EV_OFs=[{'EC':50,'SC':50}]*n_EV,EV_smartcharge=['yes']*n_EV)
@@ -0,0 +1,133 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+scaling benchmark: builds (and with --solve solves) synthetic sites of synthetic.py for a sweep of
+T (time intervals), EVs and ESSs and writes a JSON report with for every case
+the time of configure (ModelParameters with Lazy=True), create_model, the instance (the model is concrete, so this is
+the set up of its solver session), Solve and Results, the peak RSS and the number of constraints and variables
+every case runs in its own process, so its peak RSS is not mixed with the other cases
+run it from the Diff_sell_buy_price folder:
+    python benchmarks/scaling.py [--sweep quick|axes|full] [--solve] [--solver scipy] [--out scaling.json] [--compare old.json]
+"""
+import os,sys,json,time,argparse,platform,subprocess
+from itertools import product
+
+BASE=dict(T=96,n_EV=10,n_ESS=2,n_eBUS=1,n_PV=2)
+VALUES=dict(T=[10,96,288,1440],n_EV=[0,10,100,1000],n_ESS=[0,2,20])
+
+
+def sweep(name):
+    #quick: a few small cases, axes: one value changed at a time from BASE, full: all the combinations
+    if name=='quick':
+        return [dict(BASE,T=T,n_EV=n_EV,n_ESS=n_ESS) for T,n_EV,n_ESS in product([10,96],[0,10],[0,2])]
+    if name=='full':
+        return [dict(BASE,T=T,n_EV=n_EV,n_ESS=n_ESS) for T,n_EV,n_ESS in product(VALUES['T'],VALUES['n_EV'],VALUES['n_ESS'])]
+    cases=[]
+    for key,values in VALUES.items():
+        for v in values:
+            case=dict(BASE,**{key:v})
+            if case not in cases:
+                cases.append(case)
+    return cases
+
+
+def peak_rss():
+    #peak resident set size of this process in MB, ru_maxrss is in kB on Linux and in bytes on macOS
+    import resource
+    rss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss/1e6 if sys.platform=='darwin' else rss/1e3
+
+
+def run_case(case,Solver,solve,Grid_limit):
+    #one case in this process, returns the measurements
+    sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from MOEMS import ModelParameters,SolverSession
+    from synthetic import synthetic_site
+    data=synthetic_site(Grid_limit=Grid_limit,**case)
+    result=dict(case,Grid_limit=Grid_limit,Solver=Solver)
+    start=time.perf_counter()
+    MOEMS=ModelParameters(Solver=Solver,Lazy=True,**data)
+    result['configure']=time.perf_counter()-start
+    #the stages of Build, timed one by one
+    start=time.perf_counter()
+    MOEMS.model=MOEMS.create_model()
+    result['create_model']=time.perf_counter()-start
+    start=time.perf_counter()
+    MOEMS.instance=MOEMS.model
+    MOEMS.session=SolverSession(MOEMS.instance,MOEMS.solver)
+    result['create_instance']=time.perf_counter()-start
+    result['constraints']=MOEMS.instance.nconstraints()
+    result['variables']=MOEMS.instance.nvariables()
+    if solve:
+        start=time.perf_counter()
+        MOEMS.Solve()
+        result['solve']=time.perf_counter()-start
+        start=time.perf_counter()
+        MOEMS.Results()
+        result['results']=time.perf_counter()-start
+    result['peak_rss_MB']=peak_rss()
+    return result
+
+
+def compare(report,old):
+    #the cases of report that are also in old, times and peak RSS as new/old, counts that changed
+    def key(case):
+        return tuple(case.get(k) for k in ['T','n_EV','n_ESS','n_eBUS','n_PV','Grid_limit','Solver'])
+    old={key(case):case for case in old['cases'] if case.get('status')=='ok'}
+    fields=['create_model','create_instance','solve','peak_rss_MB']
+    print('%6s %6s %6s '%('T','n_EV','n_ESS')+''.join('%19s'%(f+' x') for f in fields)+'  counts')
+    for case in report['cases']:
+        if case.get('status')!='ok' or key(case) not in old:
+            continue
+        before=old[key(case)]
+        ratios=['%19s'%('%.2f'%(case[f]/before[f]) if f in case and f in before and before[f]>0 else '-') for f in fields]
+        counts='same' if (case['constraints'],case['variables'])==(before['constraints'],before['variables']) else 'changed'
+        print('%6d %6d %6d '%(case['T'],case['n_EV'],case['n_ESS'])+''.join(ratios)+'  '+counts)
+
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description='scaling benchmark of ModelParameters on synthetic sites')
+    parser.add_argument('--sweep',default='axes',choices=['quick','axes','full'])
+    parser.add_argument('--solve',action='store_true',help='also solve the model (base OFs and the weighted OF) and find the results')
+    parser.add_argument('--solver',default='scipy')
+    parser.add_argument('--grid-limit',default='unit',choices=['unit','aggregate'])
+    parser.add_argument('--timeout',type=float,default=3600,help='seconds for one case')
+    parser.add_argument('--out',default='scaling.json')
+    parser.add_argument('--compare',help='an older report, the ratios of the times are printed')
+    parser.add_argument('--case',help=argparse.SUPPRESS)
+    args=parser.parse_args()
+
+    if args.case:
+        #the child process of one case, it prints its result as JSON
+        print(json.dumps(run_case(json.loads(args.case),args.solver,args.solve,args.grid_limit)))
+        sys.exit()
+
+    import numpy,pyomo
+    report={'python':platform.python_version(),'numpy':numpy.__version__,'pyomo':pyomo.version.version,'platform':platform.platform(),
+            'date':time.strftime('%Y-%m-%d %H:%M:%S'),'sweep':args.sweep,'solve':args.solve,'solver':args.solver,'cases':[]}
+    print('%6s %6s %6s %12s %12s %12s %12s %10s %10s'%('T','n_EV','n_ESS','constraints','variables','model [s]','instance [s]','solve [s]','RSS [MB]'))
+    for case in sweep(args.sweep):
+        command=[sys.executable,os.path.abspath(__file__),'--case',json.dumps(case),'--solver',args.solver,'--grid-limit',args.grid_limit]
+        if args.solve:
+            command.append('--solve')
+        try:
+            child=subprocess.run(command,capture_output=True,text=True,timeout=args.timeout)
+            lines=child.stdout.strip().splitlines()
+            if child.returncode==0 and lines:
+                result=dict(json.loads(lines[-1]),status='ok')
+            else:
+                result=dict(case,status='failed',error=child.stderr.strip().splitlines()[-1:] )
+        except subprocess.TimeoutExpired:
+            result=dict(case,status='timeout')
+        report['cases'].append(result)
+        if result['status']=='ok':
+            print('%6d %6d %6d %12d %12d %12.3f %12.3f %10s %10.0f'%(case['T'],case['n_EV'],case['n_ESS'],result['constraints'],result['variables'],
+                  result['create_model'],result['create_instance'],'%.3f'%result['solve'] if 'solve' in result else '-',result['peak_rss_MB']))
+        else:
+            print('%6d %6d %6d %s'%(case['T'],case['n_EV'],case['n_ESS'],result['status']))
+        #the report is written after every case, so a long sweep can be followed
+        with open(args.out,'w') as file:
+            json.dump(report,file,indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(report,json.load(file))
@@ -0,0 +1,138 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+reproducible synthetic sites for the benchmarks: sinusoidal PV (like main_a_day.py), a step load, step tariffs and CO2,
+random EV sessions and eBUS trips, every site is made from a seed so the same arguments always give the same site
+the EV energies are drawn between the 6A minimum and the maximum power of their charger, so the sites are feasible
+"""
+import numpy as np
+
+
+#the chargers of the EVs: maximum power in W and number of phases
+CHARGERS=[(7000,1),(11000,3),(22000,3)]
+
+
+def day_profile(T,blocks,default,days=1):
+    #a step profile over the day (repeated every day), blocks are (start hour, end hour, value)
+    hours=np.arange(T)*24*days/T%24
+    values=np.full(T,float(default))
+    for start,end,value in blocks:
+        values[(hours>=start) & (hours<end)]=value
+    return values
+
+
+def synthetic_site(T=96,n_EV=10,n_ESS=2,n_eBUS=1,n_PV=2,seed=0,Grid_limit='unit',days=1):
+    """
+    the inputs of ModelParameters for a site with n_PV PVs, n_ESS ESSs, n_eBUS eBUSs and n_EV EVs (one charger per EV)
+    over days days of T time intervals
+    """
+    rng=np.random.default_rng(seed)
+    Time_Resolution=1440*days//T
+    deltaT=Time_Resolution/60
+
+    #PV: zero in the night, sin^2 between 6:00 and 18:00
+    hours=np.arange(T)*24*days/T%24
+    day=(hours>=6) & (hours<18)
+    shape=np.where(day,np.sin(np.pi*(hours-6)/12)**2,0)
+    PV_P=[shape*rng.uniform(10000,30000) for n in range(n_PV)]
+    Load_P=[day_profile(T,[(10,15,1500)],0,days),day_profile(T,[(12.5,18.75,2000)],0,days)]
+
+    #step tariffs and CO2 as in main_a_day.py
+    electricity_cost_buy=day_profile(T,[(10,15,0.3)],0.2,days)
+    electricity_cost_sell=electricity_cost_buy/2
+    CO2=day_profile(T,[(10,15,5),(15,22,12)],8,days)
+
+    #ESS
+    ESS=dict(ESS_capacity=[13000]*n_ESS,ESS_SOC_init=rng.uniform(20,80,n_ESS).round().tolist(),ESS_max_charge=[12000]*n_ESS,
+             ESS_max_discharge=[12000]*n_ESS,ESS_charge_efficiency=[100]*n_ESS,ESS_discharge_efficiency=[100]*n_ESS)
+
+    #eBUS: one or two trips of 1 to 3 hours in the day, the eBUS uses eBUS_round_trip_energy W while it is on a trip
+    eBus_scedule=np.zeros((T,n_eBUS))
+    for n in range(n_eBUS):
+        for k in range(rng.integers(1,3)):
+            start=rng.integers(int(6/24*T),int(20/24*T))
+            eBus_scedule[start:start+max(1,int(rng.uniform(1,3)/24*T)),n]=1
+    eBUS=dict(eBUS_capacity=[300000]*n_eBUS,eBUS_SOC_init=[80]*n_eBUS,eBUS_max_charge=[50000]*n_eBUS,eBUS_max_discharge=[0]*n_eBUS,
+              eBUS_charge_efficiency=[100]*n_eBUS,eBUS_discharge_efficiency=[100]*n_eBUS,eBUS_round_trip_energy=[20000]*n_eBUS,
+              eBus_scedule=eBus_scedule)
+
+    #EV: one session per EV that ends before the last interval, the energy is between the 6A minimum and the maximum power
+    #an EV without smart charging gets (almost) the maximum power of its charger all the time
+    EV_scedule=np.zeros((T,n_EV))
+    chargers=[CHARGERS[k] for k in rng.integers(0,len(CHARGERS),n_EV)]
+    smartcharge=np.where(rng.uniform(size=n_EV)<0.8,'yes','no').tolist()
+    EV_er=[]
+    for n in range(n_EV):
+        arrival=rng.integers(1,T//2)
+        departure=rng.integers(arrival+max(2,T//12),T-1)
+        EV_scedule[arrival:departure,n]=1
+        hours_connected=(departure-arrival)*deltaT
+        max_charge,phases=chargers[n]
+        if smartcharge[n]=='yes':
+            minimum=1440*phases*hours_connected
+            EV_er.append(minimum+rng.uniform(0.1,0.6)*(max_charge*hours_connected-minimum))
+        else:
+            EV_er.append(0.97*max_charge*hours_connected)
+    OFs=[{'SC':50,'EC':50},{'EC':60,'CO2':40},{'SC':100},{'EC':50,'SC':10,'CO2':40}]
+    EV=dict(EV_er=EV_er,EV_scedule=EV_scedule,EV_max_charge=[c[0] for c in chargers],EV_max_discharge=[0]*n_EV,
+            EV_charge_efficiency=[100]*n_EV,EV_discharge_efficiency=[100]*n_EV,EV_n_charger=n_EV,
+            EV_charger_phase=[c[1] for c in chargers],EV_charger_ID=list(range(1,n_EV+1)),
+            EV_OFs=[OFs[k] for k in rng.integers(0,len(OFs),n_EV)],EV_smartcharge=smartcharge)
+
+    #the grid can give the maximum power of all the units at once
+    Grid_max=30000+sum(c[0] for c in chargers)+12000*n_ESS+50000*n_eBUS
+    return dict(Time_Resolution=Time_Resolution,n_Time_intervals=T,Grid_max_in=Grid_max,Grid_max_out=Grid_max,
+                Grid_OFs={'SC':80,'EC':10,'CO2':10},Grid_limit=Grid_limit,Load_P=Load_P,PV_P=PV_P,
+                electricity_cost_buy=electricity_cost_buy,electricity_cost_sell=electricity_cost_sell,CO2=CO2,**ESS,**eBUS,**EV)
+
+
+def public_site(T=96,n_charger=30,n_sessions=400,n_ESS=2,n_PV=2,seed=0,Grid_limit='unit',days=1,Records=False):
+    """
+    the inputs of ModelParameters for a public site with n_charger chargers that are shared by n_sessions short sessions
+    (one EV per session of at most 2 hours, the sessions of a charger follow each other with a gap of at least one interval),
+    like synthetic_site without eBUS, the sessions are spread over the chargers in turn until n_sessions are made or the chargers are full
+    with Records=True the sessions are given as EV_sessions records instead of EV_er, EV_scedule and EV_charger_ID
+    """
+    data=synthetic_site(T=T,n_EV=0,n_ESS=n_ESS,n_eBUS=0,n_PV=n_PV,seed=seed,Grid_limit=Grid_limit,days=days)
+    rng=np.random.default_rng(seed+1)
+    deltaT=data['Time_Resolution']/60
+    chargers=[CHARGERS[k] for k in rng.integers(0,len(CHARGERS),n_charger)]
+    #the next free interval of every charger, the first session arrives in the second interval at the earliest
+    free=rng.integers(1,4,n_charger)
+    sessions=[]
+    while len(sessions)<n_sessions:
+        added=False
+        for c in range(n_charger):
+            length=int(rng.integers(2,max(3,T//(12*days))))
+            if len(sessions)==n_sessions or free[c]+length>T-1:
+                continue
+            sessions.append((c,free[c],free[c]+length))
+            free[c]+=length+rng.integers(1,4)
+            added=True
+        if not added:
+            break
+    n_EV=len(sessions)
+    smartcharge=np.where(rng.uniform(size=n_EV)<0.8,'yes','no').tolist()
+    EV_er=[]
+    for n,(c,arrival,departure) in enumerate(sessions):
+        hours_connected=(departure-arrival)*deltaT
+        max_charge,phases=chargers[c]
+        if smartcharge[n]=='yes':
+            minimum=1440*phases*hours_connected
+            EV_er.append(minimum+rng.uniform(0.1,0.6)*(max_charge*hours_connected-minimum))
+        else:
+            EV_er.append(0.97*max_charge*hours_connected)
+    OFs=[{'SC':50,'EC':50},{'EC':60,'CO2':40},{'SC':100},{'EC':50,'SC':10,'CO2':40}]
+    #every session (EV) has the maximum power of its charger
+    data.update(EV_max_charge=[chargers[c][0] for c,arrival,departure in sessions],EV_max_discharge=[0]*n_EV,
+                EV_charge_efficiency=[100]*n_EV,EV_discharge_efficiency=[100]*n_EV,EV_n_charger=n_charger,
+                EV_charger_phase=[c[1] for c in chargers],EV_OFs=[OFs[k] for k in rng.integers(0,len(OFs),n_EV)],EV_smartcharge=smartcharge)
+    if Records:
+        data['EV_sessions']=[(arrival,departure,EV_er[n],c+1) for n,(c,arrival,departure) in enumerate(sessions)]
+    else:
+        EV_scedule=np.zeros((T,n_EV))
+        for n,(c,arrival,departure) in enumerate(sessions):
+            EV_scedule[arrival:departure,n]=1
+        data.update(EV_er=EV_er,EV_scedule=EV_scedule,EV_charger_ID=[c+1 for c,arrival,departure in sessions])
+    data['Grid_max_in']=data['Grid_max_out']=30000+sum(c[0] for c in chargers)+12000*n_ESS
+    return data
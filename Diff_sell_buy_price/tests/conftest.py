@@ -0,0 +1,9 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+the tests import MOEMS from the Diff_sell_buy_price folder and the sites of benchmarks/, run them from the Diff_sell_buy_price folder:  python -m pytest -q tests
+"""
+import os,sys
+folder=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,os.path.join(folder,'benchmarks'))
+sys.path.insert(0,folder)
@@ -0,0 +1,36 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+Solve_decomposed fills the outputs only when all its runs converged, the status is in Decomposed and in the return value
+"""
+import logging
+import numpy as np
+from MOEMS import ModelParameters
+from synthetic import synthetic_site
+
+
+def fleet_site():
+    data=synthetic_site(T=24,n_EV=3,n_ESS=1,n_eBUS=0,Grid_limit='aggregate')
+    data['Grid_max_in']=data['Grid_max_out']=50000
+    return data
+
+
+def test_converged():
+    MOEMS=ModelParameters(Lazy=True,Solver='scipy',**fleet_site())
+    result=MOEMS.Solve_decomposed()
+    assert result is MOEMS.Decomposed
+    assert result['optimal'] is True and MOEMS.optimal is True and all(result['converged']) and 'plan' not in result
+    assert np.shape(MOEMS.EV_P)==(3,24)
+    #the forecasts are kept with the time intervals on the first axis
+    assert np.allclose(MOEMS.allPowers,np.reshape(MOEMS.Load_P,(24,-1)).sum(axis=1)+MOEMS.EV_P.sum(axis=0)+MOEMS.ESS_P.sum(axis=0)-np.reshape(MOEMS.PV_P,(24,-1)).sum(axis=1))
+
+
+def test_not_converged(caplog):
+    #2 iterations per run are not enough, the last iterate is not published as the plan
+    MOEMS=ModelParameters(Lazy=True,Solver='scipy',**fleet_site())
+    with caplog.at_level(logging.WARNING,logger='MOEMS'):
+        result=MOEMS.Solve_decomposed(Iterations=2)
+    assert result['optimal'] is False and MOEMS.optimal is False and not all(result['converged'])
+    assert 'did not converge' in caplog.text
+    assert len(MOEMS.EV_P)==0 and len(MOEMS.ESS_P)==0
+    assert np.shape(result['plan']['EV_P'])==(3,24) and np.shape(result['plan']['allPowers'])==(24,)
@@ -0,0 +1,60 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+DiscretizationPlanning_fleet gives the same discrete powers and SOCs as DiscretizationPlanning for every EV (as Discretize_EVs used them)
+"""
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from MOEMS import ModelParameters
+from bench_fleet_discretization import fleet_sessions
+
+
+def per_EV(MOEMS,EV_P,EV_plan,tables):
+    #the loop of DiscretizationPlanning that DiscretizationPlanning_fleet replaces
+    loop=[ModelParameters.DiscretizationPlanning(MOEMS,EV_P[n].tolist(),np.sum(EV_P[n].tolist()),EV_plan[n].tolist(),tables[n].copy()) for n in range(len(EV_P))]
+    return np.array([P for P,SOC in loop],dtype=float),np.array([SOC for P,SOC in loop],dtype=float)
+
+
+def special_EVs(EV_P,EV_plan,tables,rng):
+    #the first EVs are changed into the cases that the random sessions rarely give:
+    #0: connected but without planned power, 1: never connected, 2 and 3: the same planned power in all their connected intervals
+    #(the slopes of the intervals are the same, the order of the intervals breaks the ties), 4: the powers of its table and the mid points
+    #between them (the slopes of the next step are the same as of the step before)
+    T=EV_P.shape[1]
+    EV_P[0]=0
+    EV_plan[1]=0
+    EV_P[1]=0
+    for n in [2,3]:
+        EV_P[n]=EV_plan[n]*tables[n][rng.integers(len(tables[n]))]
+    steps=np.concatenate([tables[4],(tables[4][1:]+tables[4][:-1])/2])
+    EV_P[4]=EV_plan[4]*steps[rng.integers(len(steps),size=T)]
+    return EV_P,EV_plan
+
+
+@pytest.mark.parametrize('T,n_EV,phases,seed',[(24,10,(1,),0),(96,30,(3,),1),(96,60,(1,3),2),(288,20,(1,3),3)])
+def test_fleet_equals_per_EV(T,n_EV,phases,seed):
+    rng=np.random.default_rng(seed)
+    MOEMS=SimpleNamespace(Time_Resolution=int(1440/T))
+    EV_P,EV_plan,tables=fleet_sessions(T,n_EV,rng,phases)
+    EV_P,EV_plan=special_EVs(EV_P,EV_plan,tables,rng)
+    loop_P,loop_SOC=per_EV(MOEMS,EV_P,EV_plan,tables)
+    P,SOC=ModelParameters.DiscretizationPlanning_fleet(MOEMS,EV_P,EV_plan,tables)
+    np.testing.assert_array_equal(P,loop_P)
+    np.testing.assert_array_equal(SOC,loop_SOC)
+    #the EVs without planned power are not charged
+    assert not np.any(P[[0,1]])
+
+
+def test_same_plan_every_EV():
+    #all the EVs have the same plan and table: every EV is discretized alone, so they all get the discrete plan of one EV
+    rng=np.random.default_rng(4)
+    T=48
+    MOEMS=SimpleNamespace(Time_Resolution=30)
+    EV_P,EV_plan,tables=fleet_sessions(T,1,rng,(3,))
+    EV_P,EV_plan,tables=[np.repeat(values,8,axis=0) for values in (EV_P,EV_plan,tables)]
+    loop_P,loop_SOC=per_EV(MOEMS,EV_P,EV_plan,tables)
+    P,SOC=ModelParameters.DiscretizationPlanning_fleet(MOEMS,EV_P,EV_plan,tables)
+    np.testing.assert_array_equal(P,loop_P)
+    np.testing.assert_array_equal(SOC,loop_SOC)
+    assert np.all(P==P[0])
@@ -0,0 +1,40 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+the measured SOCs and energies of Replan are checked like the inputs of ModelParameters and kept as the same arrays
+"""
+import numpy as np
+import pytest
+from MOEMS import ModelParameters,MOEMSInputError
+from synthetic import synthetic_site
+
+
+def replan_site():
+    return ModelParameters(Solver='scipy',**synthetic_site(T=24,n_EV=2,n_ESS=2,n_eBUS=1))
+
+
+@pytest.mark.parametrize('inputs',[{'ESS_SOC_init':[50,120]},{'ESS_SOC_init':[50]},{'eBUS_SOC_init':[-1]},{'EV_delivered':[1000,-5]},
+                                   {'EV_delivered':['a','b']}])
+def test_replan_rejects_measurements(inputs):
+    #a wrong measurement raises before the horizon is shifted
+    MOEMS=replan_site()
+    before=(MOEMS.Forecast_start,MOEMS.ESS_SOC_init.copy(),MOEMS.EV_er.copy())
+    with pytest.raises(MOEMSInputError) as error:
+        MOEMS.Replan(Steps=1,**inputs)
+    assert any(name in problem for problem in error.value.problems for name in inputs)
+    assert MOEMS.Forecast_start==before[0]
+    assert np.array_equal(MOEMS.ESS_SOC_init,before[1]) and np.array_equal(MOEMS.EV_er,before[2])
+
+
+@pytest.mark.parametrize('inputs',[{},{'ESS_SOC_init':[40,60],'eBUS_SOC_init':[70],'EV_delivered':[1000,0]}])
+def test_replan_arrays(inputs):
+    MOEMS=replan_site()
+    EV_er=MOEMS.EV_er.copy()
+    MOEMS.Replan(Steps=1,**inputs)
+    for name,n_units in [('ESS_SOC_init',2),('eBUS_SOC_init',1),('EV_er',2)]:
+        values=getattr(MOEMS,name)
+        assert isinstance(values,np.ndarray) and values.dtype==np.float64 and values.flags['C_CONTIGUOUS'] and values.shape==(n_units,)
+    assert np.all((MOEMS.ESS_SOC_init>=0) & (MOEMS.ESS_SOC_init<=100))
+    if inputs:
+        assert np.array_equal(MOEMS.ESS_SOC_init,[40,60]) and np.array_equal(MOEMS.eBUS_SOC_init,[70])
+        assert np.array_equal(MOEMS.EV_er,np.maximum(EV_er-[1000,0],0))
@@ -0,0 +1,30 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+the scipy backend solves the feasible sites to their optimum in every EV formulation and reports the solves that it can not finish
+"""
+import logging
+import pytest
+from pyomo.environ import value
+from MOEMS import ModelParameters
+from synthetic import public_site,synthetic_site
+
+
+@pytest.mark.parametrize('formulation',['EV','session','charger'])
+def test_public_site(formulation):
+    #the interior point method stopped at the optimum of the EC base problem of the EV formulation without reaching its tolerance
+    MOEMS=ModelParameters(Lazy=True,Solver='scipy',EV_formulation=formulation,**public_site(T=96,n_charger=5,n_sessions=8,Records=True))
+    assert MOEMS.Results() is True
+    assert value(MOEMS.instance.OF)==pytest.approx(13.3035103,rel=1e-7)
+
+
+def test_infeasible_site(caplog):
+    #a session without smart charging on a 22 kW charger for 10 hours gets much more than its 30 kWh
+    data=synthetic_site(T=24,n_EV=0,n_ESS=1,n_eBUS=0)
+    data.update(EV_sessions=[(10,20,30000,1)],EV_max_charge=[22000],EV_max_discharge=[0],EV_charge_efficiency=[100],EV_discharge_efficiency=[100],
+                EV_n_charger=1,EV_charger_phase=[3],EV_OFs=[{'EC':100}],EV_smartcharge=['no'])
+    MOEMS=ModelParameters(Lazy=True,Solver='scipy',**data)
+    with caplog.at_level(logging.WARNING,logger='MOEMS'):
+        assert MOEMS.Solve() is False
+    assert MOEMS.optimal is False and MOEMS.Results() is False
+    assert 'did not converge' in caplog.text
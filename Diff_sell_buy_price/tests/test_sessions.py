@@ -0,0 +1,68 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+the limits and efficiencies that are given for every EV (session) are the ones of that EV in every formulation,
+also when the EVs do not have the number of their charger
+"""
+import numpy as np
+import pytest
+from pyomo.environ import value
+from MOEMS import ModelParameters
+from synthetic import synthetic_site
+
+
+def sessions_site():
+    #3 sessions on the chargers 2, 1, 1 with their own maximum powers and efficiencies, the chargers are 3-phase
+    data=synthetic_site(T=24,n_EV=0,n_ESS=1,n_eBUS=0)
+    data.update(EV_sessions=[(2,8,30000,2),(3,7,25000,1),(10,12,44000,1)],EV_max_charge=[7000,11000,22000],EV_max_discharge=[0]*3,
+                EV_charge_efficiency=[90,95,100],EV_discharge_efficiency=[100]*3,EV_n_charger=2,EV_charger_phase=[3,3],
+                EV_OFs=[{'EC':100}]*3,EV_smartcharge=['yes','yes','no'])
+    return data
+
+
+@pytest.mark.parametrize('formulation',['EV','session','charger'])
+def test_session_limits(formulation):
+    data=sessions_site()
+    MOEMS=ModelParameters(Lazy=True,EV_formulation=formulation,**data)
+    instance=MOEMS.Build()
+    for n,(arrival,departure,energy,charger) in enumerate(data['EV_sessions'],1):
+        t=arrival+1
+        if formulation=='charger':
+            P=instance.P_charger[t,charger]
+        else:
+            P=instance.P_EV[t,n]
+        #the maximum power of the session, 95% of it without smart charging and 6A on 3 phases with smart charging
+        maximum=data['EV_max_charge'][n-1]
+        assert value(P.ub)==maximum
+        assert value(P.lb)==(0.95*maximum if data['EV_smartcharge'][n-1]=='no' else 1440*3)
+
+
+def test_session_efficiency():
+    #the plan of every formulation charges every session with its own efficiency
+    data=sessions_site()
+    results={}
+    for formulation in ['EV','session','charger']:
+        MOEMS=ModelParameters(Solver='scipy',EV_formulation=formulation,**data)
+        results[formulation]=(value(MOEMS.instance.OF),MOEMS.EV_P,MOEMS.EV_SOC)
+    for formulation in ['session','charger']:
+        assert results[formulation][0]==pytest.approx(results['EV'][0],rel=1e-6)
+    deltaT=data['Time_Resolution']/60
+    for formulation,(OF,EV_P,EV_SOC) in results.items():
+        for n,(arrival,departure,energy,charger) in enumerate(data['EV_sessions']):
+            delivered=np.sum(EV_P[n,arrival:departure])*data['EV_charge_efficiency'][n]/100*deltaT
+            assert EV_SOC[n,departure-1]==pytest.approx(delivered,rel=1e-6)
+            assert delivered>=0.98*energy-1e-3
+
+
+@pytest.mark.parametrize('formulation',['EV','session','charger'])
+def test_charger_ID_above_n_EV(formulation):
+    #2 EVs one after the other on the charger 3 of 3 chargers, every EV keeps its own maximum power
+    data=sessions_site()
+    data.update(EV_sessions=[(2,5,15000,3),(6,9,25000,3)],EV_max_charge=[7000,11000],EV_max_discharge=[0]*2,EV_charge_efficiency=[90,95],
+                EV_discharge_efficiency=[100]*2,EV_n_charger=3,EV_charger_phase=[3,3,1],EV_OFs=[{'EC':100}]*2,EV_smartcharge=['yes','yes'])
+    MOEMS=ModelParameters(Lazy=True,EV_formulation=formulation,**data)
+    instance=MOEMS.Build()
+    for n,(arrival,departure,energy,charger) in enumerate(data['EV_sessions'],1):
+        P=instance.P_charger[arrival+1,charger] if formulation=='charger' else instance.P_EV[arrival+1,n]
+        assert value(P.ub)==data['EV_max_charge'][n-1]
+        assert value(P.lb)==1440
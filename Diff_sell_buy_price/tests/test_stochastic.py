@@ -0,0 +1,37 @@
+"""
+@author: Bahman AHmadi <<->> b.ahmadi@utwente.nl
+
+Solve_stochastic gives the first stage decisions only when progressive hedging converged, the status is in Stochastic and in the return value
+"""
+import logging
+import numpy as np
+from MOEMS import ModelParameters
+from synthetic import synthetic_site
+
+
+def ensemble():
+    data=synthetic_site(T=24,n_EV=2,n_ESS=1,n_eBUS=0,seed=3)
+    PV_P=np.array(data['PV_P'])
+    return data,[PV_P*f for f in [0.5,1,1.5]]
+
+
+def test_converged():
+    data,PV_P=ensemble()
+    MOEMS=ModelParameters(Lazy=True,Solver='scipy',**data)
+    result=MOEMS.Solve_stochastic(PV_P=PV_P)
+    assert result is MOEMS.Stochastic
+    assert result['optimal'] is True and result['converged'] and result['failures']==0
+    assert result['first_stage'] is result['last_first_stage']
+    #the scenarios agree on the first interval
+    assert np.max(np.abs(result['ESS_P'][:,:,0]-result['first_stage']['ESS_P']))<=10
+
+
+def test_not_converged(caplog):
+    #one iteration is not enough to agree on the first interval
+    data,PV_P=ensemble()
+    MOEMS=ModelParameters(Lazy=True,Solver='scipy',**data)
+    with caplog.at_level(logging.WARNING,logger='MOEMS'):
+        result=MOEMS.Solve_stochastic(PV_P=PV_P,Iterations=1,Tolerance=1e-3)
+    assert result['optimal'] is False and not result['converged']
+    assert result['first_stage'] is None and np.shape(result['last_first_stage']['ESS_P'])==(1,)
+    assert 'did not converge' in caplog.text